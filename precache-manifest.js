@@ -0,0 +1,63 @@
+// Generated by scripts/pixel_art/build_sprites.py; do not edit.
+self.SPRITE_ASSETS = {
+  "atlas.json": "./assets/images/atlas.b7cff07542.json",
+  "atlas_0.png": "./assets/images/atlas_0.d5673caa79.png",
+  "atlas_0@2x.png": "./assets/images/atlas_0@2x.d32e7765fd.png",
+  "atlas_0@3x.png": "./assets/images/atlas_0@3x.60a53c2225.png",
+  "atlas_0@4x.png": "./assets/images/atlas_0@4x.698b510cc9.png",
+  "atlas_1.png": "./assets/images/atlas_1.82ee0e5c02.png",
+  "atlas_1@2x.png": "./assets/images/atlas_1@2x.33cc2e3ffb.png",
+  "atlas_1@3x.png": "./assets/images/atlas_1@3x.7a06850162.png",
+  "atlas_1@4x.png": "./assets/images/atlas_1@4x.c6840c9f9b.png",
+  "atlas_2.png": "./assets/images/atlas_2.76377040c3.png",
+  "atlas_2@2x.png": "./assets/images/atlas_2@2x.aaac181fed.png",
+  "atlas_2@3x.png": "./assets/images/atlas_2@3x.de7028daa0.png",
+  "atlas_2@4x.png": "./assets/images/atlas_2@4x.43c7e5c307.png",
+  "atlas_palettes.json": "./assets/images/atlas_palettes.35ece55d58.json",
+  "boss_artillery.png": "./assets/images/boss_artillery.38ff6f6430.png",
+  "boss_curtain.png": "./assets/images/boss_curtain.c924846dd4.png",
+  "boss_nexus.png": "./assets/images/boss_nexus.3267ccb26b.png",
+  "boss_sentinel.png": "./assets/images/boss_sentinel.35bdbe04e0.png",
+  "boss_vortex.png": "./assets/images/boss_vortex.197c3a3513.png",
+  "boss_weak_point_10_cyan.png": "./assets/images/boss_weak_point_10_cyan.f94010cdec.png",
+  "boss_weak_point_12_yellow.png": "./assets/images/boss_weak_point_12_yellow.616d473f7b.png",
+  "boss_weak_point_15_magenta.png": "./assets/images/boss_weak_point_15_magenta.bbbb5622b7.png",
+  "boss_weak_point_15_red.png": "./assets/images/boss_weak_point_15_red.144ef08854.png",
+  "boss_weak_point_20_red.png": "./assets/images/boss_weak_point_20_red.a1986ff4fd.png",
+  "collision.json": "./assets/images/collision.9508fce0c9.json",
+  "effect_bomber_hit_sparks.png": "./assets/images/effect_bomber_hit_sparks.6e40beee45.png",
+  "effect_carrier_hit_sparks.png": "./assets/images/effect_carrier_hit_sparks.ac126ae8cd.png",
+  "effect_chaser_hit_sparks.png": "./assets/images/effect_chaser_hit_sparks.0d97b69259.png",
+  "effect_explosion_small.png": "./assets/images/effect_explosion_small.86197a4d3e.png",
+  "effect_player_explosion.png": "./assets/images/effect_player_explosion.5c8643fb88.png",
+  "effect_sniper_hit_sparks.png": "./assets/images/effect_sniper_hit_sparks.6c50a8e49c.png",
+  "effect_swarmer_hit_sparks.png": "./assets/images/effect_swarmer_hit_sparks.534de0d30c.png",
+  "effect_tanker_hit_sparks.png": "./assets/images/effect_tanker_hit_sparks.432f11836f.png",
+  "effect_zapper_hit_sparks.png": "./assets/images/effect_zapper_hit_sparks.839d9e0501.png",
+  "enemy_bomber.png": "./assets/images/enemy_bomber.6d43713bf8.png",
+  "enemy_carrier.png": "./assets/images/enemy_carrier.95bb1d6b53.png",
+  "enemy_chaser.png": "./assets/images/enemy_chaser.8c4c479a2c.png",
+  "enemy_chaser_damaged.png": "./assets/images/enemy_chaser_damaged.17dae02c43.png",
+  "enemy_chaser_elite.png": "./assets/images/enemy_chaser_elite.4d710c2ea2.png",
+  "enemy_chaser_flash.png": "./assets/images/enemy_chaser_flash.12210eb3ad.png",
+  "enemy_chaser_palettes.json": "./assets/images/enemy_chaser_palettes.26b4f2ab2d.json",
+  "enemy_sniper.png": "./assets/images/enemy_sniper.ed6876ab08.png",
+  "enemy_swarmer.png": "./assets/images/enemy_swarmer.18c6b92fb6.png",
+  "enemy_tanker.png": "./assets/images/enemy_tanker.f527d0d1f2.png",
+  "enemy_zapper.png": "./assets/images/enemy_zapper.3c04819d16.png",
+  "enemy_zapper_damaged.png": "./assets/images/enemy_zapper_damaged.8c50f86750.png",
+  "enemy_zapper_elite.png": "./assets/images/enemy_zapper_elite.14e7967b04.png",
+  "enemy_zapper_flash.png": "./assets/images/enemy_zapper_flash.c1f06c22ac.png",
+  "enemy_zapper_palettes.json": "./assets/images/enemy_zapper_palettes.c0a24aac3f.json",
+  "player.png": "./assets/images/player.3825425f2e.png"
+};
+self.SPRITE_PRECACHE = [
+  "./assets/images/atlas.b7cff07542.json",
+  "./assets/images/atlas_0.d5673caa79.png",
+  "./assets/images/atlas_1.82ee0e5c02.png",
+  "./assets/images/atlas_2.76377040c3.png",
+  "./assets/images/atlas_palettes.35ece55d58.json",
+  "./assets/images/collision.9508fce0c9.json",
+  "./assets/images/enemy_chaser_palettes.26b4f2ab2d.json",
+  "./assets/images/enemy_zapper_palettes.c0a24aac3f.json"
+];
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Texture atlas packer for MerterBlaster sprites.
+Merges the frames of every generated sprite sheet into a few power-of-two
+indexed atlases using shelf packing, and writes a JSON manifest with each
+frame's rectangle, animation name and frame duration so the game can load
+one image and one texture instead of a file per sheet.
+
+Frames are trimmed to their opaque pixels before packing and the manifest
+records where the trimmed rectangle sits in the frame (offsetX, offsetY).
+Frames with identical pixels, such as the two mid-glow frames of the player
+idle cycle, are hashed and share one atlas rectangle.
+
+Indexed atlases carry a single palette, so sheets are grouped by palette and
+each group is packed into its own atlas(es). Sheets are saved with trimmed
+palettes, so their frames are mapped back onto the full named palette first.
+
+Each atlas can also be written pre-scaled by integer factors (atlas_0@2x.png)
+and, optionally, CRT-filtered at a scale (atlas_0@2x-crt.png). The manifest
+lists every variant; frame rectangles and offsets are given at scale 1 and
+are multiplied by the variant's scale, so the game picks the variant matching
+its devicePixelRatio without changing how it looks frames up. A page's scaled
+copies depend only on its 1x pixels, so they are redone only when the 1x page
+changes or a copy is missing. Pages left over from a build that needed more
+pages, at any scale, are deleted.
+
+Pages are saved with their own trimmed palettes, so the runtime swap tables
+of sprites with palette-swap variants (see palette_swap.variant_palettes)
+are redone per page and written to <name>_palettes.json, which the manifest
+names under 'palettes'. The per-sheet tables only fit the standalone sheets.
+"""
+
+import hashlib
+import os
+import re
+
+from PIL import Image
+
+from collision import bounding_box, opacity_mask
+from encoders import restore_palette, trim_palette
+from palette_swap import variant_palettes
+from profiling import stage
+from scaling import upscale_image
+from sprites import DEFAULT_IMAGES_DIR, save_crt_preview, save_if_changed, write_json_if_changed
+
+ATLAS_MANIFEST_VERSION = 2
+DEFAULT_ATLAS_NAME = 'atlas'
+DEFAULT_MAX_SIZE = 2048
+DEFAULT_PADDING = 1
+DEFAULT_SCALES = (2, 3, 4)
+
+def collect_frames(definitions, images_dir=DEFAULT_IMAGES_DIR, bundle=None):
+    """Load every frame of every built sheet.
+
+    Frames are read from bundle (an open SpriteBundle, see bundle.py) when
+    given, instead of decoding the PNGs. Returns a list of (definition,
+    frame_index, frame_image) in definition order.
+    """
+    frames = []
+    for definition in definitions:
+        if bundle is not None:
+            frames.extend((definition, frame, bundle.frame_image(definition.name, frame))
+                          for frame in range(definition.num_frames))
+            continue
+        with Image.open(os.path.join(images_dir, definition.sheet_filename)) as image:
+            sheet = restore_palette(image, definition.palette)
+            for frame in range(definition.num_frames):
+                left = frame * definition.frame_width
+                frame_img = sheet.crop((left, 0, left + definition.frame_width, definition.frame_height))
+                frames.append((definition, frame, frame_img))
+    return frames
+
+def shelf_pack(sizes, width, height, padding=DEFAULT_PADDING):
+    """Place rectangles on horizontal shelves inside a width x height bin.
+
+    sizes must already be sorted tallest first. Returns a list of (x, y)
+    positions for the rectangles that fit, in order, stopping at the first
+    one that does not.
+    """
+    positions = []
+    x = y = shelf_height = 0
+    for w, h in sizes:
+        if w > width or h > height:
+            break
+        if x + w > width:
+            # Start a new shelf below the current one
+            y += shelf_height + padding
+            x = shelf_height = 0
+        if y + h > height:
+            break
+        positions.append((x, y))
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+    return positions
+
+def _power_of_two_sizes(max_size):
+    """Candidate (width, height) bins, smallest area first, width >= height."""
+    sizes = []
+    width = 1
+    while width <= max_size:
+        height = 1
+        while height <= width:
+            sizes.append((width, height))
+            height *= 2
+        width *= 2
+    return sorted(sizes, key=lambda size: (size[0] * size[1], size[0]))
+
+def pack_rectangles(sizes, max_size=DEFAULT_MAX_SIZE, padding=DEFAULT_PADDING):
+    """Pack rectangles into as few power-of-two bins as possible.
+
+    Returns a list of bins, each ((width, height), [(rect_index, x, y), ...]).
+    Raises ValueError if a rectangle is larger than max_size.
+    """
+    for w, h in sizes:
+        if w > max_size or h > max_size:
+            raise ValueError(f"{w}x{h} frame does not fit in a {max_size}x{max_size} atlas")
+
+    # Tallest first keeps shelves tight; ties keep input order for determinism
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    candidates = _power_of_two_sizes(max_size)
+    bins = []
+    while order:
+        remaining = [sizes[i] for i in order]
+        area = sum(w * h for w, h in remaining)
+        for bin_size in candidates:
+            if bin_size[0] * bin_size[1] < area:
+                continue
+            positions = shelf_pack(remaining, bin_size[0], bin_size[1], padding)
+            if len(positions) == len(order):
+                break
+        else:
+            # Nothing holds everything: fill a maximum-size bin and carry on
+            bin_size = (max_size, max_size)
+            positions = shelf_pack(remaining, max_size, max_size, padding)
+        bins.append((bin_size, [(i, x, y) for i, (x, y) in zip(order, positions)]))
+        order = order[len(positions):]
+    return bins
+
+def trim_frame(frame_img):
+    """Crop a frame to its opaque pixels.
+
+    Returns (trimmed_image, (offset_x, offset_y)). A fully transparent frame
+    is kept as a single background pixel so it still has a rectangle.
+    """
+    box = bounding_box(opacity_mask(frame_img))
+    if box is None:
+        return frame_img.crop((0, 0, 1, 1)), (0, 0)
+    x, y, w, h = box
+    return frame_img.crop((x, y, x + w, y + h)), (x, y)
+
+def pack_atlases(frames, max_size=DEFAULT_MAX_SIZE, padding=DEFAULT_PADDING, trim=True):
+    """Pack frames into indexed atlas images, one palette per atlas.
+
+    frames is any iterable of (definition, frame_index, frame_image) and is
+    read once; only the distinct (trimmed) images are kept, so a generator
+    can stream frames in without holding them all. With trim, frames are
+    cropped to their opaque bounds first. Frames with the same palette and
+    pixels are packed once. Returns (atlas_images, placements) where
+    placements lists (definition, frame_index, (atlas_index, x, y, w, h,
+    offset_x, offset_y)) in frame order.
+    """
+    # One entry per distinct image in each palette group
+    groups = {}
+    unique = {}
+    frame_keys = []
+    for definition, frame, frame_img in frames:
+        image, offset = trim_frame(frame_img) if trim else (frame_img, (0, 0))
+        palette = bytes(frame_img.getpalette())
+        # Keys share one bytes object per palette rather than a copy per frame
+        palette = groups.setdefault(palette, (palette, []))[0]
+        key = (palette, image.size, hashlib.sha1(image.tobytes()).digest())
+        if key not in unique:
+            unique[key] = image
+            groups[palette][1].append(key)
+        frame_keys.append((definition, frame, key, offset))
+
+    atlas_images = []
+    rects = {}
+    for palette, keys in groups.values():
+        sizes = [unique[key].size for key in keys]
+        for (width, height), placed in pack_rectangles(sizes, max_size, padding):
+            atlas = Image.new('P', (width, height), 0)
+            atlas.putpalette(palette)
+            for member, x, y in placed:
+                image = unique[keys[member]]
+                atlas.paste(image, (x, y))
+                rects[keys[member]] = (len(atlas_images), x, y) + image.size
+            atlas_images.append(atlas)
+
+    placements = [(definition, frame, rects[key] + offset) for definition, frame, key, offset in frame_keys]
+    return atlas_images, placements
+
+def variant_filename(name, index, scale, crt=False):
+    """Filename of one atlas page at a scale, e.g. atlas_0@2x-crt.png."""
+    suffix = f'@{scale}x' if scale != 1 or crt else ''
+    return f"{name}_{index}{suffix}{'-crt' if crt else ''}.png"
+
+def remove_stale_pages(images_dir, name, page_count):
+    """Delete <name>_<n> pages (every scale and CRT copy) with n >= page_count.
+
+    Returns the removed paths.
+    """
+    pattern = re.compile(re.escape(name) + r'_(\d+)(?:@\d+x)?(?:-crt)?\.png')
+    removed = []
+    for filename in sorted(os.listdir(images_dir)):
+        match = pattern.fullmatch(filename)
+        if match is not None and int(match.group(1)) >= page_count:
+            path = os.path.join(images_dir, filename)
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+def page_variant_palettes(atlas_images, placements):
+    """Runtime swap tables for each page holding frames of a sprite with variants.
+
+    Returns {sprite: [{'atlas': index, 'base': [...], 'variants': {...}}]},
+    with entries in the order of that page's trimmed palette.
+    """
+    pages = {}
+    for definition, _, placement in placements:
+        if definition.variants:
+            pages.setdefault(definition.name, (definition, set()))[1].add(placement[0])
+    return {name: [dict(variant_palettes(atlas_images[index], definition.variants, definition.palette),
+                        atlas=index)
+                   for index in sorted(indices)]
+            for name, (definition, indices) in pages.items()}
+
+def atlas_manifest(atlas_filenames, atlas_images, placements, variants=(), palettes_filename=None):
+    """Build the JSON-serializable manifest describing every packed frame.
+
+    placements is as returned by pack_atlases. variants is a list of (scale,
+    crt, filenames) for the scaled copies of the atlas pages; the unscaled
+    pages are always listed first. palettes_filename names the per-page
+    swap tables, if any were written.
+    """
+    sprites = {}
+    for definition, frame, placement in placements:
+        atlas_index, x, y, width, height, offset_x, offset_y = placement
+        sprite = sprites.setdefault(definition.name, {
+            'frameWidth': definition.frame_width,
+            'frameHeight': definition.frame_height,
+            'animations': {},
+        })
+        animation = sprite['animations'].setdefault(definition.animation, {
+            'frameDuration': definition.frame_duration_ms,
+            'frames': [],
+        })
+        animation['frames'].append({'atlas': atlas_index, 'x': x, 'y': y, 'w': width, 'h': height,
+                                    'offsetX': offset_x, 'offsetY': offset_y})
+
+    def pages(filenames, scale):
+        return [{'image': filename, 'width': image.width * scale, 'height': image.height * scale}
+                for filename, image in zip(filenames, atlas_images)]
+
+    manifest = {
+        'version': ATLAS_MANIFEST_VERSION,
+        'atlases': pages(atlas_filenames, 1),
+        'variants': [{'scale': 1, 'crt': False, 'atlases': pages(atlas_filenames, 1)}] +
+                    [{'scale': scale, 'crt': crt, 'atlases': pages(filenames, scale)}
+                     for scale, crt, filenames in variants],
+        'sprites': sprites,
+    }
+    if palettes_filename is not None:
+        manifest['palettes'] = palettes_filename
+    return manifest
+
+def build_atlases(definitions, images_dir=DEFAULT_IMAGES_DIR, name=DEFAULT_ATLAS_NAME,
+                  max_size=DEFAULT_MAX_SIZE, padding=DEFAULT_PADDING, scales=DEFAULT_SCALES,
+                  crt_scales=(), trim=True, bundle=None, force=False):
+    """Pack the built sheets of definitions into atlases and write the manifest.
+
+    Writes <name>_<n>.png for each atlas, its pre-scaled copies for every
+    factor in scales, CRT-filtered copies for every factor in crt_scales and
+    <name>.json; returns the paths. Scaled copies of unchanged pages are
+    kept unless force is set.
+    """
+    with stage('atlas-load'):
+        frames = collect_frames(definitions, images_dir, bundle)
+    return write_atlases(frames, images_dir, name, max_size, padding, scales, crt_scales, trim, force)
+
+def write_atlases(frames, images_dir=DEFAULT_IMAGES_DIR, name=DEFAULT_ATLAS_NAME, max_size=DEFAULT_MAX_SIZE,
+                  padding=DEFAULT_PADDING, scales=DEFAULT_SCALES, crt_scales=(), trim=True, force=False):
+    """Pack (definition, frame_index, frame_image) frames and write them as build_atlases does.
+
+    For frames that never touch disk as sheets, such as procedurally
+    generated enemies (see procedural_enemies.py). frames may be a generator;
+    it is consumed once while packing.
+    """
+    os.makedirs(images_dir, exist_ok=True)
+    with stage('atlas-pack'):
+        atlas_images, placements = pack_atlases(frames, max_size, padding, trim)
+    atlas_filenames = [f'{name}_{index}.png' for index in range(len(atlas_images))]
+
+    written = []
+    changed = []
+    trimmed_images = [trim_palette(image) for image in atlas_images]
+    for filename, image in zip(atlas_filenames, trimmed_images):
+        path = os.path.join(images_dir, filename)
+        changed.append(save_if_changed(image, path, optimize=True) or force)
+        written.append(path)
+
+    variants = []
+    for scale, crt in [(scale, False) for scale in scales if scale != 1] + [(scale, True) for scale in crt_scales]:
+        filenames = [variant_filename(name, index, scale, crt) for index in range(len(atlas_images))]
+        with stage('atlas-scale', scale=scale, crt=crt):
+            for filename, image, page_changed in zip(filenames, trimmed_images, changed):
+                path = os.path.join(images_dir, filename)
+                written.append(path)
+                if not page_changed and os.path.exists(path):
+                    continue
+                scaled = upscale_image(image, scale)
+                if crt:
+                    save_crt_preview(scaled, path)
+                else:
+                    save_if_changed(scaled, path, optimize=True)
+        variants.append((scale, crt, filenames))
+    remove_stale_pages(images_dir, name, len(atlas_images))
+
+    palettes_filename = None
+    palettes_path = os.path.join(images_dir, f'{name}_palettes.json')
+    palettes = page_variant_palettes(atlas_images, placements)
+    if palettes:
+        palettes_filename = os.path.basename(palettes_path)
+        write_json_if_changed({'sprites': palettes}, palettes_path, compact=True)
+        written.append(palettes_path)
+    elif os.path.exists(palettes_path):
+        os.remove(palettes_path)
+
+    manifest = atlas_manifest(atlas_filenames, atlas_images, placements, variants, palettes_filename)
+    manifest_path = os.path.join(images_dir, f'{name}.json')
+    write_json_if_changed(manifest, manifest_path)
+    written.append(manifest_path)
+    return written
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the MerterBlaster sprite pipeline.
+Times palette creation, every draw_*_frame function and sprite spec, particle
+effect simulation, sheet rendering, palette-swap variants, procedural enemy
+variants, boss sheets with an empty part cache, the CRT filter from 200x30 up to 8192x8192 (in memory and streamed
+to PNG), integer upscaling, PNG encoding with and without optimize or palette
+trimming, and reading every frame back from PNGs or from a mapped sprite
+bundle.
+Results are compared against a JSON baseline (bench_baseline.json) and any
+benchmark slower than the baseline by more than --threshold is reported as a
+regression, with a non-zero exit status.
+
+Usage:
+    python scripts/pixel_art/bench_sprites.py [--filter TEXT] [--quick]
+    python scripts/pixel_art/bench_sprites.py --save-baseline
+"""
+
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+from PIL import Image
+
+import palettes
+from boss_parts import render_part
+from bundle import DEFAULT_BUNDLE_FILENAME, SpriteBundle, encode_bundle
+from crt_filter import apply_crt_filter, write_crt_png
+from encoders import encode_png_trimmed, restore_palette
+from palette_swap import render_variants
+from particles import ParticleEffect, render_effect
+from procedural_enemies import DEFAULT_SEED, KINDS, procedural_definition, variant_params
+from rasterizer import FrameDraw
+from scaling import upscale_image
+from sprites import SCRIPT_DIR, discover_sprites, render_definition
+
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, 'bench_baseline.json')
+DEFAULT_THRESHOLD = 0.25
+CRT_SIZES = [(200, 30), (1024, 1024), (4096, 4096), (8192, 8192)]
+QUICK_MAX_PIXELS = 1024 * 1024
+
+def tiled_sheet(sheet, width, height):
+    """Repeat a 'P' sheet to fill width x height, keeping its palette."""
+    tile = np.asarray(sheet)
+    reps = (-(-height // tile.shape[0]), -(-width // tile.shape[1]))
+    tiled = Image.fromarray(np.ascontiguousarray(np.tile(tile, reps)[:height, :width]), 'P')
+    tiled.putpalette(sheet.getpalette())
+    return tiled
+
+def encode_png(image, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', **options)
+    return buffer.getvalue()
+
+def collect_benchmarks(quick=False):
+    """Return an ordered list of (name, setup) pairs.
+
+    setup() prepares any inputs and returns the zero-argument callable to
+    time, so filtered-out benchmarks never build their large test images.
+    """
+    sprites = discover_sprites()
+    benchmarks = []
+
+    for name in sorted(palettes.PALETTE_GRADIENTS):
+        gradient = palettes.PALETTE_GRADIENTS[name]
+        benchmarks.append((f'palette/{name}',
+                           lambda gradient=gradient: lambda: palettes._gradient_palette(gradient)))
+
+    for definition in sprites:
+        label = definition.spec or definition.draw_function
+        if definition.draw_args:
+            label = f'{label}:{definition.name}'
+        benchmarks.append((f'draw/{label}',
+                           lambda definition=definition: _draw_all_frames(definition)))
+        if definition.draw_function == 'draw_effect_frame':
+            benchmarks.append((f'particles/{definition.name}',
+                               lambda definition=definition: _simulate_effect(definition)))
+        benchmarks.append((f'sheet/{definition.name}',
+                           lambda definition=definition: lambda: render_definition(definition)))
+        if definition.variants:
+            benchmarks.append((f'variants/{definition.name}',
+                               lambda definition=definition: _variants(definition)))
+        if definition.draw_function == 'draw_boss_frame':
+            benchmarks.append((f'boss-cold/{definition.name}',
+                               lambda definition=definition: _boss_cold(definition)))
+
+    for kind in KINDS:
+        definition = procedural_definition(variant_params(DEFAULT_SEED, 0, kind))
+        benchmarks.append((f'procedural/{kind}',
+                           lambda definition=definition: lambda: render_definition(definition)))
+
+    player = next(definition for definition in sprites if definition.name == 'player')
+    for width, height in CRT_SIZES:
+        if quick and width * height > QUICK_MAX_PIXELS:
+            continue
+        benchmarks.append((f'crt/{width}x{height}',
+                           lambda size=(width, height): _crt(render_definition(player), *size)))
+        benchmarks.append((f'crt-stream/{width}x{height}',
+                           lambda size=(width, height): _crt_stream(render_definition(player), *size)))
+
+    for factor in (2, 4):
+        benchmarks.append((f'scale/1024x1024@{factor}x',
+                           lambda factor=factor: _scale(render_definition(player), factor)))
+
+    for label, size in [('sheet', None), ('1024x1024', (1024, 1024))]:
+        for options in ({}, {'optimize': True}):
+            suffix = '-optimize' if options else ''
+            benchmarks.append((f'png/{label}{suffix}',
+                               lambda size=size, options=options: _png(render_definition(player), size, options)))
+        benchmarks.append((f'png/{label}-trimmed',
+                           lambda size=size: _png_trimmed(render_definition(player), size)))
+
+    benchmarks.append(('frames/png-decode', lambda: _read_png_frames(sprites)))
+    benchmarks.append(('frames/bundle', lambda: _read_bundle_frames(sprites)))
+
+    return benchmarks
+
+def _draw_all_frames(definition):
+    draw_function = definition.resolve()
+    frame_img = Image.new('P', (definition.frame_width, definition.frame_height), 0)
+    draw = FrameDraw(frame_img)
+
+    def run():
+        for frame in range(definition.num_frames):
+            draw_function(draw, frame, definition.frame_width, definition.frame_height)
+    return run
+
+def _simulate_effect(definition):
+    # Time the uncached simulation and rasterization, not the lru_cache lookup
+    effect = ParticleEffect.from_params(definition.draw_args[0])
+    return lambda: render_effect.__wrapped__(effect, definition.frame_width, definition.frame_height)
+
+def _variants(definition):
+    sheet = render_definition(definition)
+    return lambda: list(render_variants(sheet, definition.variants))
+
+def _boss_cold(definition):
+    # sheet/ benchmarks reuse parts memoized by earlier runs; this one draws every part
+    def run():
+        render_part.cache_clear()
+        render_definition(definition)
+    return run
+
+def _crt(sheet, width, height):
+    image = tiled_sheet(sheet, width, height)
+    return lambda: apply_crt_filter(image)
+
+def _crt_stream(sheet, width, height):
+    image = tiled_sheet(sheet, width, height)
+    return lambda: write_crt_png(image, os.devnull)
+
+def _scale(sheet, factor):
+    image = tiled_sheet(sheet, 1024, 1024)
+    return lambda: upscale_image(image, factor)
+
+def _png(sheet, size, options):
+    image = tiled_sheet(sheet, *size) if size else sheet
+    return lambda: encode_png(image, **options)
+
+def _png_trimmed(sheet, size):
+    image = tiled_sheet(sheet, *size) if size else sheet
+    return lambda: encode_png_trimmed(image)
+
+def _encoded_sheets(sprites):
+    return [(definition, encode_png_trimmed(render_definition(definition))) for definition in sprites]
+
+def _read_png_frames(sprites):
+    sheets = _encoded_sheets(sprites)
+
+    def run():
+        for definition, data in sheets:
+            with Image.open(io.BytesIO(data)) as image:
+                sheet = np.asarray(restore_palette(image, definition.palette))
+            for frame in range(definition.num_frames):
+                sheet[:, frame * definition.frame_width:(frame + 1) * definition.frame_width].sum()
+    return run
+
+def _read_bundle_frames(sprites):
+    frames = [(definition, [np.asarray(render_definition(definition))[
+        :, frame * definition.frame_width:(frame + 1) * definition.frame_width]
+        for frame in range(definition.num_frames)]) for definition in sprites]
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    path = os.path.join(directory, DEFAULT_BUNDLE_FILENAME)
+    with open(path, 'wb') as f:
+        f.write(encode_bundle(frames))
+
+    def run():
+        with SpriteBundle(path) as bundle:
+            for name in bundle:
+                for array in bundle.frames(name):
+                    array.sum()
+    return run
+
+def time_callable(function, repeat=5, min_time=0.2):
+    """Best seconds per call over repeat runs of at least min_time each.
+
+    The minimum is the least noisy estimate on a shared machine; slower runs
+    mostly measure interference from other processes.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed * 10 > min_time else 10
+    runs = [timer.timeit(number) / number for _ in range(repeat - 1)]
+    runs.append(elapsed / number)
+    return min(runs)
+
+def format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get('benchmarks', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_baseline(path, results):
+    data = {
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+        },
+        'benchmarks': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def compare(results, baseline, threshold):
+    """Return (name, seconds, baseline_seconds, ratio) rows and the regressions."""
+    rows, regressions = [], []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        ratio = seconds / reference if reference else None
+        rows.append((name, seconds, reference, ratio))
+        if ratio is not None and ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sprite pipeline.")
+    parser.add_argument('--filter', '-k', default=None,
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument('--quick', action='store_true',
+                        help=f"skip CRT sizes above {QUICK_MAX_PIXELS} pixels")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="baseline JSON file (default: bench_baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="write these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed slowdown before reporting a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per benchmark (default: 5)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = load_baseline(args.baseline)
+
+    results = {}
+    for name, setup in collect_benchmarks(args.quick):
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = time_callable(setup(), args.repeat)
+        print(f"{name:<32} {format_seconds(results[name]):>12}", flush=True)
+
+    if args.save_baseline:
+        # Keep entries for benchmarks that were filtered out of this run
+        merged = dict(baseline)
+        merged.update(results)
+        save_baseline(args.baseline, merged)
+        print(f"Saved baseline for {len(results)} benchmark(s) to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    rows, regressions = compare(results, baseline, args.threshold)
+    print()
+    print(f"{'benchmark':<32} {'current':>12} {'baseline':>12} {'change':>8}")
+    for name, seconds, reference, ratio in rows:
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio is not None else 'new'
+        reference_text = format_seconds(reference) if reference else '-'
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:<32} {format_seconds(seconds):>12} {reference_text:>12} {change:>8}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
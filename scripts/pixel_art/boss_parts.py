@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Reusable boss parts for the MerterBlaster boss sprite sheets.
+A boss frame is composited from parts (hull, core, rotating ring, turrets,
+armor plates, weak point sockets and weak points), each drawn into its own
+small indexed image around its centre. render_part memoizes every rendered
+part by kind, parameters and palette, so a turret at a given angle, a core at
+a given pulse or a cracked plate is drawn once per process and then pasted
+for every boss, rotation step and phase frame that uses it.
+
+Parts take a damage level: 0 intact, 1 damaged (cracks and scorch marks),
+2 critical (broken plates and barrels, embers). Colors come from the ramps
+of the 'boss' palette (see palettes.boss_index).
+
+Boss sprite definitions list this module as a dependency, so the build cache
+rebuilds their sheets whenever its source changes.
+"""
+
+from functools import lru_cache
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from palettes import boss_index, flat_palette
+from rasterizer import draw_radial_glow
+
+def _rotate(points, angle, center):
+    """Rotate (x, y) points by angle degrees (clockwise on screen) about center."""
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    cx, cy = center
+    return [(cx + x * cos - y * sin, cy + x * sin + y * cos) for x, y in points]
+
+def _scorch(draw, width, height, damage, count):
+    """Scorch marks and, when critical, embers at fixed spots so frames stay stable."""
+    if damage < 1:
+        return
+    for i in range(count * damage):
+        # Golden-ratio spacing spreads the marks without a random generator
+        x = int(width * (0.2 + 0.6 * ((i * 0.618) % 1)))
+        y = int(height * (0.25 + 0.5 * ((i * 0.382 + 0.3) % 1)))
+        draw.ellipse([x - 2, y - 1, x + 2, y + 1], fill=boss_index('metal', 3))
+        if damage >= 2:
+            draw.point([x, y], fill=boss_index('fire', 20 + i * 7 % 24))
+
+def _hull(draw, width, height, ramp, damage):
+    draw.ellipse([0, 0, width - 1, height - 1], fill=boss_index(ramp, 14), outline=boss_index(ramp, 5))
+    # Lit upper half and a rim highlight, as if lit from the top left
+    draw.ellipse([width // 8, height // 10, width - width // 4, height // 2], fill=boss_index(ramp, 18))
+    draw.arc([2, 2, width - 3, height - 3], 200, 260, fill=boss_index(ramp, 27))
+    _scorch(draw, width, height, damage, 4)
+
+def _core(draw, radius, ramp, pulse, damage):
+    # Bright centre fading out; critical cores run hot on the fire ramp
+    base, span = (boss_index('fire', 47), -40) if damage >= 2 else (boss_index(ramp, 31), -24)
+    draw_radial_glow(draw, (radius, radius), radius - 2 + pulse, base, span)
+    draw.ellipse([radius - 2, radius - 2, radius + 2, radius + 2], fill=15)
+
+def _ring(draw, radius, ramp, spokes, angle, damage):
+    center = (radius, radius)
+    draw.ellipse([1, 1, 2 * radius - 1, 2 * radius - 1], outline=boss_index(ramp, 8), width=3)
+    blade = [(-3, 1 - radius), (3, 1 - radius), (2, 10 - radius), (-2, 10 - radius)]
+    for spoke in range(spokes):
+        if damage >= 2 and spoke % 3 == 2:
+            continue  # Blades blown off
+        points = _rotate(blade, angle + spoke * 360 / spokes, center)
+        draw.polygon(points, fill=boss_index(ramp, 22), outline=boss_index(ramp, 10))
+
+def _turret(draw, length, angle, damage):
+    center = (length + 2, length + 2)
+    radius = length // 2 + 1
+    barrel_length = length // 2 if damage >= 2 else length
+    barrel = [(-2, 0), (2, 0), (2, barrel_length), (-2, barrel_length)]
+    # Angle 0 points the barrel straight down, at the player
+    draw.polygon(_rotate(barrel, angle, center), fill=boss_index('metal', 12), outline=boss_index('metal', 4))
+    draw.ellipse([center[0] - radius, center[1] - radius, center[0] + radius, center[1] + radius],
+                 fill=boss_index('metal', 16), outline=boss_index('metal', 5))
+    draw.point([center[0] - 1, center[1] - 1], fill=boss_index('metal', 28))
+    if damage >= 2:
+        draw.point([center[0] + 1, center[1] + 1], fill=boss_index('fire', 30))
+
+def _plate(draw, width, height, ramp, damage):
+    if damage >= 2:
+        # Plate blown off: only a scorched frame remains
+        draw.rectangle([0, 0, width - 1, height - 1], outline=boss_index('metal', 4))
+        draw.line([1, height - 2, width - 2, 1], fill=boss_index('fire', 12))
+        return
+    draw.rectangle([0, 0, width - 1, height - 1], fill=boss_index('metal', 14), outline=boss_index(ramp, 6))
+    draw.line([1, 1, width - 2, 1], fill=boss_index('metal', 24))
+    for x, y in ((1, 1), (width - 2, 1), (1, height - 2), (width - 2, height - 2)):
+        draw.point([x, y], fill=boss_index('metal', 28))
+    if damage:
+        draw.line([width // 3, 0, width // 2, height // 2, width // 3 + 2, height - 1],
+                  fill=boss_index('metal', 3))
+
+def _socket(draw, radius, ramp):
+    draw.ellipse([0, 0, 2 * radius, 2 * radius], fill=boss_index('metal', 6), outline=boss_index(ramp, 4))
+
+def _weak_point(draw, size, radius, color):
+    # Same shape as Boss.renderWeakPoints: a disc and a white highlight up and left
+    draw.ellipse([size - radius, size - radius, size + radius, size + radius], fill=color)
+    highlight = radius * 0.4
+    hx = hy = size - radius * 0.3
+    draw.ellipse([hx - highlight, hy - highlight, hx + highlight, hy + highlight], fill=15)
+
+# kind -> (drawing function, (width, height) of a part from its parameters)
+PARTS = {
+    'hull': (_hull, lambda p: (p['width'], p['height'])),
+    'core': (_core, lambda p: (2 * p['radius'] + 1,) * 2),
+    'ring': (_ring, lambda p: (2 * p['radius'] + 1,) * 2),
+    'turret': (_turret, lambda p: (2 * p['length'] + 5,) * 2),
+    'plate': (_plate, lambda p: (p['width'], p['height'])),
+    'socket': (_socket, lambda p: (2 * p['radius'] + 1,) * 2),
+    'weak_point': (_weak_point, lambda p: (2 * p['size'] + 1,) * 2),
+}
+
+@lru_cache(maxsize=None)
+def render_part(kind, params, palette):
+    """Render a part once: returns its 'P' image and 'L' paste mask.
+
+    params is a hashable tuple of (name, value) pairs.
+    """
+    draw_part, size = PARTS[kind]
+    values = dict(params)
+    image = Image.new('P', size(values), 0)
+    image.putpalette(flat_palette(palette))
+    draw_part(ImageDraw.Draw(image), **values)
+    mask = Image.fromarray(np.where(np.asarray(image) != 0, 255, 0).astype(np.uint8), 'L')
+    return image, mask
+
+def paste_part(image, kind, params, palette, center):
+    """Composite a memoized part onto image, centred on center."""
+    part, mask = render_part(kind, tuple(sorted(params.items())), palette)
+    image.paste(part, (center[0] - part.width // 2, center[1] - part.height // 2), mask)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Content-addressed incremental build cache for MerterBlaster sprites.
+Each sprite is keyed on a hash of its draw function source (or its spec file
+for spec-driven sprites), the source of any helper modules it depends on,
+the source of the modules that render and encode every sheet (and compile
+specs), palette contents, frame size and count, and output
+options. Built files are stored under
+.sprite-cache/objects/<key>/ and a manifest records which key produced each
+output file, so unchanged sprites are skipped and previously built versions
+are restored by copying instead of redrawing.
+
+The manifest also records the key the shared outputs (bundle, atlases,
+collision data, precache manifest) were last built from, so a full build
+whose sheets and options have not changed leaves them alone.
+"""
+
+import dataclasses
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import shutil
+
+from palettes import flat_palette
+from sprite_spec import spec_source
+from sprites import SCRIPT_DIR
+
+# Layout of manifest.json; changes to the build code itself are caught by
+# hashing the modules below
+MANIFEST_VERSION = 3
+
+# Modules whose code decides the bytes of every sprite build
+BUILD_MODULES = ('sprites', 'rasterizer', 'encoders', 'crt_filter', 'png_stream', 'palette_swap')
+# ...and of spec-driven sprites, which sprite_spec compiles and replays
+SPEC_BUILD_MODULES = ('sprite_spec',)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), '.sprite-cache')
+MANIFEST_FILENAME = 'manifest.json'
+
+def sprite_cache_key(definition):
+    """Hash everything that determines the bytes a sprite build writes."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(dataclasses.asdict(definition), sort_keys=True).encode('utf-8'))
+    for name in BUILD_MODULES + (SPEC_BUILD_MODULES if definition.spec else ()):
+        digest.update(inspect.getsource(importlib.import_module(name)).encode('utf-8'))
+    if definition.spec:
+        # The spec file describes the drawing; there is no draw function
+        digest.update(spec_source(definition.spec))
+    else:
+        draw_function = getattr(definition.load_module(), definition.draw_function)
+        digest.update(inspect.getsource(draw_function).encode('utf-8'))
+    for module in definition.dependency_modules():
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    digest.update(flat_palette(definition.palette))
+    return digest.hexdigest()
+
+def _stat_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class BuildCache:
+    """On-disk sprite cache: an objects store plus a manifest of output files."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+        self.outputs = {}
+        self.shared = {}
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get('version') == MANIFEST_VERSION:
+            self.outputs = manifest.get('outputs', {})
+            self.shared = manifest.get('shared', {})
+
+    def is_fresh(self, definition, key, images_dir):
+        """True if every output of definition on disk was built from key and is untouched."""
+        for filename in definition.output_filenames():
+            path = os.path.abspath(os.path.join(images_dir, filename))
+            entry = self.outputs.get(path)
+            if entry is None or entry['key'] != key:
+                return False
+            try:
+                if _stat_signature(path) != entry['stat']:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def restore(self, definition, key, images_dir):
+        """Copy a previously built version out of the objects store.
+
+        Returns the written paths, or None if key is not cached.
+        """
+        object_dir = os.path.join(self.objects_dir, key)
+        filenames = definition.output_filenames()
+        if not all(os.path.isfile(os.path.join(object_dir, name)) for name in filenames):
+            return None
+
+        os.makedirs(images_dir, exist_ok=True)
+        written = []
+        for filename in filenames:
+            path = os.path.join(images_dir, filename)
+            shutil.copyfile(os.path.join(object_dir, filename), path)
+            written.append(path)
+        self.record(key, written)
+        return written
+
+    def store(self, key, written):
+        """Save freshly built outputs into the objects store and record them."""
+        object_dir = os.path.join(self.objects_dir, key)
+        os.makedirs(object_dir, exist_ok=True)
+        for path in written:
+            shutil.copyfile(path, os.path.join(object_dir, os.path.basename(path)))
+        self.record(key, written)
+
+    def record(self, key, written):
+        for path in written:
+            self.outputs[os.path.abspath(path)] = {'key': key, 'stat': _stat_signature(path)}
+
+    def shared_is_fresh(self, key):
+        """True if the shared outputs were last built from key and are untouched."""
+        if self.shared.get('key') != key:
+            return False
+        for path, signature in self.shared['outputs'].items():
+            try:
+                if _stat_signature(path) != signature:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def record_shared(self, key, written):
+        self.shared = {'key': key,
+                       'outputs': {os.path.abspath(path): _stat_signature(path) for path in written}}
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'outputs': self.outputs, 'shared': self.shared}, f,
+                      indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def prune(self, keep_keys):
+        """Delete cached objects and manifest entries whose key is not in keep_keys.
+
+        Returns the number of objects removed.
+        """
+        keep_keys = set(keep_keys)
+        self.outputs = {path: entry for path, entry in self.outputs.items()
+                        if entry['key'] in keep_keys}
+
+        removed = 0
+        if os.path.isdir(self.objects_dir):
+            for key in os.listdir(self.objects_dir):
+                if key not in keep_keys:
+                    shutil.rmtree(os.path.join(self.objects_dir, key))
+                    removed += 1
+        return removed
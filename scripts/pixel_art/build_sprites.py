@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Build every MerterBlaster sprite sheet in one run.
+Finds the SPRITES definitions in all generate_*.py scripts and renders,
+CRT-filters and encodes them across a process pool. Each sprite writes its own
+files and results are reported in definition order, so the output is the same
+whatever --jobs is set to. Unchanged sprites are skipped using the build cache
+in build_cache.py. A full build also writes every frame into a memory-mappable
+bundle (see bundle.py), packs every sheet and palette-swap variant (see
+palette_swap.py) into texture atlases with a JSON frame manifest, plus
+pre-scaled (and optionally CRT-filtered) copies of each atlas (see atlas.py),
+writes per-frame collision data (see collision.py) and copies every runtime
+output to a content-hashed filename listed in the service worker's precache
+manifest (see precache.py). --previews adds animated APNG/WebP previews (see
+previews.py). These shared outputs are keyed on the sheets, options and code
+they are made from and skipped when that key has not changed since they were
+last written.
+
+The site is deployed as is ('npm run deploy' publishes the repo with no build
+step), so the outputs in assets/images and precache-manifest.js are committed:
+rerun this script and commit what it writes along with any change that
+alters them.
+
+With --watch the process stays running after the build, polls the generator
+scripts and sprite specs, hot-reloads the ones that change and rebuilds only
+the sprites whose draw function or spec changed (see watch.py).
+
+Usage:
+    python scripts/pixel_art/build_sprites.py [--jobs N] [--only NAME ...] [--force]
+    python scripts/pixel_art/build_sprites.py --watch
+    python scripts/pixel_art/build_sprites.py --prune-cache
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+
+from atlas import DEFAULT_ATLAS_NAME, DEFAULT_MAX_SIZE, DEFAULT_SCALES, build_atlases
+from build_cache import BuildCache, sprite_cache_key
+from bundle import DEFAULT_BUNDLE_PATH, SpriteBundle, build_bundle
+from collision import build_collision_data
+from precache import DEFAULT_PRECACHE_PATH, build_precache_manifest
+from previews import DEFAULT_PREVIEW_DIR, FORMATS as PREVIEW_FORMATS, parse_formats, write_previews
+import profiling
+from profiling import stage
+from scaling import parse_scales
+from sprites import DEFAULT_IMAGES_DIR, build_all, discover_sprites, select_sprites
+from watch import DEFAULT_POLL_INTERVAL, watch
+
+DEFAULT_TRACE_PATH = 'sprite-build-trace.json'
+# Options that change what build_shared_outputs writes
+SHARED_OPTIONS = ('output_dir', 'no_bundle', 'bundle_path', 'no_atlas', 'no_collision', 'no_precache',
+                  'precache_manifest', 'previews', 'preview_formats', 'atlas_max_size', 'no_atlas_trim',
+                  'atlas_scales', 'atlas_crt_scales')
+# Their modules' source is hashed into the shared outputs key
+SHARED_BUILDERS = (build_bundle, build_atlases, build_collision_data, build_precache_manifest, write_previews)
+
+def prune_cache(sprites, cache):
+    """Drop cache entries that no current sprite definition can use."""
+    removed = cache.prune(sprite_cache_key(definition) for definition in sprites)
+    cache.save()
+    return removed
+
+def report_results(results):
+    for definition, status, written in results:
+        if status == 'cached':
+            print(f"[{definition.name}] Up to date")
+            continue
+        for path in written:
+            verb = 'Restored' if status == 'restored' else 'Saved'
+            print(f"[{definition.name}] {verb} {path}")
+
+def shared_outputs_key(all_sprites, args):
+    """Hash the sheets, definitions, options and code the shared outputs are built from."""
+    digest = hashlib.sha256()
+    options = {name: getattr(args, name) for name in SHARED_OPTIONS}
+    options['sprites'] = [dataclasses.asdict(definition) for definition in all_sprites]
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    for builder in SHARED_BUILDERS:
+        digest.update(inspect.getsource(inspect.getmodule(builder)).encode('utf-8'))
+    for definition in all_sprites:
+        for filename in definition.runtime_filenames():
+            with open(os.path.join(args.output_dir, filename), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def build_shared_outputs(all_sprites, args, cache=None):
+    """Rewrite the bundle, atlas, collision data and precache manifest, which cover every sprite.
+
+    With a cache, nothing is rewritten if the shared outputs key matches the
+    last build and its files are untouched (unless --force).
+    """
+    key = None
+    if cache is not None:
+        with stage('shared-check'):
+            key = shared_outputs_key(all_sprites, args)
+            if not args.force and cache.shared_is_fresh(key):
+                print("[shared] Bundle, atlas, collision data and precache manifest are up to date")
+                return
+
+    filenames = [filename for definition in all_sprites for filename in definition.runtime_filenames()]
+    # Without an atlas the game loads the sheets, so every device needs them
+    precache = [filename for filename in filenames if args.no_atlas or filename.endswith('.json')]
+    packed_sprites = all_sprites + [variant for definition in all_sprites
+                                    for variant in definition.variant_definitions()]
+    written = []
+    bundle = None
+    if not args.no_bundle:
+        # Decode every sheet once; the atlas and collision data read the mapped frames
+        with stage('bundle'):
+            bundle_path = build_bundle(packed_sprites, args.output_dir, args.bundle_path)
+        print(f"[bundle] Saved {bundle_path}")
+        written.append(bundle_path)
+        bundle = SpriteBundle(bundle_path)
+    try:
+        if not args.no_atlas:
+            with stage('atlas'):
+                atlas_paths = build_atlases(packed_sprites, args.output_dir, DEFAULT_ATLAS_NAME,
+                                            args.atlas_max_size, scales=args.atlas_scales,
+                                            crt_scales=args.atlas_crt_scales, trim=not args.no_atlas_trim,
+                                            bundle=bundle, force=args.force)
+            for path in atlas_paths:
+                print(f"[atlas] Saved {path}")
+            written.extend(atlas_paths)
+            atlas_filenames = [os.path.basename(path) for path in atlas_paths]
+            filenames.extend(atlas_filenames)
+            # Scaled and CRT pages (atlas_0@2x.png, see atlas.variant_filename) are fetched on demand
+            precache.extend(filename for filename in atlas_filenames if '@' not in filename)
+        if not args.no_collision:
+            with stage('collision'):
+                collision_path = build_collision_data(all_sprites, args.output_dir, bundle=bundle)
+            print(f"[collision] Saved {collision_path}")
+            written.append(collision_path)
+            filenames.append(os.path.basename(collision_path))
+            precache.append(os.path.basename(collision_path))
+        if args.previews:
+            with stage('previews'):
+                previews = write_previews(packed_sprites, args.previews, args.output_dir,
+                                          formats=args.preview_formats, bundle=bundle)
+            for _, path, size in previews:
+                print(f"[previews] Saved {path} ({size} bytes)")
+            written.extend(path for _, path, _ in previews)
+    finally:
+        if bundle is not None:
+            bundle.close()
+    if not args.no_precache:
+        with stage('precache'):
+            precache_path, assets = build_precache_manifest(filenames, precache, args.output_dir,
+                                                            args.precache_manifest)
+        print(f"[precache] Saved {precache_path} ({len(filenames)} hashed file(s), {len(set(precache))} precached)")
+        written.append(precache_path)
+        written.extend(os.path.join(args.output_dir, hashed) for hashed in assets.values())
+
+    if cache is not None:
+        cache.record_shared(key, written)
+        cache.save()
+
+def watch_sprites(args, cache):
+    """Rebuild sprites whose cache key changes as their sources are edited."""
+    keys = {definition.name: sprite_cache_key(definition)
+            for definition in select_sprites(discover_sprites(), args.only)}
+
+    def rebuild(changed):
+        all_sprites = discover_sprites()
+        sprites = select_sprites(all_sprites, args.only)
+        new_keys = {definition.name: sprite_cache_key(definition) for definition in sprites}
+        stale = [definition for definition in sprites if new_keys[definition.name] != keys.get(definition.name)]
+        keys.clear()
+        keys.update(new_keys)
+        if not stale:
+            print("[watch] No sprite output changed")
+            return
+        # Stay in this process: the point is to reuse the warm imports and caches
+        report_results(build_all(stale, args.output_dir, 1, cache))
+        if not args.only:
+            build_shared_outputs(all_sprites, args, cache)
+
+    watch(rebuild, args.watch_interval)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build all MerterBlaster sprite sheets.")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes to use (default: CPU count)")
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help="build only this sprite (repeatable)")
+    parser.add_argument('--output-dir', default=DEFAULT_IMAGES_DIR,
+                        help="directory to write images to (default: assets/images)")
+    parser.add_argument('--list', action='store_true',
+                        help="list discovered sprites and exit")
+    parser.add_argument('--force', action='store_true',
+                        help="rebuild every sprite even if the cache says it is up to date")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="build without reading or updating the build cache")
+    parser.add_argument('--cache-dir', default=None,
+                        help="build cache location (default: .sprite-cache in the repo root)")
+    parser.add_argument('--prune-cache', action='store_true',
+                        help="remove cached builds that no current sprite uses and exit")
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_TRACE_PATH, default=None, metavar='TRACE',
+                        help=f"record per-stage timing and memory, write a Chrome trace "
+                             f"(default: {DEFAULT_TRACE_PATH}) and print a summary")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and rebuild sprites whose generator or spec changes")
+    parser.add_argument('--watch-interval', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help=f"how often --watch polls for changes (default: {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument('--no-atlas', action='store_true',
+                        help="skip packing the texture atlases")
+    parser.add_argument('--no-bundle', action='store_true',
+                        help="skip writing the memory-mappable sprite bundle")
+    parser.add_argument('--bundle-path', default=DEFAULT_BUNDLE_PATH, metavar='PATH',
+                        help="where to write the sprite bundle, a tooling file kept out of the deployed "
+                             "assets (default: .sprite-cache/sprites.mbsb in the repo root)")
+    parser.add_argument('--no-collision', action='store_true',
+                        help="skip writing the per-frame collision data")
+    parser.add_argument('--no-precache', action='store_true',
+                        help="skip writing content-hashed copies and the service worker precache manifest")
+    parser.add_argument('--precache-manifest', default=DEFAULT_PRECACHE_PATH, metavar='PATH',
+                        help="where to write the precache manifest (default: precache-manifest.js in the repo root)")
+    parser.add_argument('--previews', nargs='?', const=DEFAULT_PREVIEW_DIR, default=None, metavar='DIR',
+                        help="also write animated previews of every animation "
+                             "(default: sprite-previews in the repo root)")
+    parser.add_argument('--preview-formats', type=parse_formats, default=('apng',), metavar='FORMATS',
+                        help=f"comma-separated preview formats: {', '.join(PREVIEW_FORMATS)} (default: apng)")
+    parser.add_argument('--atlas-max-size', type=int, default=DEFAULT_MAX_SIZE,
+                        help=f"largest atlas edge in pixels (default: {DEFAULT_MAX_SIZE})")
+    parser.add_argument('--no-atlas-trim', action='store_true',
+                        help="pack whole frames instead of cropping them to their opaque pixels")
+    parser.add_argument('--atlas-scales', type=parse_scales, default=DEFAULT_SCALES, metavar='N,N',
+                        help=f"integer scales to pre-render atlases at "
+                             f"(default: {','.join(map(str, DEFAULT_SCALES))}; '' for none)")
+    parser.add_argument('--atlas-crt-scales', type=parse_scales, default=(), metavar='N,N',
+                        help="scales to also write CRT-filtered atlases at (default: none)")
+    args = parser.parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    sprites = discover_sprites()
+
+    if args.list:
+        for definition in sprites:
+            print(f"{definition.name}: {definition.num_frames} frames of "
+                  f"{definition.frame_width}x{definition.frame_height} ({definition.module})")
+        return 0
+
+    if args.profile:
+        profiling.enable()
+
+    cache = None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_dir) if args.cache_dir else BuildCache()
+
+    if args.prune_cache:
+        if cache is None:
+            print("--prune-cache cannot be combined with --no-cache", file=sys.stderr)
+            return 2
+        removed = prune_cache(sprites, cache)
+        print(f"Pruned {removed} cached build(s) from {cache.cache_dir}")
+        return 0
+
+    all_sprites = sprites
+    try:
+        sprites = select_sprites(sprites, args.only)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    print(f"Building {len(sprites)} sprite(s)...")
+    start = time.perf_counter()
+    report_results(build_all(sprites, args.output_dir, args.jobs, cache, args.force))
+
+    # The shared outputs cover every sprite, so only a full build rewrites them
+    if not args.only:
+        build_shared_outputs(all_sprites, args, cache)
+    print(f"Sprite build complete in {time.perf_counter() - start:.2f}s")
+
+    if args.profile:
+        events = drain_events()
+        profiling.write_chrome_trace(args.profile, events)
+        print()
+        print(profiling.summary_table(events))
+        print(f"\nWrote Chrome trace to {args.profile}")
+
+    if args.watch:
+        watch_sprites(args, cache)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
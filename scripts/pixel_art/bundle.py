@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable binary bundle of every MerterBlaster sprite frame.
+Tools that need sprite pixels (collision baking, atlas packing, diffing,
+validation) would otherwise decode each PNG through Pillow. A full build
+writes sprites.mbsb once and readers mmap it: every frame is returned as a
+zero-copy read-only NumPy view of its raw indices. The game never loads it,
+so it is written to the build cache directory (.sprite-cache/ in the repo
+root) rather than assets/, which is published as is.
+
+Layout (little-endian; every section and pixel plane starts on a 64-byte
+boundary):
+
+    header       BUNDLE_HEADER
+    sprites      sprite_count * SPRITE_RECORD
+    frames       frame_count * FRAME_RECORD
+    palettes     palette_count * 768 bytes of RGB (the full named palettes)
+    names        UTF-8 strings referenced by (offset, length) pairs
+    pixels       one width * height uint8 plane per frame, row-major
+
+Indices are those of the sprite's full named palette (see palettes.py), so
+index 0 is the transparent background as everywhere else in the pipeline.
+
+Usage:
+    python scripts/pixel_art/bundle.py [BUNDLE] [--verify [--images-dir DIR]]
+"""
+
+import argparse
+from dataclasses import dataclass
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+from PIL import Image
+
+from build_cache import DEFAULT_CACHE_DIR
+from encoders import restore_palette
+from palettes import flat_palette
+from sprites import DEFAULT_IMAGES_DIR
+
+BUNDLE_MAGIC = b'MBSB'
+BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_FILENAME = 'sprites.mbsb'
+DEFAULT_BUNDLE_PATH = os.path.join(DEFAULT_CACHE_DIR, DEFAULT_BUNDLE_FILENAME)
+ALIGNMENT = 64
+PALETTE_SIZE = 768
+
+# magic, version, sprite/frame/palette counts, section offsets, names size
+BUNDLE_HEADER = struct.Struct('<4sHxxIIIIIIIII')
+# name, palette name and animation (offset, length each), palette index,
+# first frame, frame count, frame width, height, frame duration in ms
+SPRITE_RECORD = struct.Struct('<IIIIIIIIIHHI')
+# pixel offset, width, height, sprite index, frame number
+FRAME_RECORD = struct.Struct('<QHHII')
+# The same record as a NumPy dtype, so readers view the whole table at once
+FRAME_DTYPE = np.dtype([('offset', '<u8'), ('width', '<u2'), ('height', '<u2'),
+                        ('sprite', '<u4'), ('frame', '<u4')])
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+@dataclass(frozen=True)
+class BundleSprite:
+    """One sprite's entry in a bundle."""
+    name: str
+    palette: str
+    animation: str
+    frame_width: int
+    frame_height: int
+    num_frames: int
+    frame_duration_ms: int
+    first_frame: int
+    palette_index: int
+
+def sheet_frames(definition, images_dir=DEFAULT_IMAGES_DIR):
+    """Decode a built sheet and return its frames as (h, w) index arrays."""
+    with Image.open(os.path.join(images_dir, definition.sheet_filename)) as image:
+        sheet = np.asarray(restore_palette(image, definition.palette))
+    return [sheet[:, frame * definition.frame_width:(frame + 1) * definition.frame_width]
+            for frame in range(definition.num_frames)]
+
+def encode_bundle(sprites):
+    """Serialize [(definition, [frame arrays])] into bundle bytes."""
+    names = bytearray()
+
+    def name_ref(text):
+        data = text.encode('utf-8')
+        offset = len(names)
+        names.extend(data)
+        return offset, len(data)
+
+    palettes = []
+    sprite_records = []
+    frame_shapes = []
+    for sprite_index, (definition, frames) in enumerate(sprites):
+        if definition.palette not in palettes:
+            palettes.append(definition.palette)
+        sprite_records.append(SPRITE_RECORD.pack(
+            *name_ref(definition.name), *name_ref(definition.palette), *name_ref(definition.animation),
+            palettes.index(definition.palette), len(frame_shapes), len(frames),
+            definition.frame_width, definition.frame_height, definition.frame_duration_ms))
+        frame_shapes.extend((sprite_index, frame, array) for frame, array in enumerate(frames))
+
+    sprites_offset = _align(BUNDLE_HEADER.size)
+    frames_offset = _align(sprites_offset + SPRITE_RECORD.size * len(sprite_records))
+    palettes_offset = _align(frames_offset + FRAME_RECORD.size * len(frame_shapes))
+    names_offset = _align(palettes_offset + PALETTE_SIZE * len(palettes))
+    pixels_offset = _align(names_offset + len(names))
+
+    frame_records = []
+    pixel_offsets = []
+    offset = pixels_offset
+    for sprite_index, frame, array in frame_shapes:
+        height, width = array.shape
+        frame_records.append(FRAME_RECORD.pack(offset, width, height, sprite_index, frame))
+        pixel_offsets.append(offset)
+        offset = _align(offset + width * height)
+
+    data = bytearray(offset)
+    data[:BUNDLE_HEADER.size] = BUNDLE_HEADER.pack(
+        BUNDLE_MAGIC, BUNDLE_VERSION, len(sprite_records), len(frame_records), len(palettes),
+        sprites_offset, frames_offset, palettes_offset, names_offset, pixels_offset, len(names))
+    data[sprites_offset:sprites_offset + SPRITE_RECORD.size * len(sprite_records)] = b''.join(sprite_records)
+    data[frames_offset:frames_offset + FRAME_RECORD.size * len(frame_records)] = b''.join(frame_records)
+    for index, palette in enumerate(palettes):
+        start = palettes_offset + index * PALETTE_SIZE
+        data[start:start + PALETTE_SIZE] = flat_palette(palette)
+    data[names_offset:names_offset + len(names)] = names
+    for start, (_, _, array) in zip(pixel_offsets, frame_shapes):
+        data[start:start + array.size] = np.ascontiguousarray(array, dtype=np.uint8).tobytes()
+    return bytes(data)
+
+def build_bundle(definitions, images_dir=DEFAULT_IMAGES_DIR, path=DEFAULT_BUNDLE_PATH):
+    """Write the bundle for the built sheets of definitions to path and return it.
+
+    The file is replaced atomically, so readers holding the old one mapped
+    keep a consistent view; it is left untouched if nothing changed.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = encode_bundle([(definition, sheet_frames(definition, images_dir)) for definition in definitions])
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return path
+    except OSError:
+        pass
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+class SpriteBundle:
+    """Read-only mmap view of a sprite bundle.
+
+    Usage:
+        with SpriteBundle(path) as bundle:
+            for array in bundle.frames('zapper'):
+                ...
+
+    Arrays returned by frame(), frames() and palette() are views of the
+    mapping. If any are still alive at close(), the mapping stays open until
+    the last of them is garbage collected.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        if len(self._map) < BUNDLE_HEADER.size:
+            raise ValueError("Not a sprite bundle")
+        (magic, version, sprite_count, frame_count, palette_count, sprites_offset, frames_offset,
+         self._palettes_offset, names_offset, _, names_size) = BUNDLE_HEADER.unpack_from(self._map)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError("Not a sprite bundle (or an unsupported version)")
+        names = self._map[names_offset:names_offset + names_size]
+
+        def text(offset, length):
+            return names[offset:offset + length].decode('utf-8')
+
+        self.sprites = {}
+        for index in range(sprite_count):
+            (name_offset, name_length, palette_offset, palette_length, animation_offset, animation_length,
+             palette_index, first_frame, num_frames, width, height, duration) = SPRITE_RECORD.unpack_from(
+                self._map, sprites_offset + index * SPRITE_RECORD.size)
+            name = text(name_offset, name_length)
+            self.sprites[name] = BundleSprite(name, text(palette_offset, palette_length),
+                                              text(animation_offset, animation_length), width, height,
+                                              num_frames, duration, first_frame, palette_index)
+        self._frames = np.frombuffer(self._map, dtype=FRAME_DTYPE, count=frame_count, offset=frames_offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is None:
+            return
+        self._frames = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Views are still exported; they keep the mapping alive
+        self._map = None
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def __iter__(self):
+        return iter(self.sprites)
+
+    def frame(self, name, frame):
+        """Zero-copy (h, w) uint8 view of one frame's palette indices."""
+        sprite = self.sprites[name]
+        if not 0 <= frame < sprite.num_frames:
+            raise IndexError(f"Sprite '{name}' has {sprite.num_frames} frames, not {frame + 1}")
+        offset, width, height, _, _ = self._frames[sprite.first_frame + frame]
+        array = np.frombuffer(self._map, dtype=np.uint8, count=int(width) * int(height), offset=int(offset))
+        return array.reshape(int(height), int(width))
+
+    def frames(self, name):
+        """Views of every frame of a sprite, in order."""
+        return [self.frame(name, frame) for frame in range(self.sprites[name].num_frames)]
+
+    def palette(self, name):
+        """Zero-copy (256, 3) uint8 view of a sprite's palette."""
+        index = self.sprites[name].palette_index
+        return np.frombuffer(self._map, dtype=np.uint8, count=PALETTE_SIZE,
+                             offset=self._palettes_offset + index * PALETTE_SIZE).reshape(256, 3)
+
+    def frame_image(self, name, frame):
+        """A 'P' image of one frame (a copy, with the sprite's palette)."""
+        image = Image.fromarray(np.array(self.frame(name, frame)), 'P')
+        image.putpalette(self.palette(name).tobytes())
+        return image
+
+def verify_bundle(bundle, definitions, images_dir=DEFAULT_IMAGES_DIR):
+    """Compare a bundle with the built sheets; return a list of mismatch messages."""
+    problems = []
+    for definition in definitions:
+        if definition.name not in bundle.sprites:
+            problems.append(f"{definition.name}: missing from the bundle")
+            continue
+        for frame, expected in enumerate(sheet_frames(definition, images_dir)):
+            if frame >= bundle.sprites[definition.name].num_frames:
+                problems.append(f"{definition.name}: frame {frame} missing from the bundle")
+            elif not np.array_equal(bundle.frame(definition.name, frame), expected):
+                problems.append(f"{definition.name}: frame {frame} differs from {definition.sheet_filename}")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or verify a MerterBlaster sprite bundle.")
+    parser.add_argument('bundle', nargs='?', default=DEFAULT_BUNDLE_PATH,
+                        help=f"bundle to read (default: .sprite-cache/{DEFAULT_BUNDLE_FILENAME} in the repo root)")
+    parser.add_argument('--verify', action='store_true',
+                        help="check every frame against the built PNG sheets")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR,
+                        help="directory holding the sheets for --verify (default: assets/images)")
+    args = parser.parse_args(argv)
+
+    with SpriteBundle(args.bundle) as bundle:
+        for sprite in bundle.sprites.values():
+            print(f"{sprite.name}: {sprite.num_frames} frames of {sprite.frame_width}x{sprite.frame_height} "
+                  f"({sprite.palette} palette, {sprite.animation})")
+        if not args.verify:
+            return 0
+
+        from sprites import discover_sprites
+        definitions = discover_sprites()
+        definitions += [variant for definition in definitions for variant in definition.variant_definitions()]
+        problems = verify_bundle(bundle, definitions, args.images_dir)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    print(f"{'FAILED' if problems else 'OK'}: {len(definitions)} sprite(s) checked")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
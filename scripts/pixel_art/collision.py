@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Per-frame collision data for MerterBlaster sprites.
+For every frame of every sheet this computes, from the rendered pixels:
+
+- aabb: tight [x, y, w, h] box around the opaque pixels (broad phase)
+- circle: [cx, cy, r] circle enclosing the box (cheapest broad phase)
+- hull: convex hull of the opaque pixels as [[x, y], ...] corner points,
+  clockwise in screen coordinates (narrow phase against bullets)
+- mask: the opaque pixels inside the aabb as base64 1-bit rows, most
+  significant bit first, each row padded to whole bytes (exact narrow phase)
+
+Coordinates are in frame pixels with the origin at the frame's top-left.
+Index 0 is the transparent background, so every other index counts as
+opaque. Everything is written to one JSON sidecar (collision.json) so the
+game never has to read pixels back with getImageData.
+
+Frames with the same opaque pixels (a boss whose outline does not change
+across its phase frames, say) share one entry: the sidecar holds a 'shapes'
+table, and each sprite lists one shape index per frame, or null for a frame
+with no opaque pixels.
+"""
+
+import base64
+import hashlib
+import math
+import os
+
+import numpy as np
+from PIL import Image
+
+from encoders import restore_palette
+from sprites import DEFAULT_IMAGES_DIR, write_json_if_changed
+
+COLLISION_VERSION = 2
+DEFAULT_COLLISION_FILENAME = 'collision.json'
+
+def opacity_mask(frame_img):
+    """Boolean (h, w) array, True where the frame is not background."""
+    return np.asarray(frame_img) != 0
+
+def bounding_box(mask):
+    """Tight [x, y, w, h] around the True pixels, or None for an empty mask."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return [int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)]
+
+def pack_mask(mask, box):
+    """Pack the mask inside box into base64 1-bit rows (MSB first)."""
+    x, y, w, h = box
+    return base64.b64encode(np.packbits(mask[y:y + h, x:x + w], axis=1).tobytes()).decode('ascii')
+
+def unpack_mask(data, width, height):
+    """Inverse of pack_mask: return a (height, width) boolean array."""
+    packed = np.frombuffer(base64.b64decode(data), dtype=np.uint8).reshape(height, -1)
+    return np.unpackbits(packed, axis=1, count=width).astype(bool)
+
+def _cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def convex_hull(mask):
+    """Convex hull of the True pixels, as pixel-corner points.
+
+    Only the outer corners of each row's leftmost and rightmost pixels can be
+    hull vertices, so the hull is built from at most four points per row with
+    Andrew's monotone chain. Collinear points are dropped.
+    """
+    points = set()
+    for y in np.flatnonzero(mask.any(axis=1)):
+        cols = np.flatnonzero(mask[y])
+        left, right = int(cols[0]), int(cols[-1]) + 1
+        y = int(y)
+        points.update([(left, y), (left, y + 1), (right, y), (right, y + 1)])
+    points = sorted(points)
+    if len(points) <= 2:
+        return [list(point) for point in points]
+
+    lower, upper = [], []
+    for point in points:
+        while len(lower) >= 2 and _cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    for point in reversed(points):
+        while len(upper) >= 2 and _cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return [list(point) for point in lower[:-1] + upper[:-1]]
+
+def bounding_circle(box):
+    """[cx, cy, r] circle around the box, rounded outward to 0.5 pixels."""
+    x, y, w, h = box
+    radius = math.ceil(math.hypot(w, h)) / 2
+    return [x + w / 2, y + h / 2, radius]
+
+def frame_collision(frame_img):
+    """Collision data for one frame (image or index array), or None if it has no opaque pixels."""
+    return mask_collision(opacity_mask(frame_img))
+
+def mask_collision(mask):
+    """Collision data for an opacity mask, or None if it is empty."""
+    box = bounding_box(mask)
+    if box is None:
+        return None
+    return {
+        'aabb': box,
+        'circle': bounding_circle(box),
+        'hull': convex_hull(mask),
+        'mask': pack_mask(mask, box),
+    }
+
+def collision_data(definitions, images_dir=DEFAULT_IMAGES_DIR, bundle=None):
+    """Build the collision sidecar for the built sheets of definitions.
+
+    With bundle (an open SpriteBundle, see bundle.py) frames are read from
+    its mapped pixel planes instead of decoding the PNGs. Identical masks are
+    hashed and computed once; every frame showing one refers to the same
+    entry of the shapes table.
+    """
+    shapes = []
+    shape_indices = {}
+    sprites = {}
+    for definition in definitions:
+        if bundle is not None:
+            frames = bundle.frames(definition.name)
+        else:
+            with Image.open(os.path.join(images_dir, definition.sheet_filename)) as image:
+                sheet = restore_palette(image, definition.palette)
+            frames = []
+            for frame in range(definition.num_frames):
+                left = frame * definition.frame_width
+                frames.append(sheet.crop((left, 0, left + definition.frame_width, definition.frame_height)))
+        indices = []
+        for frame in frames:
+            mask = opacity_mask(frame)
+            key = (mask.shape, hashlib.sha1(np.packbits(mask)).digest())
+            if key not in shape_indices:
+                shape = mask_collision(mask)
+                shape_indices[key] = None if shape is None else len(shapes)
+                if shape is not None:
+                    shapes.append(shape)
+            indices.append(shape_indices[key])
+        sprites[definition.name] = {
+            'frameWidth': definition.frame_width,
+            'frameHeight': definition.frame_height,
+            'frames': indices,
+        }
+    return {'version': COLLISION_VERSION, 'shapes': shapes, 'sprites': sprites}
+
+def build_collision_data(definitions, images_dir=DEFAULT_IMAGES_DIR, filename=DEFAULT_COLLISION_FILENAME,
+                         bundle=None):
+    """Write the collision sidecar and return its path."""
+    path = os.path.join(images_dir, filename)
+    write_json_if_changed(collision_data(definitions, images_dir, bundle), path, compact=True)
+    return path
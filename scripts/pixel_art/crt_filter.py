@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Shared CRT filter for MerterBlaster sprite previews.
+Simulates scanlines and horizontal pixel bleed on whole NumPy arrays instead of
+walking pixels one at a time, so full atlases and upscaled sheets filter quickly.
+With the default settings the output is byte-identical to the original
+per-pixel apply_crt_filter from the sprite generator scripts.
+
+write_crt_png streams the filter instead: it converts, filters and encodes the
+image one band of rows at a time, so peak memory depends on the band size and
+image width rather than the height. Bleed only runs along a row, so bands need
+no state from each other beyond the scanline parity of their first row.
+
+Requires Pillow and NumPy.
+
+Usage:
+    python scripts/pixel_art/crt_filter.py INPUT.png OUTPUT.png [--band-height N]
+"""
+
+import argparse
+import sys
+
+from PIL import Image
+import numpy as np
+
+from png_stream import StreamingPngWriter
+
+# Defaults match the original per-pixel filter
+DEFAULT_SCANLINE_DARKEN = 0.9
+DEFAULT_BLEED_RADIUS = 1
+DEFAULT_BAND_HEIGHT = 256
+
+def scanline_lut(scanline_darken=DEFAULT_SCANLINE_DARKEN):
+    """Build the 256-entry channel LUT applied to darkened (even) scanlines.
+
+    Uses the same float multiply and truncation as int(value * darken) so
+    results match the scalar filter exactly.
+    """
+    if not 0.0 <= scanline_darken <= 1.0:
+        raise ValueError(f"scanline_darken must be between 0 and 1, got {scanline_darken}")
+    values = np.arange(256, dtype=np.float64) * scanline_darken
+    return values.astype(np.uint8)
+
+def crt_filter_rows(rgb, first_row=0, scanline_darken=DEFAULT_SCANLINE_DARKEN,
+                    bleed_radius=DEFAULT_BLEED_RADIUS, lut=None):
+    """Apply the CRT effect to an (h, w, 3) uint8 array of RGB rows.
+
+    first_row is the row index of rgb[0] within the full image, so scanline
+    parity stays correct when an image is filtered in bands.
+    Returns a new (h, w, 3) uint8 array.
+    """
+    if bleed_radius < 0:
+        raise ValueError(f"bleed_radius must be >= 0, got {bleed_radius}")
+    if lut is None:
+        lut = scanline_lut(scanline_darken)
+
+    width = rgb.shape[1]
+    out = rgb.copy()
+
+    # Scanline effect (every other line slightly darker, starting at row 0)
+    start = first_row % 2
+    out[start::2] = lut[rgb[start::2]]
+
+    # Pixel bleed: each pixel picks up the undarkened colour of its left
+    # neighbours, falling off with distance (radius 1 adds left // 8).
+    # Sums saturate at 255 like Pillow's pixel access did. Beyond 31 pixels
+    # the divisor exceeds 255 so further neighbours contribute nothing.
+    for distance in range(1, min(bleed_radius, width - 1, 31) + 1):
+        bleed = rgb[:, :-distance] // np.uint8(8 * distance)
+        target = out[:, distance:]
+        np.minimum(target, 255 - bleed, out=target)
+        target += bleed
+
+    return out
+
+def apply_crt_filter(image, scanline_darken=DEFAULT_SCANLINE_DARKEN,
+                     bleed_radius=DEFAULT_BLEED_RADIUS):
+    """Apply a simple CRT filter to simulate scanlines and pixel bleed.
+
+    scanline_darken is the brightness multiplier for even rows (1.0 disables
+    scanlines) and bleed_radius is how many pixels to the left bleed into each
+    pixel (0 disables bleed).
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    rgb = np.asarray(image)
+    crt = crt_filter_rows(rgb, 0, scanline_darken, bleed_radius)
+    return Image.fromarray(crt, 'RGB')
+
+def _band_rgb(image, top, bottom, palette):
+    """Return rows top..bottom of image as an (h, w, 3) uint8 array."""
+    band = image.crop((0, top, image.width, bottom))
+    if palette is not None:
+        return palette[np.asarray(band)]
+    if band.mode != 'RGB':
+        band = band.convert('RGB')
+    return np.asarray(band)
+
+def _rgb_palette(image):
+    """(256, 3) lookup table for a 'P' image, else None."""
+    if image.mode != 'P':
+        return None
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    entries = np.frombuffer(bytes(image.getpalette('RGB')), dtype=np.uint8).reshape(-1, 3)
+    palette[:len(entries)] = entries
+    return palette
+
+def iter_crt_bands(image, band_height=DEFAULT_BAND_HEIGHT, scanline_darken=DEFAULT_SCANLINE_DARKEN,
+                   bleed_radius=DEFAULT_BLEED_RADIUS):
+    """Yield (top, rows) for consecutive CRT-filtered bands of image.
+
+    Only one band is converted to RGB at a time; indexed images are expanded
+    through their palette rather than converting the whole image.
+    """
+    if band_height < 1:
+        raise ValueError(f"band_height must be >= 1, got {band_height}")
+    lut = scanline_lut(scanline_darken)
+    palette = _rgb_palette(image)
+    for top in range(0, image.height, band_height):
+        bottom = min(top + band_height, image.height)
+        rgb = _band_rgb(image, top, bottom, palette)
+        yield top, crt_filter_rows(rgb, top, scanline_darken, bleed_radius, lut)
+
+def write_crt_png(image, path, band_height=DEFAULT_BAND_HEIGHT,
+                  scanline_darken=DEFAULT_SCANLINE_DARKEN, bleed_radius=DEFAULT_BLEED_RADIUS):
+    """Filter image and write it to path as an RGB PNG, one band at a time.
+
+    The pixels match apply_crt_filter(image); the file bytes differ from
+    Pillow's encoder.
+    """
+    with StreamingPngWriter(path, image.width, image.height, 'RGB') as writer:
+        for _, rows in iter_crt_bands(image, band_height, scanline_darken, bleed_radius):
+            writer.write_rows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a CRT-filtered preview of an image.")
+    parser.add_argument('input', help="source image (e.g. an atlas page)")
+    parser.add_argument('output', help="PNG file to write")
+    parser.add_argument('--band-height', type=int, default=DEFAULT_BAND_HEIGHT,
+                        help=f"rows filtered and encoded at a time (default: {DEFAULT_BAND_HEIGHT})")
+    parser.add_argument('--scanline-darken', type=float, default=DEFAULT_SCANLINE_DARKEN,
+                        help=f"brightness of darkened scanlines (default: {DEFAULT_SCANLINE_DARKEN})")
+    parser.add_argument('--bleed-radius', type=int, default=DEFAULT_BLEED_RADIUS,
+                        help=f"pixels of horizontal bleed (default: {DEFAULT_BLEED_RADIUS})")
+    args = parser.parse_args(argv)
+
+    with Image.open(args.input) as image:
+        write_crt_png(image, args.output, args.band_height, args.scanline_darken, args.bleed_radius)
+    print(f"Saved {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Output encoders for MerterBlaster sprite images.
+Sheets only use a few dozen of their palette's 256 entries, so trim_palette
+remaps them to the indices they actually use. Pillow then writes a PLTE (and
+tRNS, when the image has transparency) with just those entries and picks the
+smallest bit depth that holds them. RGB images with at most 256 colors, such
+as CRT previews of small sheets, are stored losslessly as indexed images.
+
+Lossless WebP and a raw indexed format (header, palette, zlib-compressed
+indices) are available for comparison; run this script to report encoded
+size and decode time per format for the built images.
+
+Usage:
+    python scripts/pixel_art/encoders.py [IMAGE ...] [--write]
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from palettes import flat_palette
+
+# Raw indexed format: magic, version, width, height, palette size, then
+# palette_size * 3 RGB bytes and the zlib-compressed row-major indices
+RAW_MAGIC = b'MBIX'
+RAW_VERSION = 1
+RAW_HEADER = struct.Struct('<4sBHHH')
+RAW_EXTENSION = '.mbix'
+
+def _palette_bytes(image):
+    palette = bytes(image.getpalette('RGB'))
+    return palette + bytes(768 - len(palette))
+
+def trim_palette(image):
+    """Remap a 'P' image to the palette entries it uses, in index order.
+
+    Index 0 stays 0 when it is used, so the black background keeps its slot.
+    Colors and transparency are unchanged.
+    """
+    indices = np.asarray(image)
+    used = np.flatnonzero(np.bincount(indices.ravel(), minlength=256))
+    lut = np.zeros(256, dtype=np.uint8)
+    lut[used] = np.arange(len(used), dtype=np.uint8)
+
+    trimmed = Image.fromarray(lut[indices], 'P')
+    palette = np.frombuffer(_palette_bytes(image), dtype=np.uint8).reshape(256, 3)
+    trimmed.putpalette(palette[used].tobytes())
+
+    transparency = image.info.get('transparency')
+    if isinstance(transparency, int):
+        if transparency in used:
+            trimmed.info['transparency'] = int(lut[transparency])
+    elif isinstance(transparency, bytes):
+        alpha = np.full(256, 255, dtype=np.uint8)
+        alpha[:len(transparency)] = np.frombuffer(transparency, dtype=np.uint8)
+        trimmed.info['transparency'] = alpha[used].tobytes()
+    return trimmed
+
+def restore_palette(image, palette_name):
+    """Map a trimmed 'P' image back onto the indices of a named palette.
+
+    Each trimmed entry maps to the first palette index with the same color,
+    so the pixels are unchanged. Raises ValueError for colors the palette
+    does not contain.
+    """
+    full = np.frombuffer(flat_palette(palette_name), dtype=np.uint8).reshape(256, 3)
+    trimmed = np.frombuffer(_palette_bytes(image), dtype=np.uint8).reshape(256, 3)
+    indices = np.asarray(image)
+    used = np.flatnonzero(np.bincount(indices.ravel(), minlength=256))
+
+    lut = np.zeros(256, dtype=np.uint8)
+    for index in used:
+        matches = np.flatnonzero((full == trimmed[index]).all(axis=1))
+        if not len(matches):
+            raise ValueError(f"Color {tuple(trimmed[index])} is not in the '{palette_name}' palette")
+        lut[index] = matches[0]
+
+    restored = Image.fromarray(lut[indices], 'P')
+    restored.putpalette(flat_palette(palette_name))
+    return restored
+
+def reduce_colors(image):
+    """Return an RGB image as a trimmed 'P' image if it has at most 256 colors.
+
+    Other images are returned unchanged.
+    """
+    if image.mode != 'RGB':
+        return image
+    rgb = np.asarray(image)
+    # Pack colors into one integer each so np.unique works on a flat array
+    packed = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    colors, inverse = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return image
+
+    indexed = Image.fromarray(inverse.reshape(packed.shape).astype(np.uint8), 'P')
+    palette = np.stack([colors >> 16, (colors >> 8) & 0xff, colors & 0xff], axis=1).astype(np.uint8)
+    indexed.putpalette(palette.tobytes())
+    return indexed
+
+def encode_png(image, optimize=True):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=optimize)
+    return buffer.getvalue()
+
+def encode_png_trimmed(image):
+    """PNG with a trimmed palette (indexed) or reduced colors (RGB)."""
+    image = trim_palette(image) if image.mode == 'P' else reduce_colors(image)
+    return encode_png(image)
+
+def encode_webp(image):
+    """Lossless WebP at the slowest, smallest compression setting."""
+    buffer = io.BytesIO()
+    image.convert('RGBA' if 'transparency' in image.info else 'RGB').save(
+        buffer, format='WEBP', lossless=True, quality=100, method=6)
+    return buffer.getvalue()
+
+def encode_raw(image):
+    """Raw indexed variant: header, trimmed palette and zlib-compressed indices."""
+    if image.mode != 'P':
+        image = reduce_colors(image)
+        if image.mode != 'P':
+            raise ValueError("Raw indexed encoding needs at most 256 colors")
+    image = trim_palette(image)
+    palette = bytes(image.getpalette('RGB'))
+    header = RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, image.width, image.height, len(palette) // 3)
+    return header + palette + zlib.compress(image.tobytes(), 9)
+
+def decode_raw(data):
+    """Decode encode_raw output to (indices (h, w) uint8 array, (n, 3) palette)."""
+    magic, version, width, height, colors = RAW_HEADER.unpack_from(data)
+    if magic != RAW_MAGIC or version != RAW_VERSION:
+        raise ValueError("Not a raw indexed sprite")
+    offset = RAW_HEADER.size
+    palette = np.frombuffer(data, dtype=np.uint8, count=colors * 3, offset=offset).reshape(colors, 3)
+    indices = np.frombuffer(zlib.decompress(data[offset + colors * 3:]), dtype=np.uint8)
+    return indices.reshape(height, width), palette
+
+def _decode_pillow(data):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+
+# name -> (encoder, decoder, file extension)
+FORMATS = {
+    'png': (lambda image: encode_png(image, optimize=False), _decode_pillow, '.png'),
+    'png-trimmed': (encode_png_trimmed, _decode_pillow, '.png'),
+    'webp': (encode_webp, _decode_pillow, '.webp'),
+    'raw': (encode_raw, decode_raw, RAW_EXTENSION),
+}
+
+def _best_time(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def format_report(image, formats=FORMATS):
+    """Return {format: (encoded_bytes, decode_seconds, data)} for image."""
+    report = {}
+    for name, (encoder, decoder, _) in formats.items():
+        try:
+            data = encoder(image)
+        except ValueError:
+            continue
+        report[name] = (len(data), _best_time(lambda: decoder(data)), data)
+    return report
+
+def default_images(images_dir=None):
+    if images_dir is None:
+        from sprites import DEFAULT_IMAGES_DIR
+        images_dir = DEFAULT_IMAGES_DIR
+    return sorted(os.path.join(images_dir, name) for name in os.listdir(images_dir) if name.endswith('.png'))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare encoded size and decode time of sprite images.")
+    parser.add_argument('images', nargs='*', help="images to encode (default: every PNG in assets/images)")
+    parser.add_argument('--write', action='store_true',
+                        help="write the WebP and raw variants next to each image")
+    args = parser.parse_args(argv)
+
+    paths = args.images or default_images()
+    print(f"{'image':<28} {'format':<12} {'bytes':>8} {'vs png':>7} {'decode us':>10}")
+    for path in paths:
+        with Image.open(path) as image:
+            image.load()
+        report = format_report(image)
+        baseline = report['png'][0]
+        for name, (size, decode_seconds, data) in report.items():
+            print(f"{os.path.basename(path):<28} {name:<12} {size:>8} {size / baseline:>7.0%} "
+                  f"{decode_seconds * 1e6:>10.1f}")
+            if args.write and name in ('webp', 'raw'):
+                with open(os.path.splitext(path)[0] + FORMATS[name][2], 'wb') as f:
+                    f.write(data)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
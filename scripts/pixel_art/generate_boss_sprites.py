@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Generate prerendered MerterBlaster boss sprite sheets.
+Bakes the five bosses of bosses.js (The Sentinel, Vortex Core, Artillery
+Fortress, Laser Nexus, Curtain Wall) into indexed sheets so the game can blit
+them instead of drawing ellipse/arc paths every frame.
+
+Each boss sheet has PHASES x STEPS frames: frame phase * STEPS + step shows
+the boss in health phase 0-2 (intact, damaged, critical) at animation step
+0-7 (rotating rings, sweeping turrets, pulsing core). Frames are composited
+from memoized parts (see boss_parts.py), so each part is drawn once per
+palette and state and reused by every frame, phase and boss that shows it.
+
+Weak points are destroyed one by one in play, so they are separate pulsing
+sheets, one per radius and color, drawn over the sockets baked into the boss.
+"""
+
+import math
+
+from boss_parts import paste_part
+from build_cache import BuildCache
+from sprites import SpriteDefinition, build_all
+
+PHASES = 3
+STEPS = 8
+FRAME_DURATION_MS = 80
+PALETTE = 'boss'
+TURRET_SWEEP = 25  # Degrees either side of straight down
+# EGA indices of the weak point colors in bosses.js
+WEAK_POINT_COLORS = {12: 'red', 14: 'yellow', 11: 'cyan', 13: 'magenta'}
+
+def boss_params(ramp, width, height, core=0, ring=None, turrets=(), plates=(), weak_points=()):
+    """Boss layout as a hashable, JSON-friendly tuple of pairs, sorted by name.
+
+    ring is (radius, spokes); turrets are (x, y, barrel length); plates are
+    (x, y, width, height); weak_points are (x, y, radius, EGA color), all
+    offsets from the frame centre.
+    """
+    params = {
+        'ramp': ramp,
+        'width': width,
+        'height': height,
+        'core': core,
+        'ring': ring,
+        'turrets': tuple(turrets),
+        'plates': tuple(plates),
+        'weak_points': tuple(weak_points),
+    }
+    return tuple(sorted(params.items()))
+
+# Sizes, colors and weak points follow BOSS_DEFINITIONS in bosses.js
+BOSSES = {
+    'sentinel': boss_params('sentinel', 80, 60, core=14, turrets=((-26, 8, 8), (26, 8, 8)),
+                            plates=((-14, 20, 14, 7), (14, 20, 14, 7)), weak_points=((0, -20, 15, 12),)),
+    'vortex': boss_params('vortex', 100, 100, core=20, ring=(46, 6),
+                          plates=((0, -32, 16, 8), (0, 32, 16, 8)),
+                          weak_points=((-30, 0, 12, 14), (30, 0, 12, 14))),
+    'artillery': boss_params('artillery', 120, 80, core=12, turrets=((-20, 6, 10), (0, 12, 10), (20, 6, 10)),
+                             plates=((-44, -6, 16, 10), (44, -6, 16, 10), (-24, -22, 18, 8), (24, -22, 18, 8)),
+                             weak_points=((-40, 20, 10, 11), (40, 20, 10, 11), (0, -30, 15, 13))),
+    'nexus': boss_params('nexus', 90, 90, ring=(40, 4), turrets=((0, 28, 8),),
+                         weak_points=((0, 0, 20, 12),)),
+    'curtain': boss_params('curtain', 140, 60, core=10,
+                           turrets=((-50, 16, 8), (-20, 16, 8), (20, 16, 8), (50, 16, 8)),
+                           plates=tuple((x, -10, 20, 12) for x in (-48, -24, 0, 24, 48))),
+}
+
+def draw_boss_frame(params, draw, frame_num, width, height):
+    """Composite one boss frame (phase frame_num // STEPS, step frame_num % STEPS) from parts."""
+    boss = dict(params)
+    ramp = boss['ramp']
+    damage, step = divmod(frame_num, STEPS)
+    cycle = 2 * math.pi * step / STEPS
+    cx, cy = width // 2, height // 2
+
+    def at(x, y):
+        return (cx + x, cy + y)
+
+    paste_part(draw.image, 'hull', {'width': boss['width'], 'height': boss['height'], 'ramp': ramp,
+                                    'damage': damage}, PALETTE, (cx, cy))
+    for x, y, plate_width, plate_height in boss['plates']:
+        paste_part(draw.image, 'plate', {'width': plate_width, 'height': plate_height, 'ramp': ramp,
+                                         'damage': damage}, PALETTE, at(x, y))
+    if boss['ring']:
+        # One spoke interval per loop, faster each phase, so the cycle is seamless
+        radius, spokes = boss['ring']
+        angle = round(step * (360 / spokes) * (damage + 1) / STEPS, 1) % (360 / spokes)
+        paste_part(draw.image, 'ring', {'radius': radius, 'ramp': ramp, 'spokes': spokes, 'angle': angle,
+                                        'damage': damage}, PALETTE, (cx, cy))
+    for x, y, radius, _ in boss['weak_points']:
+        paste_part(draw.image, 'socket', {'radius': radius + 1, 'ramp': ramp}, PALETTE, at(x, y))
+    if boss['core']:
+        paste_part(draw.image, 'core', {'radius': boss['core'], 'ramp': ramp, 'pulse': round(1.5 * math.sin(cycle)),
+                                        'damage': damage}, PALETTE, (cx, cy))
+    # Rounded to 5 degrees so mirrored steps share one rendered turret
+    angle = 5 * round(TURRET_SWEEP * math.sin(cycle) / 5)
+    for x, y, length in boss['turrets']:
+        paste_part(draw.image, 'turret', {'length': length, 'angle': angle, 'damage': damage}, PALETTE, at(x, y))
+
+def draw_weak_point_frame(params, draw, frame_num, width, height):
+    """Weak point pulsing as in Boss.renderWeakPoints (radius scaled by 0.8 +/- 0.2)."""
+    weak_point = dict(params)
+    radius = weak_point['radius']
+    pulse = 0.8 + 0.2 * math.sin(2 * math.pi * frame_num / STEPS)
+    paste_part(draw.image, 'weak_point', {'size': radius, 'radius': round(radius * pulse, 1),
+                                          'color': weak_point['color']}, PALETTE, (width // 2, height // 2))
+
+def boss_definition(name, params):
+    boss = dict(params)
+    return SpriteDefinition(
+        name=f'boss_{name}',
+        module='generate_boss_sprites',
+        draw_function='draw_boss_frame',
+        frame_width=boss['width'],
+        frame_height=boss['height'],
+        num_frames=PHASES * STEPS,
+        sheet_filename=f'boss_{name}.png',
+        palette=PALETTE,
+        animation='phases',
+        frame_duration_ms=FRAME_DURATION_MS,
+        draw_args=(params,),
+        dependencies=('boss_parts',),
+    )
+
+def weak_point_definition(radius, color):
+    name = f'boss_weak_point_{radius}_{WEAK_POINT_COLORS[color]}'
+    return SpriteDefinition(
+        name=name,
+        module='generate_boss_sprites',
+        draw_function='draw_weak_point_frame',
+        frame_width=2 * radius + 1,
+        frame_height=2 * radius + 1,
+        num_frames=STEPS,
+        sheet_filename=f'{name}.png',
+        palette=PALETTE,
+        animation='pulse',
+        frame_duration_ms=FRAME_DURATION_MS,
+        draw_args=((('color', color), ('radius', radius)),),
+        dependencies=('boss_parts',),
+    )
+
+WEAK_POINTS = sorted({(radius, color) for params in BOSSES.values()
+                      for _, _, radius, color in dict(params)['weak_points']})
+
+SPRITES = ([boss_definition(name, params) for name, params in BOSSES.items()] +
+           [weak_point_definition(radius, color) for radius, color in WEAK_POINTS])
+
+def main():
+    print("Generating prerendered boss sprites...")
+
+    for definition, status, written in build_all(SPRITES, jobs=1, cache=BuildCache()):
+        if status == 'cached':
+            print(f"{definition.name} sprite sheet is up to date")
+            continue
+        for path in written:
+            print(f"Saved {definition.name} sprite sheet to {path}")
+
+    print("Boss sprite generation complete!")
+    print(f"Bosses: {', '.join(BOSSES)} ({PHASES} phases x {STEPS} steps each)")
+
+if __name__ == "__main__":
+    main()
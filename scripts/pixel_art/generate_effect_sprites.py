@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Generate MerterBlaster particle effect sprites (see particles.py).
+Produces the player explosion (8 frames), the small weapon explosion (6
+frames of 20x20) and 4-frame hit sparks for every enemy, sized to the enemy.
+Each effect's parameters and seed are stored in its SpriteDefinition, so the
+build cache rebuilds an effect exactly when its parameters or particles.py
+change.
+"""
+
+from build_cache import BuildCache
+from particles import draw_effect_frame, effect_params, effect_seed
+import generate_enemy_sprites
+import generate_spec_sprites
+from sprites import SpriteDefinition, build_all
+
+SPARK_FRAMES = 4
+SPARK_MIN_SIZE = 12
+
+def effect_definition(name, frame_size, num_frames, palette, animation, frame_duration_ms, **params):
+    """SpriteDefinition for one particle effect; params go to ParticleEffect."""
+    width, height = frame_size
+    return SpriteDefinition(
+        name=name,
+        module='generate_effect_sprites',
+        draw_function='draw_effect_frame',
+        frame_width=width,
+        frame_height=height,
+        num_frames=num_frames,
+        sheet_filename=f'effect_{name}.png',
+        palette=palette,
+        animation=animation,
+        frame_duration_ms=frame_duration_ms,
+        draw_args=(effect_params(frames=num_frames, **params),),
+        dependencies=('particles',),
+    )
+
+PLAYER_EXPLOSION = effect_definition(
+    'player_explosion', (64, 64), 8, 'player', 'explode', 80,
+    seed=effect_seed('player_explosion'), count=120, speed=(0.8, 5.0), drag=0.8,
+    lifetime=(4, 8), size=2, core_radius=12.0, core_frames=4,
+)
+
+SMALL_EXPLOSION = effect_definition(
+    'explosion_small', (20, 20), 6, 'player', 'explode', 70,
+    seed=effect_seed('explosion_small'), count=36, speed=(0.4, 2.2), drag=0.75,
+    lifetime=(3, 6), size=1, core_radius=5.0, core_frames=3,
+)
+
+def hit_sparks_definition(enemy):
+    """Hit sparks for an enemy: half its size, spraying back down at the player's shots."""
+    size = max(SPARK_MIN_SIZE, enemy.frame_width // 2 // 2 * 2)
+    return effect_definition(
+        f'{enemy.name}_hit_sparks', (size, size), SPARK_FRAMES, enemy.palette, 'hit', 50,
+        seed=effect_seed(f'{enemy.name}_hit_sparks'), count=size, origin=(0.5, 0.25),
+        direction=90.0, spread=140.0, speed=(size / 10, size / 5), drag=0.7, gravity=0.3,
+        lifetime=(2, SPARK_FRAMES), size=0 if size < 16 else 1,
+    )
+
+ENEMIES = generate_enemy_sprites.SPRITES + generate_spec_sprites.SPRITES
+
+SPRITES = [PLAYER_EXPLOSION, SMALL_EXPLOSION] + [hit_sparks_definition(enemy) for enemy in ENEMIES]
+
+def main():
+    print("Generating particle effect sprites...")
+    
+    for definition, status, written in build_all(SPRITES, jobs=1, cache=BuildCache()):
+        if status == 'cached':
+            print(f"{definition.name} sprite sheet is up to date")
+            continue
+        for path in written:
+            print(f"Saved {definition.name} sprite sheet to {path}")
+    
+    print("Effect sprite generation complete!")
+    print(f"Effects: {', '.join(definition.name for definition in SPRITES)}")
+
+if __name__ == "__main__":
+    main()
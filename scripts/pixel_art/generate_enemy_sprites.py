@@ -1,70 +1,24 @@
 #!/usr/bin/env python3
 """
 Generate authentic 1990s pixel art enemy sprites for MerterBlaster.
-Creates Zapper and Chaser enemy types with 3-frame movement animations each.
+Creates Zapper and Chaser enemy types with 3-frame movement animations each,
+plus elite, damaged and hit-flash palette swaps of each (see palette_swap.py).
 Uses 256-color palette maximum with manual anti-aliasing and CRT-aware design.
 """
 
-from PIL import Image, ImageDraw
-import math
-import os
+from build_cache import BuildCache
+from palette_swap import DAMAGED, HIT_FLASH, PaletteVariant
+from palettes import get_palette
+from rasterizer import draw_radial_glow
+from sprites import SpriteDefinition, build_all, render_sprite_sheet
 
-# Reuse the palette creation function from player sprite script
 def create_1990s_palette():
-    """Create a 256-color palette inspired by 1990s VGA games."""
-    palette = []
-    
-    # Basic 16 EGA colors (0-15)
-    ega_colors = [
-        (0, 0, 0),        # 0: Black
-        (0, 0, 170),      # 1: Blue
-        (0, 170, 0),      # 2: Green
-        (0, 170, 170),    # 3: Cyan
-        (170, 0, 0),      # 4: Red
-        (170, 0, 170),    # 5: Magenta
-        (170, 85, 0),     # 6: Brown
-        (170, 170, 170),  # 7: Light Gray
-        (85, 85, 85),     # 8: Dark Gray
-        (85, 85, 255),    # 9: Light Blue
-        (85, 255, 85),    # 10: Light Green
-        (85, 255, 255),   # 11: Light Cyan
-        (255, 85, 85),    # 12: Light Red
-        (255, 85, 255),   # 13: Light Magenta
-        (255, 255, 85),   # 14: Yellow
-        (255, 255, 255),  # 15: White
-    ]
-    
-    palette.extend(ega_colors)
-    
-    # Add more colors for a 256-color palette
-    # Create gradients for enemy colors (reds, purples, greens)
-    for i in range(16, 256):
-        if i < 80:
-            # Red/purple gradients for Zapper
-            r = max(0, min(255, 150 + (i - 16) * 1))
-            g = max(0, min(255, 30 + (i - 16) * 1))
-            b = max(0, min(255, 100 + (i - 16) * 2))
-        elif i < 140:
-            # Green gradients for Chaser
-            r = max(0, min(255, 50 + (i - 80) * 1))
-            g = max(0, min(255, 120 + (i - 80) * 2))
-            b = max(0, min(255, 60 + (i - 80) * 1))
-        elif i < 200:
-            # Engine glow gradients (blue to cyan)
-            val = (i - 140) * 4
-            r = max(0, min(255, 50 + val // 5))
-            g = max(0, min(255, 100 + val // 3))
-            b = max(0, min(255, 200 + val // 2))
-        else:
-            # Special colors for highlights and effects
-            val = (i - 200) * 4
-            r = max(0, min(255, 200 + val // 3))
-            g = max(0, min(255, 150 + val // 4))
-            b = max(0, min(255, 100 + val // 5))
-        
-        palette.append((r, g, b))
-    
-    return palette
+    """Return the 256-color enemy palette inspired by 1990s VGA games.
+
+    Kept for callers of the old per-script function; the palette itself is
+    built once and cached in palettes.py.
+    """
+    return list(get_palette('enemy'))
 
 def draw_zapper_frame(draw, frame_num, width=32, height=32):
     """Draw a single frame of the Zapper enemy animation.
@@ -121,20 +75,12 @@ def draw_zapper_frame(draw, frame_num, width=32, height=32):
     # Left engine glow
     left_engine_center = (width//2 - 2, height - 6)
     left_glow_radius = int(3 * engine_glow_intensity)
-    for r in range(left_glow_radius, 0, -1):
-        color_idx = 140 + int(30 * (r / left_glow_radius))  # Blue-cyan gradient
-        draw.ellipse([left_engine_center[0] - r, left_engine_center[1] - r,
-                      left_engine_center[0] + r, left_engine_center[1] + r],
-                     fill=color_idx)
+    draw_radial_glow(draw, left_engine_center, left_glow_radius, 140, 30)  # Blue-cyan gradient
     
     # Right engine glow
     right_engine_center = (width//2 + 2, height - 6)
     right_glow_radius = int(3 * engine_glow_intensity)
-    for r in range(right_glow_radius, 0, -1):
-        color_idx = 140 + int(30 * (r / right_glow_radius))  # Blue-cyan gradient
-        draw.ellipse([right_engine_center[0] - r, right_engine_center[1] - r,
-                      right_engine_center[0] + r, right_engine_center[1] + r],
-                     fill=color_idx)
+    draw_radial_glow(draw, right_engine_center, right_glow_radius, 140, 30)  # Blue-cyan gradient
     
     # Add wing details
     draw.line([width//2 - 6, 12 + wing_offset, width//2 - 4, 24], fill=15, width=1)  # White
@@ -204,19 +150,11 @@ def draw_chaser_frame(draw, frame_num, width=32, height=32):
     
     # Left engine glow
     left_glow_radius = int(4 * engine_glow_intensity)
-    for r in range(left_glow_radius, 0, -1):
-        color_idx = 140 + int(40 * (r / left_glow_radius))  # Blue-cyan gradient
-        draw.ellipse([left_engine_center[0] - r, left_engine_center[1] - r,
-                      left_engine_center[0] + r, left_engine_center[1] + r],
-                     fill=color_idx)
+    draw_radial_glow(draw, left_engine_center, left_glow_radius, 140, 40)  # Blue-cyan gradient
     
     # Right engine glow
     right_glow_radius = int(4 * engine_glow_intensity)
-    for r in range(right_glow_radius, 0, -1):
-        color_idx = 140 + int(40 * (r / right_glow_radius))  # Blue-cyan gradient
-        draw.ellipse([right_engine_center[0] - r, right_engine_center[1] - r,
-                      right_engine_center[0] + r, right_engine_center[1] + r],
-                     fill=color_idx)
+    draw_radial_glow(draw, right_engine_center, right_glow_radius, 140, 40)  # Blue-cyan gradient
     
     # Add antennae/tentacles (organic feel)
     tentacle_wiggle = [0, 1, -1][frame_num % 3]
@@ -235,87 +173,61 @@ def draw_chaser_frame(draw, frame_num, width=32, height=32):
     draw.point([body_center[0] - 5, body_center[1] - 4], fill=15)  # Top left highlight
     draw.point([body_center[0] + 5, body_center[1] - 4], fill=15)  # Top right highlight
 
-def apply_crt_filter(image):
-    """Apply a simple CRT filter to simulate scanlines and pixel bleed."""
-    width, height = image.size
-    
-    # Convert to RGB for processing
-    rgb_image = image.convert('RGB')
-    pixels = rgb_image.load()
-    
-    # Create new image for CRT effect
-    crt_image = Image.new('RGB', (width, height))
-    crt_pixels = crt_image.load()
-    
-    # Simple scanline effect (every other line slightly darker)
-    for y in range(height):
-        scanline_darken = 0.9 if y % 2 == 0 else 1.0
-        
-        for x in range(width):
-            r, g, b = pixels[x, y]
-            
-            # Apply scanline effect
-            r = int(r * scanline_darken)
-            g = int(g * scanline_darken)
-            b = int(b * scanline_darken)
-            
-            # Simple pixel bleed (blur horizontally)
-            if x > 0:
-                r2, g2, b2 = pixels[x-1, y]
-                r = (r + r2 // 8) // 1
-                g = (g + g2 // 8) // 1
-                b = (b + b2 // 8) // 1
-            
-            crt_pixels[x, y] = (r, g, b)
-    
-    return crt_image
+# Elites swap the body colors and run hot: engine glow moves to the warm highlights
+ZAPPER_ELITE = PaletteVariant('elite', range_map=((140, 200, 200),),
+                              index_map=((13, 14), (5, 6), (4, 6), (12, 14)))
+CHASER_ELITE = PaletteVariant('elite', range_map=((140, 200, 200),),
+                              index_map=((10, 13), (2, 5), (11, 14), (1, 4)))
+
+ZAPPER_SPRITE = SpriteDefinition(
+    name='zapper',
+    module='generate_enemy_sprites',
+    draw_function='draw_zapper_frame',
+    frame_width=32,
+    frame_height=32,
+    num_frames=3,
+    sheet_filename='enemy_zapper.png',
+    palette='enemy',
+    animation='move',
+    variants=(ZAPPER_ELITE, DAMAGED, HIT_FLASH),
+    variant_palette_filename='enemy_zapper_palettes.json',
+)
+
+CHASER_SPRITE = SpriteDefinition(
+    name='chaser',
+    module='generate_enemy_sprites',
+    draw_function='draw_chaser_frame',
+    frame_width=32,
+    frame_height=32,
+    num_frames=3,
+    sheet_filename='enemy_chaser.png',
+    palette='enemy',
+    animation='move',
+    variants=(CHASER_ELITE, DAMAGED, HIT_FLASH),
+    variant_palette_filename='enemy_chaser_palettes.json',
+)
+
+SPRITES = [ZAPPER_SPRITE, CHASER_SPRITE]
 
 def create_enemy_sprite_sheet(enemy_type, draw_function):
     """Create a sprite sheet for an enemy type with 3 animation frames."""
-    frame_width = 32
-    frame_height = 32
-    num_frames = 3
-    
-    # Create sprite sheet image
-    sheet_width = frame_width * num_frames
-    sheet_height = frame_height
-    
-    # Create palette
-    palette = create_1990s_palette()
-    
-    # Create indexed color image
-    sheet = Image.new('P', (sheet_width, sheet_height), 0)
-    sheet.putpalette([c for rgb in palette for c in rgb])
-    
-    for frame in range(num_frames):
-        # Create individual frame
-        frame_img = Image.new('P', (frame_width, frame_height), 0)
-        frame_img.putpalette([c for rgb in palette for c in rgb])
-        draw = ImageDraw.Draw(frame_img)
-        
-        # Draw this frame
-        draw_function(draw, frame, frame_width, frame_height)
-        
-        # Paste into sprite sheet
-        sheet.paste(frame_img, (frame * frame_width, 0))
-    
-    return sheet
+    return render_sprite_sheet(draw_function, 'enemy', 32, 32, 3)
 
 def main():
     print("Generating authentic 1990s enemy sprites...")
     
-    # Create directories if they don't exist
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    images_dir = os.path.join(base_dir, 'assets', 'images')
-    os.makedirs(images_dir, exist_ok=True)
-    
-    # Generate Zapper enemy sprite sheet
-    print("Generating Zapper enemy sprite...")
-    zapper_sheet = create_enemy_sprite_sheet('zapper', draw_zapper_frame)
-    zapper_path = os.path.join(images_dir, 'enemy_zapper.png')
-    zapper_sheet.save(zapper_path, optimize=True)
-    print(f"Saved Zapper sprite sheet to {zapper_path}")
-    
-    # Generate Chaser enemy sprite sheet
-    print("Generating Chaser enemy sprite...")
-    chaser_sheet = create_enemy_sprite_sheet('chaser', draw_ch
\ No newline at end of file
+    # Sheets whose draw function and palette are unchanged are skipped
+    for definition, status, written in build_all(SPRITES, jobs=1, cache=BuildCache()):
+        if status == 'cached':
+            print(f"{definition.name.capitalize()} sprite sheet is up to date")
+            continue
+        for path in written:
+            print(f"Saved {definition.name.capitalize()} sprite sheet to {path}")
+    
+    print("Enemy sprite generation complete!")
+    print(f"Sprite sheets: 96x32 pixels (3 frames of 32x32 each)")
+    print(f"Color palette: 256 colors maximum")
+    print(f"Animation: 3-frame movement animation per enemy")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Generate MerterBlaster sprites described by declarative specs.
+Every JSON/TOML file in sprite_specs/ becomes one sprite sheet, drawn by
+replaying the spec's compiled op list (see sprite_spec.py). Adding an enemy
+type means adding a spec file rather than another draw function.
+Specs in subdirectories are not built: sprite_specs/reference/ holds ports
+of hand-written sprites that the tests render against the originals.
+"""
+
+from build_cache import BuildCache
+from sprite_spec import draw_spec_frame, list_specs, load_spec
+from sprites import SpriteDefinition, build_all
+
+# Spec keys copied straight onto the SpriteDefinition when present
+OPTIONAL_FIELDS = ('animation', 'frame_duration_ms', 'crt_preview_filename', 'frame_filename')
+
+def spec_definition(filename):
+    """Build the SpriteDefinition for one spec file."""
+    spec = load_spec(filename)
+    try:
+        name = spec['name']
+        options = {key: spec[key] for key in OPTIONAL_FIELDS if key in spec}
+        return SpriteDefinition(
+            name=name,
+            module='generate_spec_sprites',
+            draw_function='draw_spec_frame',
+            frame_width=spec['frame_width'],
+            frame_height=spec['frame_height'],
+            num_frames=spec['num_frames'],
+            sheet_filename=spec.get('sheet_filename', f'enemy_{name}.png'),
+            palette=spec['palette'],
+            spec=filename,
+            **options,
+        )
+    except KeyError as error:
+        raise ValueError(f"{filename}: missing required key {error}") from None
+
+SPRITES = [spec_definition(filename) for filename in list_specs()]
+
+def main():
+    print("Generating spec-driven sprites...")
+    
+    for definition, status, written in build_all(SPRITES, jobs=1, cache=BuildCache()):
+        if status == 'cached':
+            print(f"{definition.name.capitalize()} sprite sheet is up to date")
+            continue
+        for path in written:
+            print(f"Saved {definition.name.capitalize()} sprite sheet to {path}")
+    
+    print("Spec sprite generation complete!")
+    print(f"Sprites: {', '.join(definition.name for definition in SPRITES)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Palette-swap variants of MerterBlaster sprite sheets.
+Sheets are indexed 'P' images, so a tinted elite, a darkened damaged state or
+a white hit flash is just a remap of palette indices: one 256-entry LUT per
+variant, applied to the whole base sheet with a single np.take instead of
+another draw function and another full render.
+
+Remaps stay inside the sprite's named palette, so variant sheets share the
+base sheet's palette and pack into the same atlas. Index 0 (the background)
+always maps to itself, so variants keep the base sheet's collision data.
+
+For runtime palette swapping a sprite can also export its variants as
+palettes (see variant_palettes): one RGB list per variant in the order of the
+base sheet's trimmed PNG palette, so the game can recolor the one base sheet
+instead of loading a sheet per variant. Atlas pages have trimmed palettes of
+their own, so atlas.py writes the same tables per page for frames drawn from
+the atlas.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from palettes import palette_array
+
+@dataclass(frozen=True)
+class PaletteVariant:
+    """An index remap producing one variant of a sheet.
+
+    range_map entries (start, stop, target) move indices start..stop-1 to
+    target onwards, clamped to 255; index_map entries (source, target) move
+    single indices and are applied after the ranges. fill, if set, replaces
+    every non-background index. Everything is plain data, so the build cache
+    hashes variants along with their SpriteDefinition.
+    """
+    name: str
+    range_map: tuple = ()
+    index_map: tuple = ()
+    fill: Optional[int] = None
+
+    def lut(self):
+        """The 256-entry uint8 index LUT for this variant."""
+        lut = np.arange(256, dtype=np.int32)
+        for start, stop, target in self.range_map:
+            lut[start:stop] = np.minimum(np.arange(target, target + stop - start), 255)
+        for source, target in self.index_map:
+            lut[source] = target
+        if self.fill is not None:
+            lut[1:] = self.fill
+        lut[0] = 0
+        if lut.min() < 0 or lut.max() > 255:
+            raise ValueError(f"Variant '{self.name}' maps outside the 256-entry palette")
+        return lut.astype(np.uint8)
+
+def render_variants(sheet, variants):
+    """Yield (variant, image) for each variant of sheet, one LUT pass each."""
+    indices = np.asarray(sheet)
+    palette = sheet.getpalette()
+    for variant in variants:
+        image = Image.fromarray(np.take(variant.lut(), indices), 'P')
+        image.putpalette(palette)
+        yield variant, image
+
+def variant_palettes(sheet, variants, palette_name):
+    """Runtime palettes for swapping variants onto the base sheet.
+
+    Entries follow the used indices of sheet in ascending order, which is the
+    order trim_palette writes the base sheet's PNG palette in. Returns
+    {'base': [[r, g, b], ...], 'variants': {name: [[r, g, b], ...]}}.
+    """
+    used = np.flatnonzero(np.bincount(np.asarray(sheet).ravel(), minlength=256))
+    palette = palette_array(palette_name)
+    return {
+        'base': palette[used].tolist(),
+        'variants': {variant.name: palette[variant.lut()[used]].tolist() for variant in variants},
+    }
+
+# EGA bright colors and their dark counterparts (palettes.EGA_COLORS)
+EGA_DARKER = ((9, 1), (10, 2), (11, 3), (12, 4), (13, 5), (14, 6), (15, 7), (7, 8))
+
+# Shared variants. Gradient ranges follow palettes.py: 16-79 body, 80-139
+# secondary body, 140-199 engine glow, 200-255 highlights.
+HIT_FLASH = PaletteVariant('flash', fill=15)
+DAMAGED = PaletteVariant('damaged', range_map=((24, 80, 16), (88, 140, 80), (150, 200, 140)),
+                         index_map=EGA_DARKER)
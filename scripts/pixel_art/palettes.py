@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Shared 256-color palettes for the MerterBlaster sprite generators.
+Each named palette ('player', 'enemy', 'boss') is built once per process and cached
+along with its flat RGB byte LUT for Image.putpalette. A 32x32x32 RGB cube
+maps arbitrary colors to their nearest palette index, so imported RGB art can
+be quantized to a palette in bulk.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from profiling import stage
+
+# Basic 16 EGA colors (0-15), shared by every palette
+EGA_COLORS = [
+    (0, 0, 0),        # 0: Black
+    (0, 0, 170),      # 1: Blue
+    (0, 170, 0),      # 2: Green
+    (0, 170, 170),    # 3: Cyan
+    (170, 0, 0),      # 4: Red
+    (170, 0, 170),    # 5: Magenta
+    (170, 85, 0),     # 6: Brown
+    (170, 170, 170),  # 7: Light Gray
+    (85, 85, 85),     # 8: Dark Gray
+    (85, 85, 255),    # 9: Light Blue
+    (85, 255, 85),    # 10: Light Green
+    (85, 255, 255),   # 11: Light Cyan
+    (255, 85, 85),    # 12: Light Red
+    (255, 85, 255),   # 13: Light Magenta
+    (255, 255, 85),   # 14: Yellow
+    (255, 255, 255),  # 15: White
+]
+
+def _gradient_palette(gradient):
+    """EGA colors followed by 240 gradient entries from gradient(i) -> (r, g, b)."""
+    return tuple(EGA_COLORS) + tuple(gradient(i) for i in range(16, 256))
+
+def _player_gradient(i):
+    """Gradients for ship colors (blues, grays, engine glow)."""
+    if i < 80:
+        # Blue gradients for ship body
+        r = max(0, min(255, 30 + (i - 16) * 2))
+        g = max(0, min(255, 40 + (i - 16) * 2))
+        b = max(0, min(255, 100 + (i - 16) * 1))
+    elif i < 140:
+        # Gray gradients for metal parts
+        val = 50 + (i - 80) * 2
+        r = g = b = max(0, min(255, val))
+    elif i < 200:
+        # Engine glow gradients (yellow to orange to red)
+        val = (i - 140) * 4
+        r = max(0, min(255, 200 + val // 3))
+        g = max(0, min(255, 150 + val // 4))
+        b = max(0, min(255, 50 - val // 5))
+    else:
+        # Special colors for highlights and effects
+        val = (i - 200) * 4
+        r = max(0, min(255, 150 + val // 2))
+        g = max(0, min(255, 200 + val // 3))
+        b = max(0, min(255, 255 - val // 4))
+
+    return (r, g, b)
+
+def _enemy_gradient(i):
+    """Gradients for enemy colors (reds, purples, greens)."""
+    if i < 80:
+        # Red/purple gradients for Zapper
+        r = max(0, min(255, 150 + (i - 16) * 1))
+        g = max(0, min(255, 30 + (i - 16) * 1))
+        b = max(0, min(255, 100 + (i - 16) * 2))
+    elif i < 140:
+        # Green gradients for Chaser
+        r = max(0, min(255, 50 + (i - 80) * 1))
+        g = max(0, min(255, 120 + (i - 80) * 2))
+        b = max(0, min(255, 60 + (i - 80) * 1))
+    elif i < 200:
+        # Engine glow gradients (blue to cyan)
+        val = (i - 140) * 4
+        r = max(0, min(255, 50 + val // 5))
+        g = max(0, min(255, 100 + val // 3))
+        b = max(0, min(255, 200 + val // 2))
+    else:
+        # Special colors for highlights and effects
+        val = (i - 200) * 4
+        r = max(0, min(255, 200 + val // 3))
+        g = max(0, min(255, 150 + val // 4))
+        b = max(0, min(255, 100 + val // 5))
+
+    return (r, g, b)
+
+# Boss palette: one dark-to-light ramp per boss body color (from bosses.js),
+# a metal ramp for turrets and armor, then a fire ramp for damage
+BOSS_RAMP_COLORS = {
+    'sentinel': (0, 170, 255),
+    'vortex': (170, 0, 255),
+    'artillery': (255, 170, 0),
+    'nexus': (0, 255, 170),
+    'curtain': (255, 85, 170),
+    'metal': (150, 150, 165),
+}
+BOSS_RAMP_SIZE = 32
+BOSS_RAMP_STARTS = {name: 16 + i * BOSS_RAMP_SIZE for i, name in enumerate(BOSS_RAMP_COLORS)}
+BOSS_FIRE_START = 16 + len(BOSS_RAMP_COLORS) * BOSS_RAMP_SIZE
+
+def boss_index(ramp, level):
+    """Palette index of a level (0 darkest) on a named boss ramp, clamped to the ramp."""
+    if ramp == 'fire':
+        return BOSS_FIRE_START + max(0, min(255 - BOSS_FIRE_START, level))
+    return BOSS_RAMP_STARTS[ramp] + max(0, min(BOSS_RAMP_SIZE - 1, level))
+
+def _boss_gradient(i):
+    """Gradients for boss colors (one ramp per boss, metal, fire)."""
+    if i >= BOSS_FIRE_START:
+        # Fire: dark red to orange to yellow-white
+        t = (i - BOSS_FIRE_START) / (255 - BOSS_FIRE_START)
+        r = 120 + int(135 * min(1.0, t * 2))
+        g = int(230 * t)
+        b = int(160 * max(0.0, t - 0.6))
+        return (r, g, b)
+
+    ramp = list(BOSS_RAMP_COLORS)[(i - 16) // BOSS_RAMP_SIZE]
+    t = (i - 16) % BOSS_RAMP_SIZE / (BOSS_RAMP_SIZE - 1)
+    color = BOSS_RAMP_COLORS[ramp]
+    if t < 0.75:
+        # Shade up from near black to the pure color
+        scale = 0.15 + 0.85 * t / 0.75
+        return tuple(int(c * scale) for c in color)
+    # Then tint towards white for highlights
+    mix = (t - 0.75) / 0.25 * 0.6
+    return tuple(int(c + (255 - c) * mix) for c in color)
+
+PALETTE_GRADIENTS = {
+    'player': _player_gradient,
+    'enemy': _enemy_gradient,
+    'boss': _boss_gradient,
+}
+
+# Bits per channel in the nearest-color cube (32x32x32 cells)
+CUBE_BITS = 5
+
+@lru_cache(maxsize=None)
+def get_palette(name):
+    """Return the named palette as a tuple of 256 (r, g, b) tuples."""
+    try:
+        gradient = PALETTE_GRADIENTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown palette '{name}' (known: {', '.join(sorted(PALETTE_GRADIENTS))})") from None
+    with stage('palette', palette=name):
+        return _gradient_palette(gradient)
+
+@lru_cache(maxsize=None)
+def flat_palette(name):
+    """Return the named palette as 768 bytes, ready for Image.putpalette."""
+    return bytes(c for rgb in get_palette(name) for c in rgb)
+
+@lru_cache(maxsize=None)
+def palette_array(name):
+    """Return the named palette as a read-only (256, 3) uint8 array."""
+    return np.frombuffer(flat_palette(name), dtype=np.uint8).reshape(256, 3)
+
+def _nearest_exact(colors, palette):
+    """Nearest palette index for each row of an (n, 3) color array.
+
+    Ties resolve to the lowest index. Uses |p|^2 - 2 c.p, which ranks entries
+    the same as the full squared distance; float64 keeps it exact for 8-bit
+    channels.
+    """
+    palette = palette.astype(np.float64)
+    palette_norms = (palette ** 2).sum(axis=1)
+    indices = np.empty(len(colors), dtype=np.uint8)
+    # Chunk so the (n, 256) distance matrix stays small
+    for start in range(0, len(colors), 16384):
+        chunk = colors[start:start + 16384].astype(np.float64)
+        distances = palette_norms[None, :] - 2.0 * (chunk @ palette.T)
+        indices[start:start + 16384] = distances.argmin(axis=1)
+    return indices
+
+@lru_cache(maxsize=None)
+def nearest_color_cube(name):
+    """Return a (32, 32, 32) uint8 LUT of nearest palette index per RGB cell.
+
+    Each cell maps to the palette entry closest to the cell's center color.
+    """
+    with stage('palette-cube', palette=name):
+        return _build_color_cube(name)
+
+def _build_color_cube(name):
+    size = 1 << CUBE_BITS
+    step = 256 // size
+    centers = np.arange(size, dtype=np.int32) * step + step // 2
+    r, g, b = np.meshgrid(centers, centers, centers, indexing='ij')
+    colors = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+    cube = _nearest_exact(colors, palette_array(name)).reshape(size, size, size)
+    cube.setflags(write=False)
+    return cube
+
+def _pack_rgb(rgb):
+    """Pack an (..., 3) uint8 RGB array into 24-bit integer keys."""
+    rgb = rgb.astype(np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+@lru_cache(maxsize=None)
+def _palette_keys(name):
+    """Return (sorted packed colors, their palette indices) for the named palette.
+
+    A color listed more than once keeps its lowest index, matching the tie
+    rule of the exact search.
+    """
+    keys, indices = np.unique(_pack_rgb(palette_array(name)), return_index=True)
+    return keys, indices.astype(np.uint8)
+
+def nearest_indices(rgb, name, exact=False):
+    """Map an (..., 3) uint8 RGB array to nearest indices in the named palette.
+
+    The default uses the 32x32x32 cube LUT (one gather per pixel), after
+    looking up colors that are already in the palette so they keep their
+    own index. exact=True compares each distinct color against all 256
+    entries instead, which is still fast for pixel art with few unique colors.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if exact:
+        colors, inverse = np.unique(rgb.reshape(-1, 3), axis=0, return_inverse=True)
+        indices = _nearest_exact(colors, palette_array(name))
+        return indices[inverse.ravel()].reshape(rgb.shape[:-1])
+
+    shift = 8 - CUBE_BITS
+    cube = nearest_color_cube(name)
+    indices = cube[rgb[..., 0] >> shift, rgb[..., 1] >> shift, rgb[..., 2] >> shift]
+
+    # A cell's center can be closer to another entry than to a palette color
+    # inside it, so exact palette colors bypass the cube
+    keys, key_indices = _palette_keys(name)
+    packed = _pack_rgb(rgb)
+    slots = np.minimum(np.searchsorted(keys, packed), len(keys) - 1)
+    return np.where(keys[slots] == packed, key_indices[slots], indices)
+
+def quantize_image(image, name, exact=False, alpha_threshold=128):
+    """Convert RGB(A) art to a 'P' image using the named palette.
+
+    Pixels with alpha below alpha_threshold become index 0 (the black
+    background used by every generated sprite).
+    """
+    from PIL import Image
+
+    rgba = np.asarray(image.convert('RGBA'))
+    indices = nearest_indices(rgba[..., :3], name, exact)
+    indices = np.where(rgba[..., 3] < alpha_threshold, 0, indices).astype(np.uint8)
+
+    quantized = Image.fromarray(indices, 'P')
+    quantized.putpalette(flat_palette(name))
+    return quantized
+
+def main(argv=None):
+    import argparse
+
+    from PIL import Image
+
+    parser = argparse.ArgumentParser(description="Quantize RGB art to a MerterBlaster palette.")
+    parser.add_argument('input', help="source RGB/RGBA PNG")
+    parser.add_argument('output', help="indexed PNG to write")
+    parser.add_argument('--palette', default='enemy', choices=sorted(PALETTE_GRADIENTS))
+    parser.add_argument('--exact', action='store_true',
+                        help="exact nearest color per unique color instead of the RGB cube")
+    args = parser.parse_args(argv)
+
+    with Image.open(args.input) as image:
+        quantize_image(image, args.palette, args.exact).save(args.output, optimize=True)
+    print(f"Saved {args.output} using the {args.palette} palette")
+
+if __name__ == "__main__":
+    main()
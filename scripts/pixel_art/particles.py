@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Seeded particle effects for MerterBlaster (explosions, hit sparks).
+An effect simulates every particle for every frame at once as NumPy arrays:
+positions follow a closed-form drag and gravity trajectory, and colors cool
+through the palette's glow range (indices 140-199) as particles age. All
+frames are then rasterized together into one (frames, height, width) index
+array with np.maximum.at, so hotter (higher) indices win where particles
+overlap and no per-particle ImageDraw calls are made.
+
+The same parameters and seed always produce the same frames. Effect sprite
+definitions list this module as a dependency, so the build cache rebuilds
+effect sheets whenever the simulation or rasterization source changes.
+"""
+
+from dataclasses import dataclass, fields
+from functools import lru_cache
+import zlib
+
+import numpy as np
+from PIL import Image
+
+# Glow range shared by the player and enemy palettes
+GLOW_BASE = 140
+GLOW_SPAN = 59
+
+# Pixel offsets for each particle size
+_BRUSHES = {
+    0: np.array([[0, 0]]),
+    1: np.array([[0, 0], [1, 0], [-1, 0], [0, 1], [0, -1]]),
+    2: np.array([[dx, dy] for dy in range(-2, 3) for dx in range(-2, 3) if dx * dx + dy * dy <= 4]),
+}
+
+@dataclass(frozen=True)
+class ParticleEffect:
+    """Parameters for one particle effect.
+
+    Angles are in degrees in screen space (0 points right, 90 points down).
+    Speeds are pixels per frame at frame 0; drag multiplies speed each frame.
+    """
+    frames: int
+    seed: int
+    count: int = 60
+    origin: tuple = (0.5, 0.5)  # Fraction of the frame size
+    direction: float = 0.0
+    spread: float = 360.0
+    speed: tuple = (0.5, 3.0)
+    drag: float = 0.85
+    gravity: float = 0.0
+    lifetime: tuple = (3, 8)  # Frames, inclusive
+    size: int = 1  # Brush radius (0-2) while young; particles shrink to 1 pixel
+    core_radius: float = 0.0  # Radius of the central flash at frame 0
+    core_frames: int = 0  # Frames over which the flash shrinks away
+    base_index: int = GLOW_BASE
+    span: int = GLOW_SPAN
+
+    @classmethod
+    def from_params(cls, params):
+        """Build an effect from a tuple of (name, value) pairs (see effect_params)."""
+        return cls(**{name: tuple(value) if isinstance(value, list) else value for name, value in params})
+
+def effect_params(**params):
+    """Effect parameters as a hashable, JSON-friendly tuple of pairs, sorted by name."""
+    known = {field.name for field in fields(ParticleEffect)}
+    unknown = sorted(set(params) - known)
+    if unknown:
+        raise ValueError(f"Unknown particle parameter(s): {', '.join(unknown)}")
+    return tuple(sorted(params.items()))
+
+def simulate(effect, width, height):
+    """Return per-frame particle state as (x, y, color, alive, young) arrays of shape (frames, count)."""
+    rng = np.random.default_rng(effect.seed)
+    count = effect.count
+    half_spread = effect.spread / 2
+    angles = np.radians(rng.uniform(effect.direction - half_spread, effect.direction + half_spread, count))
+    speeds = rng.uniform(effect.speed[0], effect.speed[1], count)
+    lifetimes = rng.integers(effect.lifetime[0], effect.lifetime[1] + 1, count)
+    heat = rng.uniform(0.0, 1.0, count)
+
+    t = np.arange(effect.frames, dtype=np.float64)[:, None]
+    # Distance travelled after t frames with speed decaying by drag each frame
+    if effect.drag == 1.0:
+        travelled = speeds * t
+    else:
+        travelled = speeds * (1.0 - effect.drag ** t) / (1.0 - effect.drag)
+    x = effect.origin[0] * (width - 1) + np.cos(angles) * travelled
+    y = effect.origin[1] * (height - 1) + np.sin(angles) * travelled + 0.5 * effect.gravity * t * t
+
+    age = t / lifetimes
+    alive = age < 1.0
+    # Young, hot particles use the top of the range and cool towards the base
+    warmth = np.clip((1.0 - age) * (0.6 + 0.4 * heat), 0.0, 1.0)
+    color = effect.base_index + np.round(warmth * effect.span).astype(np.int64)
+    return x, y, color, alive, age < 0.5
+
+def _core_flash(effect, width, height):
+    """(frames, height, width) index array for the shrinking central flash."""
+    frames = np.zeros((effect.frames, height, width), dtype=np.uint8)
+    if effect.core_radius <= 0 or effect.core_frames <= 0:
+        return frames
+    ys, xs = np.mgrid[0:height, 0:width]
+    distance = np.hypot(xs - effect.origin[0] * (width - 1), ys - effect.origin[1] * (height - 1))
+    shown = min(effect.core_frames, effect.frames)
+    radius = effect.core_radius * (1.0 - np.arange(shown) / effect.core_frames)[:, None, None]
+    inside = distance[None] <= radius
+    falloff = 1.0 - distance[None] / np.maximum(radius, 1e-9)
+    index = effect.base_index + np.round(effect.span * falloff).astype(np.int64)
+    frames[:shown] = np.where(inside, index, 0).astype(np.uint8)
+    return frames
+
+@lru_cache(maxsize=None)
+def render_effect(effect, width, height):
+    """Rasterize every frame of effect into a read-only (frames, height, width) uint8 array."""
+    frames = _core_flash(effect, width, height)
+    x, y, color, alive, young = simulate(effect, width, height)
+    frame_index = np.broadcast_to(np.arange(effect.frames)[:, None], x.shape)
+
+    # Every live particle covers one pixel; young ones use the full brush
+    passes = [(alive, _BRUSHES[0])]
+    if effect.size:
+        passes.append((alive & young, _BRUSHES[effect.size]))
+    for selected, brush in passes:
+        if not selected.any():
+            continue
+        px = np.rint(x[selected])[:, None].astype(np.int64) + brush[None, :, 0]
+        py = np.rint(y[selected])[:, None].astype(np.int64) + brush[None, :, 1]
+        pf = np.broadcast_to(frame_index[selected][:, None], px.shape)
+        pc = np.broadcast_to(color[selected][:, None], px.shape)
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        flat = (pf[inside] * height + py[inside]) * width + px[inside]
+        np.maximum.at(frames.reshape(-1), flat, pc[inside].astype(np.uint8))
+
+    frames.setflags(write=False)
+    return frames
+
+def draw_effect_frame(params, draw, frame_num, width, height):
+    """Draw one frame of the effect described by params into a FrameDraw.
+
+    params comes from effect_params; the SpriteDefinition passes it through
+    draw_args so the build cache hashes the effect parameters.
+    """
+    frames = render_effect(ParticleEffect.from_params(params), width, height)
+    draw.image.paste(Image.frombytes('P', (width, height), frames[frame_num].tobytes()))
+
+def effect_seed(name):
+    """Stable per-name seed (Python's hash() is randomized per process)."""
+    return zlib.crc32(name.encode('utf-8'))
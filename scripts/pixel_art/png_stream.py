@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Incremental PNG writer for MerterBlaster build outputs.
+Pillow encodes a PNG from a complete in-memory image; StreamingPngWriter
+instead accepts rows in bands and compresses them as they arrive, so very
+large images can be written with memory proportional to one band.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+# PNG color types for the modes we write
+_COLOR_TYPES = {'L': (0, 1), 'RGB': (2, 3), 'RGBA': (6, 4)}
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_IDAT_CHUNK_SIZE = 1 << 16
+
+def png_chunk(kind, data):
+    body = kind + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+def sub_filter(rows, channels):
+    """Apply PNG filter type 1 (Sub) to an (h, w * channels) uint8 array.
+
+    Returns the filtered rows with the leading filter-type byte per row.
+    """
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:channels + 1] = rows[:, :channels]
+    # uint8 arithmetic wraps modulo 256 exactly as the PNG filter requires
+    np.subtract(rows[:, channels:], rows[:, :-channels], out=filtered[:, channels + 1:])
+    return filtered
+
+class StreamingPngWriter:
+    """Write an 8-bit PNG band by band.
+
+    Usage:
+        with StreamingPngWriter(path, width, height, 'RGB') as writer:
+            for band in bands:
+                writer.write_rows(band)  # (rows, width, 3) uint8
+    """
+
+    def __init__(self, path, width, height, mode='RGB', compress_level=6):
+        if mode not in _COLOR_TYPES:
+            raise ValueError(f"Unsupported PNG mode '{mode}' (supported: {', '.join(_COLOR_TYPES)})")
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.color_type, self.channels = _COLOR_TYPES[mode]
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._file = open(path, 'wb')
+        self._file.write(PNG_SIGNATURE)
+        header = struct.pack('>IIBBBBB', width, height, 8, self.color_type, 0, 0, 0)
+        self._file.write(png_chunk(b'IHDR', header))
+
+    def write_rows(self, rows):
+        """Append rows shaped (n, width) for 'L' or (n, width, channels)."""
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        if rows.shape[1] != self.width:
+            raise ValueError(f"Expected rows {self.width} pixels wide, got {rows.shape[1]}")
+        if self.rows_written + rows.shape[0] > self.height:
+            raise ValueError(f"Writing {rows.shape[0]} rows would exceed the image height {self.height}")
+
+        filtered = sub_filter(rows.reshape(rows.shape[0], -1), self.channels)
+        self._pending += self._compressor.compress(filtered.tobytes())
+        self.rows_written += rows.shape[0]
+        self._flush_idat(final=False)
+
+    def _flush_idat(self, final):
+        while len(self._pending) >= _IDAT_CHUNK_SIZE or (final and self._pending):
+            data = bytes(self._pending[:_IDAT_CHUNK_SIZE])
+            del self._pending[:_IDAT_CHUNK_SIZE]
+            self._file.write(png_chunk(b'IDAT', data))
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG closed after {self.rows_written} of {self.height} rows")
+            self._pending += self._compressor.flush()
+            self._flush_idat(final=True)
+            self._file.write(png_chunk(b'IEND', b''))
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._file = None
+        return False
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Content-hashed sprite filenames and the service worker precache manifest.
+After a full build every runtime output in assets/images (sheets, variant
+sheets and palettes, atlas pages at every scale, atlas.json, collision.json)
+is copied to <name>.<hash>.<ext>, where hash is the start of the SHA-256 of
+its bytes. A hashed file never changes, so the service worker can cache it
+once and serve it cache-first forever; a sprite is only fetched again when
+its bytes, and so its name, change. Reference-only outputs (CRT previews,
+per-frame PNGs) are not hashed.
+
+The mapping from plain to hashed filename and the subset to download when
+the service worker installs are written to precache-manifest.js in the repo
+root as:
+
+    self.SPRITE_ASSETS = {"player.png": "./assets/images/player.1a2b3c4d5e.png", ...};
+    self.SPRITE_PRECACHE = ["./assets/images/atlas_0.d5673caa79.png", ...];
+
+Only what every device needs is precached (the 1x atlas pages or sheets and
+the JSON sidecars); scaled atlas pages are fetched on demand, so a device
+downloads just the devicePixelRatio variant it uses. service-worker.js loads
+the file with importScripts(); the game can load the same file with a
+<script> tag to look sprites up by their plain name. Hashed copies that no
+longer match a current output, including copies of files since deleted
+(such as atlas pages a smaller build no longer needs), are deleted.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from sprites import DEFAULT_IMAGES_DIR, SCRIPT_DIR
+
+HASH_LENGTH = 10
+PRECACHE_VARIABLE = 'SPRITE_ASSETS'
+PRECACHE_LIST_VARIABLE = 'SPRITE_PRECACHE'
+DEFAULT_PRECACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), 'precache-manifest.js')
+
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.[0-9a-f]{%d}(?P<ext>\.[^.]+)$' % HASH_LENGTH)
+
+def content_hash(path):
+    """First HASH_LENGTH hex digits of the SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def hashed_filename(filename, digest):
+    """'player.png' -> 'player.<digest>.png'."""
+    stem, ext = os.path.splitext(filename)
+    return f'{stem}.{digest}{ext}'
+
+def plain_filename(filename):
+    """Inverse of hashed_filename, or None if filename carries no hash."""
+    match = _HASHED_NAME.match(filename)
+    if match is None:
+        return None
+    return match.group('stem') + match.group('ext')
+
+def hash_outputs(filenames, images_dir=DEFAULT_IMAGES_DIR):
+    """Copy each output to its hashed name and return {filename: hashed_filename}.
+
+    Existing hashed copies are left alone (same name, same bytes). Every
+    other hashed copy in images_dir is removed: older versions, outputs no
+    longer hashed at all and outputs that no longer exist.
+    """
+    assets = {}
+    for filename in sorted(set(filenames)):
+        hashed = hashed_filename(filename, content_hash(os.path.join(images_dir, filename)))
+        target = os.path.join(images_dir, hashed)
+        if not os.path.exists(target):
+            shutil.copyfile(os.path.join(images_dir, filename), target)
+        assets[filename] = hashed
+
+    current = set(assets.values())
+    for name in os.listdir(images_dir):
+        if name not in current and plain_filename(name) is not None:
+            os.remove(os.path.join(images_dir, name))
+    return assets
+
+def precache_script(assets, precache, images_dir=DEFAULT_IMAGES_DIR, path=DEFAULT_PRECACHE_PATH):
+    """JavaScript source defining the plain-to-hashed URL map and the install-time URLs.
+
+    precache lists the plain filenames to download on install.
+    """
+    prefix = os.path.relpath(images_dir, os.path.dirname(path)).replace(os.sep, '/')
+    urls = {filename: f'./{prefix}/{hashed}' for filename, hashed in assets.items()}
+    precache_urls = sorted(urls[filename] for filename in set(precache))
+    return ("// Generated by scripts/pixel_art/build_sprites.py; do not edit.\n"
+            f"self.{PRECACHE_VARIABLE} = {json.dumps(urls, indent=2, sort_keys=True)};\n"
+            f"self.{PRECACHE_LIST_VARIABLE} = {json.dumps(precache_urls, indent=2)};\n")
+
+def build_precache_manifest(filenames, precache, images_dir=DEFAULT_IMAGES_DIR, path=DEFAULT_PRECACHE_PATH):
+    """Hash the outputs and write the precache manifest.
+
+    filenames are every runtime output; precache is the subset the service
+    worker downloads on install (the rest are cached when first fetched).
+    Returns the manifest path and the {filename: hashed_filename} map.
+    """
+    assets = hash_outputs(filenames, images_dir)
+    text = precache_script(assets, precache, images_dir, path)
+    try:
+        with open(path) as f:
+            if f.read() == text:
+                return path, assets
+    except OSError:
+        pass
+    with open(path, 'w') as f:
+        f.write(text)
+    return path, assets
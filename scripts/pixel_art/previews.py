@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Animated APNG and WebP previews of MerterBlaster sprite animations.
+Reviewing an animation otherwise means flipping through player_frame_N.png
+files, and sharing one means sending the whole sheet. Each sprite's animation
+is written as one looping file timed by its frame_duration_ms.
+
+Consecutive frames mostly differ only where the engine glow, wings or
+tentacles move, so the APNG writer stores the first frame whole and every
+later frame as just the bounding rectangle of the pixels that changed
+(dispose op NONE keeps the previous frame on the canvas; blend op SOURCE
+replaces the rectangle). Frames identical to the previous one are dropped and
+their time added to it. Frames share one trimmed palette at the smallest bit
+depth that holds it.
+
+WebP previews are encoded by Pillow through libwebp's animation encoder,
+which does its own sub-frame rectangles.
+
+Usage:
+    python scripts/pixel_art/previews.py [--only NAME ...] [--format apng,webp] [--output-dir DIR]
+"""
+
+import argparse
+import io
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from bundle import sheet_frames
+from palettes import palette_array
+from png_stream import PNG_SIGNATURE, png_chunk
+from sprites import DEFAULT_IMAGES_DIR, SCRIPT_DIR, discover_sprites, select_sprites
+
+DEFAULT_PREVIEW_DIR = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), 'sprite-previews')
+FORMATS = ('apng', 'webp')
+EXTENSIONS = {'apng': '.apng', 'webp': '.webp'}
+
+# sequence, width, height, x, y, delay numerator/denominator, dispose op, blend op
+_FCTL = struct.Struct('>IIIIIHHBB')
+_DISPOSE_NONE = 0
+_BLEND_SOURCE = 0
+_MAX_DELAY = 0xFFFF
+
+def delta_rect(previous, current):
+    """(x, y, w, h) around the pixels that differ between two frames, or None."""
+    changed = previous != current
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
+
+def delta_frames(frames, durations):
+    """Collapse frames into [(x, y, pixels, duration_ms)] deltas.
+
+    The first entry is the whole first frame; frames identical to the one
+    before extend its duration instead.
+    """
+    deltas = [(0, 0, frames[0], durations[0])]
+    for previous, current, duration in zip(frames, frames[1:], durations[1:]):
+        rect = delta_rect(previous, current)
+        if rect is None:
+            x, y, pixels, total = deltas[-1]
+            deltas[-1] = (x, y, pixels, total + duration)
+            continue
+        x, y, w, h = rect
+        deltas.append((x, y, current[y:y + h, x:x + w], duration))
+    return deltas
+
+def delay_fraction(duration_ms):
+    """fcTL (numerator, denominator) seconds for a delay in milliseconds.
+
+    Both fields are 16-bit, so a delay over 65.535 s (a long run of merged
+    identical frames) is given in hundredths, tenths or whole seconds,
+    rounded, and clamped to 65535 s.
+    """
+    for denominator in (1000, 100, 10, 1):
+        step = 1000 // denominator
+        numerator = (duration_ms + step // 2) // step
+        if numerator <= _MAX_DELAY:
+            return numerator, denominator
+    return _MAX_DELAY, 1
+
+def _bit_depth(colors):
+    for depth in (1, 2, 4):
+        if colors <= 1 << depth:
+            return depth
+    return 8
+
+def _image_data(pixels, depth):
+    """zlib-compressed scanlines (filter type None, as recommended for palettes)."""
+    if depth < 8:
+        per_byte = 8 // depth
+        height, width = pixels.shape
+        padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+        padded[:, :width] = pixels
+        shifts = np.arange(8 - depth, -1, -depth, dtype=np.uint8)
+        pixels = (padded.reshape(height, -1, per_byte) << shifts).sum(axis=2, dtype=np.uint8)
+    rows = np.zeros((pixels.shape[0], pixels.shape[1] + 1), dtype=np.uint8)
+    rows[:, 1:] = pixels
+    return zlib.compress(rows.tobytes(), 9)
+
+def encode_apng(frames, palette, durations, loops=0):
+    """Encode (h, w) index frames as an APNG storing only inter-frame deltas.
+
+    palette is the (256, 3) RGB palette the indices refer to; durations are
+    per-frame milliseconds. Returns the file bytes.
+    """
+    used = np.flatnonzero(np.bincount(np.concatenate([frame.ravel() for frame in frames]), minlength=256))
+    lut = np.zeros(256, dtype=np.uint8)
+    lut[used] = np.arange(len(used), dtype=np.uint8)
+    frames = [lut[frame] for frame in frames]
+    depth = _bit_depth(len(used))
+    height, width = frames[0].shape
+    deltas = delta_frames(frames, durations)
+
+    chunks = [
+        png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, depth, 3, 0, 0, 0)),
+        png_chunk(b'acTL', struct.pack('>II', len(deltas), loops)),
+        png_chunk(b'PLTE', np.asarray(palette, dtype=np.uint8)[used].tobytes()),
+    ]
+    sequence = 0
+    for index, (x, y, pixels, duration) in enumerate(deltas):
+        h, w = pixels.shape
+        chunks.append(png_chunk(b'fcTL', _FCTL.pack(sequence, w, h, x, y, *delay_fraction(duration),
+                                                    _DISPOSE_NONE, _BLEND_SOURCE)))
+        sequence += 1
+        data = _image_data(pixels, depth)
+        if index == 0:
+            chunks.append(png_chunk(b'IDAT', data))
+        else:
+            chunks.append(png_chunk(b'fdAT', struct.pack('>I', sequence) + data))
+            sequence += 1
+    chunks.append(png_chunk(b'IEND', b''))
+    return PNG_SIGNATURE + b''.join(chunks)
+
+def encode_webp(frames, palette, durations, loops=0):
+    """Encode (h, w) index frames as a lossless animated WebP."""
+    flat = np.asarray(palette, dtype=np.uint8).tobytes()
+    images = []
+    for frame in frames:
+        image = Image.fromarray(np.ascontiguousarray(frame), 'P')
+        image.putpalette(flat)
+        images.append(image.convert('RGB'))
+    buffer = io.BytesIO()
+    images[0].save(buffer, format='WEBP', save_all=True, append_images=images[1:], duration=list(durations),
+                   loop=loops, lossless=True, quality=100, method=6, minimize_size=True)
+    return buffer.getvalue()
+
+ENCODERS = {'apng': encode_apng, 'webp': encode_webp}
+
+def parse_formats(text):
+    """Parse a comma-separated list of preview formats, e.g. 'apng,webp'."""
+    formats = tuple(fmt.strip() for fmt in text.split(',') if fmt.strip())
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown preview format(s): {', '.join(unknown)}")
+    return formats
+
+def preview_filename(definition, fmt):
+    return f'{definition.name}_{definition.animation}{EXTENSIONS[fmt]}'
+
+def write_previews(definitions, output_dir=DEFAULT_PREVIEW_DIR, images_dir=DEFAULT_IMAGES_DIR,
+                   formats=('apng',), bundle=None):
+    """Write an animated preview of every multi-frame sprite in each format.
+
+    Frames come from bundle (an open SpriteBundle) when given, otherwise from
+    the built sheets. Returns [(definition, path, size in bytes)].
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for definition in definitions:
+        if definition.num_frames < 2:
+            continue
+        if bundle is not None:
+            frames = bundle.frames(definition.name)
+        else:
+            frames = sheet_frames(definition, images_dir)
+        durations = [definition.frame_duration_ms] * len(frames)
+        for fmt in formats:
+            data = ENCODERS[fmt](frames, palette_array(definition.palette), durations)
+            path = os.path.join(output_dir, preview_filename(definition, fmt))
+            try:
+                with open(path, 'rb') as f:
+                    unchanged = f.read() == data
+            except OSError:
+                unchanged = False
+            if not unchanged:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            written.append((definition, path, len(data)))
+    return written
+
+def _frame_png_bytes(definition, images_dir):
+    """Total size of the sprite's per-frame PNGs, or None if it does not write them."""
+    if not definition.frame_filename:
+        return None
+    return sum(os.path.getsize(os.path.join(images_dir, definition.frame_filename.format(frame=frame)))
+               for frame in range(definition.num_frames))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write animated previews of the built sprite sheets.")
+    parser.add_argument('--only', action='append', metavar='NAME',
+                        help="preview only this sprite (repeatable)")
+    parser.add_argument('--format', type=parse_formats, default=('apng',), metavar='FORMATS',
+                        help=f"comma-separated formats to write: {', '.join(FORMATS)} (default: apng)")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR,
+                        help="directory holding the built sheets (default: assets/images)")
+    parser.add_argument('--output-dir', default=DEFAULT_PREVIEW_DIR,
+                        help="directory to write previews to (default: sprite-previews in the repo root)")
+    args = parser.parse_args(argv)
+
+    try:
+        definitions = select_sprites(discover_sprites(), args.only)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    for definition, path, size in write_previews(definitions, args.output_dir, args.images_dir, args.format):
+        frame_bytes = _frame_png_bytes(definition, args.images_dir)
+        comparison = f" (frame PNGs: {frame_bytes} bytes)" if frame_bytes else ''
+        print(f"[{definition.name}] Saved {path}: {size} bytes{comparison}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
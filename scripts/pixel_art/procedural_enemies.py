@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Seeded procedural enemy variants for MerterBlaster stress and content tests.
+Each variant is a Zapper or Chaser whose wing offsets, body scale, sensor
+size, engine glow and palette ranges are drawn from a seed. The parameters
+are plain JSON values stored as the SpriteDefinition's draw_args, so every
+variant renders, pickles and caches like any hand-written sprite.
+
+Variant i of a run with seed s is drawn from its own generator seeded with
+(s, i), so the same seed gives the same enemies whatever --jobs is and
+however many are generated. Worker processes render chunks of variants and
+hand back raw index arrays, which the parent turns into atlas frames and
+feeds to the packer as chunks arrive; thousands of sheets never have to be
+written and decoded again as PNGs before packing, nor held in memory at
+once. --sheets writes them as well.
+
+These sprites are not part of the normal build (this is not a generate_*.py
+script); definitions from procedural_definitions() can be added to a
+generator's SPRITES to ship a selection.
+
+Usage:
+    python scripts/pixel_art/procedural_enemies.py [--count N] [--seed S] [--jobs N]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from atlas import DEFAULT_MAX_SIZE, write_atlases
+from encoders import trim_palette
+from palettes import flat_palette
+from rasterizer import draw_radial_glow
+from scaling import parse_scales
+from sprites import SpriteDefinition, render_definition, save_if_changed
+
+KINDS = ('zapper', 'chaser')
+DEFAULT_COUNT = 1000
+DEFAULT_SEED = 1
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                  'procedural-sprites')
+DEFAULT_ATLAS_NAME = 'procedural_atlas'
+CHUNK_SIZE = 64
+NUM_FRAMES = 3
+
+# Enemy palette gradient ranges (see palettes.py) a variant's colors come from
+BODY_RANGES = ((16, 80), (80, 140), (200, 256))
+GLOW_RANGE = (140, 200)
+
+def _body_colors(rng):
+    """Fill, outline and highlight indices from one gradient range, dark to light."""
+    start, stop = BODY_RANGES[rng.integers(len(BODY_RANGES))]
+    fill = int(rng.integers(start + 16, stop - 8))
+    return fill, int(rng.integers(start, fill - 8)), int(rng.integers(fill + 1, stop))
+
+def variant_params(seed, index, kind=None):
+    """Random geometry and colors for variant index of a run.
+
+    Returned as a hashable, JSON-friendly tuple of pairs sorted by name, like
+    particles.effect_params.
+    """
+    rng = np.random.default_rng([seed, index])
+    if kind is None:
+        kind = KINDS[rng.integers(len(KINDS))]
+    fill, outline, highlight = _body_colors(rng)
+    glow_base = int(rng.integers(GLOW_RANGE[0], GLOW_RANGE[1] - 20))
+    params = {
+        'kind': kind,
+        'seed': seed,
+        'index': index,
+        'scale': round(float(rng.uniform(0.75, 1.2)), 3),
+        'fill': fill,
+        'outline': outline,
+        'highlight': highlight,
+        'sensor_radius': int(rng.integers(2, 5)),
+        'sensor_color': int(rng.choice([1, 3, 4, 5, 11, 12])),
+        'glow_base': glow_base,
+        'glow_span': int(rng.integers(10, GLOW_RANGE[1] - glow_base)),
+        'glow': tuple(round(float(value), 2) for value in np.sort(rng.uniform(0.3, 1.0, NUM_FRAMES))[[0, 2, 1]]),
+    }
+    if kind == 'zapper':
+        params['wing_offsets'] = tuple(int(value) for value in rng.integers(-2, 3, NUM_FRAMES))
+        params['wing_span'] = int(rng.integers(7, 13))
+    else:
+        params['squash'] = tuple(round(float(value), 2) for value in rng.uniform(0.9, 1.1, NUM_FRAMES))
+        params['tentacle_wiggle'] = tuple(int(value) for value in rng.integers(-2, 3, NUM_FRAMES))
+    return tuple(sorted(params.items()))
+
+def draw_procedural_zapper(params, draw, frame_num, width=32, height=32):
+    """Zapper-style frame (see generate_enemy_sprites.draw_zapper_frame) from variant params."""
+    params = dict(params)
+    scale = params['scale']
+    cx = width // 2
+    wing = params['wing_offsets'][frame_num % len(params['wing_offsets'])]
+    span = int(params['wing_span'] * scale)
+
+    def y(value):
+        # Scale about the vertical centre so larger bodies grow both ways
+        return int(height / 2 + (value - 16) * scale)
+
+    body_points = [
+        (cx, y(8)),
+        (cx - int(6 * scale), y(12) + wing),
+        (cx - span, y(20)),
+        (cx - int(4 * scale), y(24)),
+        (cx - 2, y(28)),
+        (cx + 2, y(28)),
+        (cx + int(4 * scale), y(24)),
+        (cx + span, y(20)),
+        (cx + int(6 * scale), y(12) - wing),
+    ]
+    draw.polygon(body_points, fill=params['fill'], outline=params['outline'])
+
+    radius = params['sensor_radius']
+    sensor_y = y(14)
+    draw.ellipse([cx - radius, sensor_y - radius, cx + radius, sensor_y + radius], fill=params['sensor_color'])
+    draw.point([cx, sensor_y], fill=params['highlight'])
+
+    glow_radius = int(3 * scale * params['glow'][frame_num % len(params['glow'])])
+    for offset in (-2, 2):
+        draw_radial_glow(draw, (cx + offset, y(26)), glow_radius, params['glow_base'], params['glow_span'])
+
+    draw.line([cx - int(6 * scale), y(12) + wing, cx - int(4 * scale), y(24)], fill=params['highlight'])
+    draw.line([cx + int(6 * scale), y(12) - wing, cx + int(4 * scale), y(24)], fill=params['highlight'])
+
+def draw_procedural_chaser(params, draw, frame_num, width=32, height=32):
+    """Chaser-style frame (see generate_enemy_sprites.draw_chaser_frame) from variant params."""
+    params = dict(params)
+    scale = params['scale']
+    cx, cy = width // 2, height // 2
+    squash = params['squash'][frame_num % len(params['squash'])]
+    body_width = int(14 * scale)
+    body_height = int(12 * scale * squash)
+    body = [cx - body_width // 2, cy - body_height // 2, cx + body_width // 2, cy + body_height // 2]
+    draw.ellipse(body, fill=params['fill'], outline=params['outline'])
+
+    radius = params['sensor_radius']
+    eye_y = cy - int(2 * scale)
+    draw.ellipse([cx - radius, eye_y - radius, cx + radius, eye_y + radius], fill=params['sensor_color'])
+    pupil = frame_num % 3 - 1
+    draw.ellipse([cx - 1 + pupil, eye_y - 1, cx + 1 + pupil, eye_y + 1], fill=1)
+
+    pod_dx = int(6 * scale)
+    pod_y = cy + int(4 * scale) + params['tentacle_wiggle'][frame_num % len(params['tentacle_wiggle'])] // 2
+    glow_radius = int(4 * scale * params['glow'][frame_num % len(params['glow'])])
+    for side in (-1, 1):
+        pod = (cx + side * pod_dx, pod_y)
+        draw.ellipse([pod[0] - 3, pod[1] - 3, pod[0] + 3, pod[1] + 3], fill=8)
+        draw_radial_glow(draw, pod, glow_radius, params['glow_base'], params['glow_span'])
+
+    wiggle = params['tentacle_wiggle'][frame_num % len(params['tentacle_wiggle'])]
+    reach = int(10 * scale)
+    for side in (-1, 1):
+        draw.line([cx + side * (body_width // 2), cy - 1, cx + side * reach, cy - int(4 * scale) + side * wiggle],
+                  fill=params['highlight'], width=1)
+
+def procedural_definition(params):
+    """SpriteDefinition rendering one variant from its variant_params."""
+    values = dict(params)
+    name = f"proc_{values['kind']}_{values['seed']}_{values['index']:05d}"
+    return SpriteDefinition(
+        name=name,
+        module='procedural_enemies',
+        draw_function=f"draw_procedural_{values['kind']}",
+        frame_width=32,
+        frame_height=32,
+        num_frames=NUM_FRAMES,
+        sheet_filename=f'{name}.png',
+        palette='enemy',
+        animation='move',
+        draw_args=(params,),
+    )
+
+def procedural_definitions(count, seed=DEFAULT_SEED, kind=None, start=0):
+    """Definitions for variants start..start+count-1 of a run."""
+    return [procedural_definition(variant_params(seed, index, kind)) for index in range(start, start + count)]
+
+def _render_chunk(definitions, images_dir=None):
+    """Render a chunk of variants in a worker; returns their sheets as index arrays.
+
+    With images_dir the sheets are also written there as PNGs.
+    """
+    sheets = []
+    for definition in definitions:
+        sheet = render_definition(definition)
+        if images_dir:
+            save_if_changed(trim_palette(sheet), os.path.join(images_dir, definition.sheet_filename), optimize=True)
+        sheets.append(np.asarray(sheet))
+    return sheets
+
+def stream_frames(definitions, jobs=None, images_dir=None, chunk_size=CHUNK_SIZE):
+    """Yield (definition, frame_index, frame_image) for every variant, in order.
+
+    Chunks render across jobs worker processes and are yielded as soon as
+    each is done.
+    """
+    chunks = [definitions[start:start + chunk_size] for start in range(0, len(definitions), chunk_size)]
+    jobs = min(jobs or os.cpu_count() or 1, len(chunks)) if chunks else 1
+    if jobs <= 1:
+        results = (_render_chunk(chunk, images_dir) for chunk in chunks)
+        yield from _chunk_frames(chunks, results)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from _chunk_frames(chunks, pool.map(_render_chunk, chunks, [images_dir] * len(chunks)))
+
+def _chunk_frames(chunks, results):
+    palettes = {}
+    for chunk, sheets in zip(chunks, results):
+        for definition, sheet in zip(chunk, sheets):
+            palette = palettes.setdefault(definition.palette, flat_palette(definition.palette))
+            for frame in range(definition.num_frames):
+                left = frame * definition.frame_width
+                frame_img = Image.fromarray(np.ascontiguousarray(sheet[:, left:left + definition.frame_width]), 'P')
+                frame_img.putpalette(palette)
+                yield definition, frame, frame_img
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded procedural enemy variants into atlases.")
+    parser.add_argument('--count', '-n', type=int, default=DEFAULT_COUNT,
+                        help=f"number of variants to generate (default: {DEFAULT_COUNT})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f"run seed (default: {DEFAULT_SEED})")
+    parser.add_argument('--kind', choices=KINDS, default=None,
+                        help="generate only this enemy kind (default: both)")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="worker processes to use (default: CPU count)")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="directory to write the atlases (and sheets) to (default: procedural-sprites)")
+    parser.add_argument('--sheets', action='store_true',
+                        help="also write every variant's sprite sheet as a PNG")
+    parser.add_argument('--atlas-name', default=DEFAULT_ATLAS_NAME,
+                        help=f"atlas filename prefix (default: {DEFAULT_ATLAS_NAME})")
+    parser.add_argument('--atlas-max-size', type=int, default=DEFAULT_MAX_SIZE,
+                        help=f"largest atlas edge in pixels (default: {DEFAULT_MAX_SIZE})")
+    parser.add_argument('--atlas-scales', type=parse_scales, default=(), metavar='N,N',
+                        help="integer scales to pre-render atlases at (default: none)")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    definitions = procedural_definitions(args.count, args.seed, args.kind)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Frames go straight from the workers into the packer, which keeps only
+    # the distinct trimmed images
+    frames = stream_frames(definitions, args.jobs, args.output_dir if args.sheets else None)
+    written = write_atlases(frames, args.output_dir, args.atlas_name, args.atlas_max_size, scales=args.atlas_scales)
+    pages = sum(1 for path in written if path.endswith('.png'))
+    num_frames = sum(definition.num_frames for definition in definitions)
+
+    print(f"Generated {len(definitions)} variant(s), {num_frames} frame(s) and packed {pages} atlas image(s) "
+          f"in {time.perf_counter() - start:.2f}s; manifest at {written[-1]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
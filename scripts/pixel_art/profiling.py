@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and memory instrumentation for the sprite build.
+Code wraps each pipeline stage in `with stage('name'):`. When profiling is
+disabled (the default) stage() returns a shared no-op context manager, so the
+instrumentation costs one function call and one global lookup per stage.
+
+When enabled, each stage records wall time, CPU time, the tracemalloc peak
+reached inside it and the process peak RSS. Events can be written as a Chrome
+trace_event JSON file (open in chrome://tracing or Perfetto) and summarised as
+a text table. Worker processes enable profiling in their pool initializer and
+hand their events back with drain_events().
+"""
+
+from contextlib import nullcontext
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL_STAGE = nullcontext()
+_profiler = None
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+class _Stage:
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.profiler._enter(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._exit(self)
+        return False
+
+class Profiler:
+    """Collects stage events for one process."""
+
+    def __init__(self, trace_memory=True):
+        self.events = []
+        self.trace_memory = trace_memory
+        self._stack = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name, args):
+        return _Stage(self, name, args)
+
+    def _flush_peak_to_parent(self):
+        if self.trace_memory and self._stack:
+            parent = self._stack[-1]
+            parent.memory_peak = max(parent.memory_peak, tracemalloc.get_traced_memory()[1])
+
+    def _enter(self, stage):
+        # Credit the parent with what it allocated so far before resetting the peak
+        self._flush_peak_to_parent()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        stage.memory_peak = 0
+        self._stack.append(stage)
+        stage.cpu_start = time.process_time_ns()
+        stage.wall_start = time.perf_counter_ns()
+
+    def _exit(self, stage):
+        wall_end = time.perf_counter_ns()
+        cpu_end = time.process_time_ns()
+        self._stack.pop()
+
+        args = dict(stage.args)
+        for parent in self._stack:
+            if 'sprite' in parent.args:
+                args.setdefault('sprite', parent.args['sprite'])
+        args['cpu_ms'] = (cpu_end - stage.cpu_start) / 1e6
+        if self.trace_memory:
+            stage.memory_peak = max(stage.memory_peak, tracemalloc.get_traced_memory()[1])
+            args['tracemalloc_peak_kb'] = stage.memory_peak // 1024
+        rss = _peak_rss_kb()
+        if rss is not None:
+            args['peak_rss_kb'] = rss
+
+        self.events.append({
+            'name': stage.name,
+            'cat': 'sprite-build',
+            'ph': 'X',
+            'ts': stage.wall_start / 1000,
+            'dur': (wall_end - stage.wall_start) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        })
+
+        # Pass this stage's peak up so the parent covers its children
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            if self._stack:
+                self._stack[-1].memory_peak = max(self._stack[-1].memory_peak, stage.memory_peak)
+
+def stage(name, **args):
+    """Context manager timing one pipeline stage (no-op unless enabled)."""
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, args)
+
+def enable(trace_memory=True):
+    """Start collecting events in this process."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(trace_memory)
+    return _profiler
+
+def is_enabled():
+    return _profiler is not None
+
+def drain_events():
+    """Return and clear the events collected so far in this process."""
+    if _profiler is None:
+        return []
+    events, _profiler.events = _profiler.events, []
+    return events
+
+def add_events(events):
+    """Merge events collected in another process."""
+    if _profiler is not None:
+        _profiler.events.extend(events)
+
+def write_chrome_trace(path, events):
+    """Write events in Chrome trace_event JSON format."""
+    process_names = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f'sprite build {pid}'}}
+                     for pid in sorted({event['pid'] for event in events})]
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': process_names + events, 'displayTimeUnit': 'ms'}, f)
+
+def summary_table(events):
+    """Text table of totals per stage and per sprite."""
+    def rows(key):
+        totals = {}
+        for event in events:
+            name = key(event)
+            if name is None:
+                continue
+            total = totals.setdefault(name, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'memory': 0, 'rss': 0})
+            total['count'] += 1
+            total['wall'] += event['dur'] / 1000
+            total['cpu'] += event['args']['cpu_ms']
+            total['memory'] = max(total['memory'], event['args'].get('tracemalloc_peak_kb', 0))
+            total['rss'] = max(total['rss'], event['args'].get('peak_rss_kb', 0))
+        return sorted(totals.items(), key=lambda item: -item[1]['wall'])
+
+    lines = []
+    for title, key in (('stage', lambda event: event['name']),
+                       ('sprite', lambda event: event['args']['sprite'] if event['name'] == 'sprite' else None)):
+        if lines:
+            lines.append('')
+        lines.append(f"{title:<24} {'count':>6} {'wall ms':>10} {'cpu ms':>10} {'py peak KB':>11} {'rss KB':>9}")
+        for name, total in rows(key):
+            lines.append(f"{name:<24} {total['count']:>6} {total['wall']:>10.2f} {total['cpu']:>10.2f} "
+                         f"{total['memory']:>11} {total['rss']:>9}")
+    return '\n'.join(lines)
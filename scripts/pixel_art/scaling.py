@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Integer nearest-neighbour scaling for MerterBlaster sprite images.
+Pre-scaled variants let the game blit sprites 1:1 at the devicePixelRatio it
+runs at instead of scaling (and possibly smoothing) them on the canvas. Whole
+images are scaled with two array repeats, so indexed images stay indexed and
+keep their palette and transparency.
+"""
+
+import numpy as np
+from PIL import Image
+
+def upscale_array(array, factor):
+    """Repeat every pixel of an (h, w, ...) array factor times in x and y."""
+    if factor < 1:
+        raise ValueError(f"Scale factor must be at least 1, got {factor}")
+    if factor == 1:
+        return array
+    return np.repeat(np.repeat(array, factor, axis=0), factor, axis=1)
+
+def upscale_image(image, factor):
+    """Nearest-neighbour upscale of a 'P', 'L', 'RGB' or 'RGBA' image by an integer factor."""
+    if factor == 1:
+        return image
+    scaled = Image.fromarray(upscale_array(np.asarray(image), factor), image.mode)
+    if image.mode == 'P':
+        scaled.putpalette(image.getpalette())
+    if 'transparency' in image.info:
+        scaled.info['transparency'] = image.info['transparency']
+    return scaled
+
+def parse_scales(text):
+    """Parse a comma-separated list of integer scale factors, e.g. '2,3,4'."""
+    if not text:
+        return ()
+    try:
+        scales = sorted({int(part) for part in text.split(',') if part.strip()})
+    except ValueError:
+        raise ValueError(f"Scales must be comma-separated integers, got {text!r}") from None
+    if scales and scales[0] < 1:
+        raise ValueError(f"Scale factors must be at least 1, got {text!r}")
+    return tuple(scales)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Declarative sprite specs for MerterBlaster enemies.
+A spec is a JSON (or TOML) file in sprite_specs/ that declares a sprite's frame
+size, palette, per-frame parameter tracks and a list of shapes. Coordinates and
+sizes may be numbers or small expressions such as "cx - 6" or "12 + m * wing".
+
+Each spec is compiled once into a flat list of draw ops: polygon outlines are
+expanded into their edge lines, mirrored shapes are duplicated and every
+expression is compiled to a code object. The ops resolved for each frame are
+memoized, so rendering a frame just replays a tuple of draw calls.
+
+Expressions can use w, h, cx (= w // 2), cy (= h // 2), frame, m (1, or -1 on
+the mirrored copy of a shape), every track, the derived values in "vars" and
+int, round, min, max and abs.
+"""
+
+import ast
+from functools import lru_cache
+import json
+import os
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from rasterizer import draw_radial_glow
+from sprites import SCRIPT_DIR
+
+SPEC_DIR = os.path.join(SCRIPT_DIR, 'sprite_specs')
+SPEC_EXTENSIONS = ('.json', '.toml')
+
+BUILTIN_NAMES = ('w', 'h', 'cx', 'cy', 'frame', 'm')
+FUNCTIONS = {'int': int, 'round': round, 'min': min, 'max': max, 'abs': abs}
+_GLOBALS = {'__builtins__': {}, **FUNCTIONS}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.BinOp, ast.UnaryOp, ast.Call,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.USub, ast.UAdd,
+)
+
+def list_specs(directory=SPEC_DIR):
+    """Spec filenames in directory (not its subdirectories), sorted."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if name.endswith(SPEC_EXTENSIONS))
+
+def spec_path(filename):
+    return os.path.join(SPEC_DIR, filename)
+
+def spec_source(filename):
+    """Raw bytes of a spec file, hashed by the build cache."""
+    with open(spec_path(filename), 'rb') as f:
+        return f.read()
+
+def load_spec(filename):
+    """Parse a spec file into a dict."""
+    data = spec_source(filename)
+    if filename.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError(f"{filename}: TOML specs need Python 3.11 or newer")
+        return tomllib.loads(data.decode('utf-8'))
+    return json.loads(data)
+
+class _Expression:
+    """A compiled spec expression, evaluated against a frame's namespace."""
+
+    __slots__ = ('text', 'code')
+
+    def __init__(self, text, names, where):
+        try:
+            tree = ast.parse(text, mode='eval')
+        except SyntaxError as error:
+            raise ValueError(f"{where}: invalid expression {text!r} ({error.msg})") from None
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"{where}: unsupported syntax in {text!r}")
+            if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+                raise ValueError(f"{where}: only {', '.join(FUNCTIONS)} can be called in {text!r}")
+            if isinstance(node, ast.Name) and node.id not in names and node.id not in FUNCTIONS:
+                raise ValueError(f"{where}: unknown name '{node.id}' in {text!r}")
+        self.text = text
+        self.code = compile(tree, where, 'eval')
+
+    def evaluate(self, namespace):
+        return eval(self.code, _GLOBALS, namespace)
+
+def _compile_value(value, names, where):
+    if isinstance(value, str):
+        return _Expression(value, names, where)
+    if isinstance(value, (int, float)):
+        return value
+    raise ValueError(f"{where}: expected a number or expression, got {value!r}")
+
+def _compile_point(point, names, where):
+    if not isinstance(point, (list, tuple)) or len(point) != 2:
+        raise ValueError(f"{where}: expected an [x, y] point, got {point!r}")
+    return tuple(_compile_value(value, names, where) for value in point)
+
+class _Mirrored:
+    """Template for coordinates mirrored about cx (x' = 2 * cx - x).
+
+    coords is an (x, y) point or an (x0, y0, x1, y1) box of templates,
+    resolved with m negated. A box swaps its x values so x0 <= x1 still holds.
+    """
+
+    __slots__ = ('coords', 'box')
+
+    def __init__(self, coords, box=False):
+        self.coords = coords
+        self.box = box
+
+class _Offset:
+    """Template for center + sign * radius, used to turn circles into boxes."""
+
+    __slots__ = ('center', 'radius', 'sign')
+
+    def __init__(self, center, radius, sign):
+        self.center = center
+        self.radius = radius
+        self.sign = sign
+
+def _mirror_point(point):
+    return _Mirrored(point)
+
+def _resolve(template, namespace):
+    """Evaluate a template (constant, expression or nested tuple) for one frame."""
+    if isinstance(template, _Expression):
+        return template.evaluate(namespace)
+    if isinstance(template, tuple):
+        return tuple(_resolve(item, namespace) for item in template)
+    if isinstance(template, _Mirrored):
+        namespace['m'] = -namespace['m']
+        try:
+            coords = _resolve(template.coords, namespace)
+        finally:
+            namespace['m'] = -namespace['m']
+        axis = 2 * namespace['cx']
+        if template.box:
+            return (axis - coords[2], coords[1], axis - coords[0], coords[3])
+        return (axis - coords[0], coords[1])
+    if isinstance(template, _Offset):
+        return _resolve(template.center, namespace) + template.sign * _resolve(template.radius, namespace)
+    return template
+
+def _shape_ops(shape, names, where):
+    """Compile one shape into (kind, args, kwargs) op templates, unmirrored."""
+    kind = shape.get('type')
+
+    def required(key):
+        if key not in shape:
+            raise ValueError(f"{where}: {kind} needs '{key}'")
+        return shape[key]
+
+    def values(key, count=None, minimum=1):
+        # Lists of coordinates, checked here so a malformed one names the shape
+        value = required(key)
+        if not isinstance(value, (list, tuple)) or len(value) < minimum or count not in (None, len(value)):
+            expected = f"{count} values" if count is not None else f"a list of at least {minimum} items"
+            raise ValueError(f"{where}: {kind} '{key}' must be {expected}, got {value!r}")
+        return value
+
+    def points(key='points', minimum=1):
+        return tuple(_compile_point(point, names, where) for point in values(key, minimum=minimum))
+
+    def optional(key, default=None):
+        value = shape.get(key, default)
+        return None if value is None else _compile_value(value, names, where)
+
+    # Palette indices and widths may also be expressions (e.g. blinking lights)
+    fill = optional('fill')
+    outline = optional('outline')
+    width = optional('width', 1)
+
+    if kind == 'polygon':
+        pts = points(minimum=2)
+        if shape.get('symmetry') == 'x':
+            # Points describe one half; the mirrored half follows in reverse.
+            # Points on the axis repeat, which only adds zero-length edges.
+            pts = pts + tuple(_mirror_point(point) for point in reversed(pts))
+        elif shape.get('symmetry') is not None:
+            raise ValueError(f"{where}: symmetry must be 'x'")
+        ops = []
+        if fill is not None:
+            ops.append(('polygon', (pts,), {'fill': fill}))
+        if outline is not None:
+            # Edge by edge, as the hand-written sprites outline their hulls
+            for i, start in enumerate(pts):
+                ops.append(('line', ((start, pts[(i + 1) % len(pts)]),), {'fill': outline, 'width': width}))
+        return ops
+
+    if kind in ('rectangle', 'ellipse'):
+        if 'box' in shape:
+            box = tuple(_compile_value(value, names, where) for value in values('box', count=4))
+        elif kind == 'ellipse':
+            center = _compile_point(required('center'), names, where)
+            if isinstance(shape.get('radius'), (list, tuple)):
+                rx, ry = values('radius', count=2)
+            else:
+                rx = ry = required('radius')
+            rx, ry = _compile_value(rx, names, where), _compile_value(ry, names, where)
+            box = (_Offset(center[0], rx, -1), _Offset(center[1], ry, -1),
+                   _Offset(center[0], rx, 1), _Offset(center[1], ry, 1))
+        else:
+            raise ValueError(f"{where}: rectangle needs 'box'")
+        kwargs = {}
+        if fill is not None:
+            kwargs['fill'] = fill
+        if outline is not None:
+            kwargs['outline'] = outline
+            kwargs['width'] = width
+        return [(kind, (box,), kwargs)]
+
+    if kind == 'line':
+        fill = _compile_value(required('fill'), names, where)
+        return [('line', (points(minimum=2),), {'fill': fill, 'width': width})]
+
+    if kind == 'point':
+        fill = _compile_value(required('fill'), names, where)
+        return [('point', (point,), {'fill': fill}) for point in points()]
+
+    if kind == 'glow':
+        center = _compile_point(required('center'), names, where)
+        radius = _compile_value(required('radius'), names, where)
+        base = _compile_value(required('base'), names, where)
+        span = _compile_value(required('span'), names, where)
+        return [('glow', (center, radius, base, span), {})]
+
+    raise ValueError(f"{where}: unknown shape type {kind!r}")
+
+def _mirror_template(template):
+    """Mirror the coordinates in an op's positional args about cx."""
+    kind, args, kwargs = template
+    if kind in ('polygon', 'line'):
+        return (kind, (tuple(_mirror_point(point) for point in args[0]),), kwargs)
+    if kind == 'point':
+        return (kind, (_mirror_point(args[0]),), kwargs)
+    if kind in ('rectangle', 'ellipse'):
+        return (kind, (_Mirrored(args[0], box=True),), kwargs)
+    if kind == 'glow':
+        return (kind, (_mirror_point(args[0]),) + args[1:], kwargs)
+    raise AssertionError(kind)
+
+class CompiledSpec:
+    """A spec compiled to a flat op list.
+
+    ops is a tuple of (kind, args, kwargs) templates. Derived vars are
+    evaluated once per frame with m = 1.
+    """
+
+    def __init__(self, spec, where='spec'):
+        self.spec = spec
+        self.where = where
+        self.num_frames = spec.get('num_frames', 1)
+        self.tracks = {}
+        for name, values in spec.get('tracks', {}).items():
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"{where}: track '{name}' must be a non-empty list")
+            self.tracks[name] = values
+
+        names = set(BUILTIN_NAMES) | set(self.tracks)
+        self.variables = []
+        for name, text in spec.get('vars', {}).items():
+            self.variables.append((name, _compile_value(text, names, f"{where}: vars.{name}")))
+            names.add(name)
+
+        ops = []
+        for index, shape in enumerate(spec.get('shapes', [])):
+            shape_where = f"{where}: shapes[{index}]"
+            templates = _shape_ops(shape, names, shape_where)
+            ops.extend(templates)
+            if shape.get('mirror'):
+                ops.extend(_mirror_template(template) for template in templates)
+        self.ops = tuple(ops)
+
+    def namespace(self, frame_num, width, height):
+        namespace = {'w': width, 'h': height, 'cx': width // 2, 'cy': height // 2, 'frame': frame_num, 'm': 1}
+        for name, values in self.tracks.items():
+            namespace[name] = values[frame_num % len(values)]
+        for name, value in self.variables:
+            namespace[name] = _resolve(value, namespace)
+        return namespace
+
+    def frame_ops(self, frame_num, width, height):
+        """Resolve every op for one frame into concrete (kind, args, kwargs)."""
+        namespace = self.namespace(frame_num, width, height)
+        resolved = []
+        for kind, args, kwargs in self.ops:
+            resolved.append((kind, _resolve(args, namespace),
+                             {key: _resolve(value, namespace) for key, value in kwargs.items()}))
+        return tuple(resolved)
+
+@lru_cache(maxsize=None)
+def compiled_spec(filename):
+    """Compile a spec file once per process (see clear_spec_cache)."""
+    return CompiledSpec(load_spec(filename), filename)
+
+@lru_cache(maxsize=None)
+def _frame_ops(filename, frame_num, width, height):
+    return compiled_spec(filename).frame_ops(frame_num, width, height)
+
+def clear_spec_cache():
+    """Forget compiled specs and resolved frames, e.g. after a spec file changes."""
+    compiled_spec.cache_clear()
+    _frame_ops.cache_clear()
+
+def replay(draw, ops):
+    """Issue resolved ops on an ImageDraw (or FrameDraw)."""
+    for kind, args, kwargs in ops:
+        if kind == 'glow':
+            draw_radial_glow(draw, *args)
+        else:
+            getattr(draw, kind)(*args, **kwargs)
+
+def draw_spec_frame(filename, draw, frame_num, width, height):
+    """Draw one frame of the sprite described by a spec file."""
+    replay(draw, _frame_ops(filename, frame_num, width, height))
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Sprite definitions and sheet rendering shared by the MerterBlaster generators.
+Each generate_*.py script lists its sprites in a module-level SPRITES list so
+the unified build (build_sprites.py) can find and render every sheet.
+build_all builds a list of sprites, in parallel and through the build cache,
+for both the unified build and each generator run on its own.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+import filecmp
+from functools import partial
+import importlib
+import io
+import json
+import os
+import sys
+from typing import Optional
+
+from PIL import Image
+
+from crt_filter import apply_crt_filter, write_crt_png
+from encoders import reduce_colors, trim_palette
+from palette_swap import render_variants, variant_palettes
+from palettes import flat_palette
+import profiling
+from profiling import add_events, drain_events, stage
+from rasterizer import render_frames
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), 'assets', 'images')
+# CRT previews at least this many pixels are filtered and encoded in bands
+STREAM_CRT_MIN_PIXELS = 4096 * 4096
+
+@dataclass(frozen=True)
+class SpriteDefinition:
+    """Describes one sprite sheet: how to draw it and which files to write.
+
+    Functions are referenced by module and attribute name rather than by
+    object so definitions pickle cleanly into worker processes. Sprites drawn
+    from a declarative spec (see sprite_spec.py) name the spec file, which is
+    passed to the draw function as its first argument. Any draw_args follow
+    it; they are plain JSON-friendly values, so the build cache hashes them
+    along with the rest of the definition.
+
+    variants are PaletteVariant index remaps (see palette_swap.py); each is
+    written as its own sheet, by default named after the base sheet
+    (enemy_zapper_elite.png). variant_palette_filename, if set, also exports
+    the variants as palettes for swapping at runtime.
+
+    dependencies names helper modules the draw function relies on (boss part
+    renderers, say). Their whole source is hashed into the build cache key
+    and --watch reloads them, so editing one rebuilds the sprites using it.
+    """
+    name: str
+    module: str
+    draw_function: str
+    frame_width: int
+    frame_height: int
+    num_frames: int
+    sheet_filename: str
+    palette: str  # Name of a palette in palettes.py
+    animation: str = 'idle'
+    frame_duration_ms: int = 100
+    crt_preview_filename: Optional[str] = None
+    frame_filename: Optional[str] = None  # Format string with a {frame} field
+    spec: Optional[str] = None  # Spec filename in sprite_specs/
+    draw_args: tuple = ()  # Extra leading arguments for the draw function
+    variants: tuple = ()  # PaletteVariant remaps of the sheet
+    variant_filename: Optional[str] = None  # Format string with a {variant} field
+    variant_palette_filename: Optional[str] = None  # JSON runtime palettes
+    dependencies: tuple = ()  # Names of helper modules the drawing uses
+
+    def output_filenames(self):
+        """Filenames this sprite writes, in build order."""
+        filenames = [self.sheet_filename]
+        if self.crt_preview_filename:
+            filenames.append(self.crt_preview_filename)
+        if self.frame_filename:
+            filenames.extend(self.frame_filename.format(frame=frame) for frame in range(self.num_frames))
+        filenames.extend(self.variant_sheet_filename(variant) for variant in self.variants)
+        if self.variant_palette_filename:
+            filenames.append(self.variant_palette_filename)
+        return filenames
+
+    def runtime_filenames(self):
+        """Outputs the game loads: the sheet, variant sheets and runtime palettes.
+
+        The CRT preview and per-frame files are for reference only.
+        """
+        filenames = [self.sheet_filename]
+        filenames.extend(self.variant_sheet_filename(variant) for variant in self.variants)
+        if self.variant_palette_filename:
+            filenames.append(self.variant_palette_filename)
+        return filenames
+
+    def variant_sheet_filename(self, variant):
+        if self.variant_filename:
+            return self.variant_filename.format(variant=variant.name)
+        stem, ext = os.path.splitext(self.sheet_filename)
+        return f'{stem}_{variant.name}{ext}'
+
+    def variant_definitions(self):
+        """One definition per variant, describing its sheet like a sprite of its own.
+
+        Used to pack variant sheets alongside their base; the returned
+        definitions are not meant to be built.
+        """
+        return [replace(self, name=f'{self.name}_{variant.name}',
+                        sheet_filename=self.variant_sheet_filename(variant),
+                        crt_preview_filename=None, frame_filename=None, variants=(),
+                        variant_filename=None, variant_palette_filename=None)
+                for variant in self.variants]
+
+    def load_module(self):
+        if SCRIPT_DIR not in sys.path:
+            sys.path.insert(0, SCRIPT_DIR)
+        return importlib.import_module(self.module)
+
+    def dependency_modules(self):
+        """Import and return the helper modules named in dependencies."""
+        self.load_module()
+        return [importlib.import_module(name) for name in self.dependencies]
+
+    def resolve(self):
+        """Return the draw function for this sprite."""
+        draw_function = getattr(self.load_module(), self.draw_function)
+        args = ((self.spec,) if self.spec else ()) + tuple(self.draw_args)
+        if args:
+            return partial(draw_function, *args)
+        return draw_function
+
+def discover_sprites(directory=SCRIPT_DIR):
+    """Collect SPRITES from every generate_*.py module in directory, sorted by name."""
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    sprites = {}
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith('generate_') and filename.endswith('.py')):
+            continue
+        module = importlib.import_module(filename[:-3])
+        for definition in getattr(module, 'SPRITES', []):
+            if definition.name in sprites:
+                raise ValueError(f"Duplicate sprite name '{definition.name}' in {filename}")
+            sprites[definition.name] = definition
+
+    return [sprites[name] for name in sorted(sprites)]
+
+def select_sprites(sprites, names):
+    """Filter definitions down to the requested names, keeping build order."""
+    if not names:
+        return sprites
+    known = {definition.name for definition in sprites}
+    unknown = sorted(set(names) - known)
+    if unknown:
+        raise ValueError(f"Unknown sprite(s): {', '.join(unknown)} (known: {', '.join(sorted(known))})")
+    return [definition for definition in sprites if definition.name in names]
+
+def render_sprite_sheet(draw_function, palette, frame_width, frame_height, num_frames):
+    """Draw num_frames frames side by side into an indexed sprite sheet.
+
+    palette is the name of a palette in palettes.py. Frames share one
+    preallocated frame buffer (see rasterizer.py).
+    """
+    sheet = Image.new('P', (frame_width * num_frames, frame_height), 0)
+    sheet.putpalette(flat_palette(palette))
+    return render_frames(sheet, draw_function, frame_width, frame_height, num_frames)
+
+def render_definition(definition):
+    """Render the sprite sheet described by a SpriteDefinition."""
+    return render_sprite_sheet(definition.resolve(), definition.palette, definition.frame_width,
+                               definition.frame_height, definition.num_frames)
+
+def save_if_changed(image, path, **options):
+    """Encode image and write it only if the bytes differ from what is on disk.
+
+    Leaving identical files untouched keeps their mtimes stable for downstream caches.
+    """
+    with stage('encode', file=os.path.basename(path), **options):
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', **options)
+        data = buffer.getvalue()
+    with stage('write', file=os.path.basename(path)):
+        try:
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+        except OSError:
+            pass
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+
+def save_crt_preview(image, path):
+    """Write the CRT-filtered preview of image, skipping unchanged files.
+
+    Large images go through the streaming filter so the full RGB copy is
+    never held in memory. Smaller previews are stored indexed when they have
+    at most 256 colors.
+    """
+    if image.width * image.height < STREAM_CRT_MIN_PIXELS:
+        with stage('crt'):
+            crt_image = reduce_colors(apply_crt_filter(image))
+        return save_if_changed(crt_image, path, optimize=True)
+
+    tmp_path = path + '.tmp'
+    with stage('crt', streamed=True):
+        write_crt_png(image, tmp_path)
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+def write_json_if_changed(data, path, compact=False):
+    """Write data as JSON unless the file already holds exactly that text.
+
+    compact drops the indentation and spaces, for machine-read sidecars.
+    """
+    if compact:
+        text = json.dumps(data, separators=(',', ':'), sort_keys=True) + '\n'
+    else:
+        text = json.dumps(data, indent=2, sort_keys=True) + '\n'
+    try:
+        with open(path) as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w') as f:
+        f.write(text)
+    return True
+
+def build_sprite(definition, images_dir=DEFAULT_IMAGES_DIR):
+    """Render, filter and encode every output of one sprite.
+
+    Returns the list of paths written, in a fixed order.
+    """
+    os.makedirs(images_dir, exist_ok=True)
+    with stage('render'):
+        sheet = render_definition(definition)
+    written = []
+
+    # Save original (for game use), keeping only the palette entries it uses
+    sheet_path = os.path.join(images_dir, definition.sheet_filename)
+    save_if_changed(trim_palette(sheet), sheet_path, optimize=True)
+    written.append(sheet_path)
+
+    # Create CRT-filtered version for reference
+    if definition.crt_preview_filename:
+        crt_path = os.path.join(images_dir, definition.crt_preview_filename)
+        save_crt_preview(sheet, crt_path)
+        written.append(crt_path)
+
+    # Also save individual frames for reference
+    if definition.frame_filename:
+        for frame in range(definition.num_frames):
+            left = frame * definition.frame_width
+            frame_img = sheet.crop((left, 0, left + definition.frame_width, definition.frame_height))
+            frame_path = os.path.join(images_dir, definition.frame_filename.format(frame=frame))
+            save_if_changed(trim_palette(frame_img), frame_path, optimize=True)
+            written.append(frame_path)
+
+    # Palette-swap variants: one index LUT pass over the base sheet each
+    if definition.variants:
+        with stage('variants', count=len(definition.variants)):
+            for variant, image in render_variants(sheet, definition.variants):
+                variant_path = os.path.join(images_dir, definition.variant_sheet_filename(variant))
+                save_if_changed(trim_palette(image), variant_path, optimize=True)
+                written.append(variant_path)
+    if definition.variant_palette_filename:
+        palettes_path = os.path.join(images_dir, definition.variant_palette_filename)
+        data = variant_palettes(sheet, definition.variants, definition.palette)
+        data['sheet'] = definition.sheet_filename
+        write_json_if_changed(data, palettes_path, compact=True)
+        written.append(palettes_path)
+
+    return written
+
+# Set in pool workers, which hand their profile events back with each result
+_in_worker = False
+
+def _init_worker(profile):
+    global _in_worker
+    _in_worker = True
+    if profile:
+        profiling.enable()
+
+def _build_task(definition, images_dir):
+    """Build one sprite, returning its written paths and any profile events.
+
+    Events are drained so a worker process hands back only this sprite's.
+    """
+    with stage('sprite', sprite=definition.name):
+        written = build_sprite(definition, images_dir)
+    if _in_worker:
+        return written, drain_events()
+    return written, []
+
+def build_all(sprites, images_dir=DEFAULT_IMAGES_DIR, jobs=None, cache=None, force=False):
+    """Build sprites, in parallel when jobs > 1.
+
+    With a cache, sprites whose outputs are already up to date are skipped and
+    previously built versions are restored from the cache; force rebuilds
+    everything. Returns a list of (definition, status, written_paths) in the
+    same order as sprites, where status is 'built', 'restored' or 'cached'.
+    """
+    # build_cache imports this module
+    from build_cache import sprite_cache_key
+
+    results = {}
+    keys = {}
+    to_build = []
+    for definition in sprites:
+        if cache is None:
+            to_build.append(definition)
+            continue
+        with stage('cache-check', sprite=definition.name):
+            key = keys[definition.name] = sprite_cache_key(definition)
+            if force:
+                to_build.append(definition)
+            elif cache.is_fresh(definition, key, images_dir):
+                written = [os.path.join(images_dir, name) for name in definition.output_filenames()]
+                results[definition.name] = ('cached', written)
+            else:
+                written = cache.restore(definition, key, images_dir)
+                if written is None:
+                    to_build.append(definition)
+                else:
+                    results[definition.name] = ('restored', written)
+
+    jobs = min(jobs or os.cpu_count() or 1, len(to_build))
+    images_dirs = [images_dir] * len(to_build)
+    if jobs <= 1:
+        built = list(map(_build_task, to_build, images_dirs))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(profiling.is_enabled(),)) as pool:
+            built = list(pool.map(_build_task, to_build, images_dirs))
+
+    for definition, (written, events) in zip(to_build, built):
+        results[definition.name] = ('built', written)
+        add_events(events)
+        if cache is not None:
+            with stage('cache-store', sprite=definition.name):
+                cache.store(keys[definition.name], written)
+    if cache is not None:
+        cache.save()
+
+    return [(definition,) + results[definition.name] for definition in sprites]
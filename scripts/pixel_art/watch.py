@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Source watching and hot reloading for `build_sprites.py --watch`.
+The watcher polls the generate_*.py scripts, the helper modules their sprites
+list as dependencies (boss_parts.py, particles.py) and sprite specs for
+changes, which costs one stat per file per poll and needs no extra dependency.
+Changed modules are reloaded in place with importlib.reload, helpers before
+the generators that import from them, and spec caches are dropped, so the
+next build sees the new draw functions while palettes, Pillow and every
+unchanged module stay loaded.
+
+Other shared modules (palettes.py, rasterizer.py, ...) are not reloaded;
+restart the watcher after editing them.
+"""
+
+import importlib
+import os
+import sys
+import time
+import traceback
+
+import sprite_spec
+from sprites import SCRIPT_DIR
+
+DEFAULT_POLL_INTERVAL = 0.05
+SPEC_MODULE = 'generate_spec_sprites'
+
+def _loaded_generators():
+    return [module for name, module in list(sys.modules.items())
+            if name.startswith('generate_') and module is not None]
+
+def dependency_files():
+    """Map the source file of every dependency of a loaded generator's sprites to its module name."""
+    files = {}
+    for generator in _loaded_generators():
+        for definition in getattr(generator, 'SPRITES', []):
+            for module in definition.dependency_modules():
+                files[os.path.abspath(module.__file__)] = module.__name__
+    return files
+
+def watched_files(directory=SCRIPT_DIR):
+    """Generator scripts, their dependency modules and spec files that --watch reacts to."""
+    files = [os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith('generate_') and name.endswith('.py')]
+    files.extend(os.path.join(sprite_spec.SPEC_DIR, name) for name in sprite_spec.list_specs())
+    files.extend(path for path in dependency_files() if path not in files)
+    return sorted(files)
+
+def dependent_generators(dependencies):
+    """Names of loaded generator modules with a sprite depending on any of dependencies."""
+    return {generator.__name__ for generator in _loaded_generators()
+            if any(set(definition.dependencies) & set(dependencies)
+                   for definition in getattr(generator, 'SPRITES', []))}
+
+class SourceWatcher:
+    """Polls file stats and reports which paths changed since the last poll."""
+
+    def __init__(self, list_files=watched_files):
+        self.list_files = list_files
+        self.stats = self._snapshot()
+
+    def _snapshot(self):
+        stats = {}
+        for path in self.list_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def poll(self):
+        """Return the set of paths added, removed or modified."""
+        stats = self._snapshot()
+        changed = {path for path in stats.keys() | self.stats.keys() if stats.get(path) != self.stats.get(path)}
+        self.stats = stats
+        return changed
+
+def reload_sources(changed):
+    """Reload the generator and dependency modules for changed paths.
+
+    Spec edits reload the spec generator (which reads spec headers at import)
+    and clear the compiled spec caches. A changed dependency is reloaded
+    first and then every generator using it, so their from-imports pick up
+    the new functions.
+    """
+    dependencies = dependency_files()
+    modules = set()
+    changed_dependencies = []
+    for path in changed:
+        if os.path.dirname(path) == sprite_spec.SPEC_DIR:
+            modules.add(SPEC_MODULE)
+        elif os.path.abspath(path) in dependencies:
+            changed_dependencies.append(dependencies[os.path.abspath(path)])
+        elif path.endswith('.py'):
+            modules.add(os.path.basename(path)[:-3])
+    if SPEC_MODULE in modules:
+        sprite_spec.clear_spec_cache()
+
+    for name in sorted(changed_dependencies):
+        importlib.reload(sys.modules[name])
+    modules |= dependent_generators(changed_dependencies)
+    for name in sorted(modules):
+        module = sys.modules.get(name)
+        if module is None:
+            continue  # New scripts are imported by the next discovery
+        importlib.reload(module)
+    return sorted(changed_dependencies) + sorted(modules)
+
+def watch(rebuild, interval=DEFAULT_POLL_INTERVAL, watcher=None):
+    """Call rebuild(changed_paths) after reloading sources, until interrupted.
+
+    Errors from reloading or rebuilding (a syntax error mid-edit, say) are
+    printed and the watcher keeps running.
+    """
+    watcher = watcher or SourceWatcher()
+    print(f"Watching {len(watcher.stats)} file(s) for changes (Ctrl+C to stop)...", flush=True)
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            try:
+                reload_sources(changed)
+                rebuild(changed)
+            except Exception:
+                traceback.print_exc()
+                continue
+            names = ', '.join(os.path.basename(path) for path in sorted(changed))
+            print(f"[watch] {names} handled in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
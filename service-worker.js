@@ -9,16 +9,72 @@ const urlsToCache = [
   './assets/images/icon-512.png'
 ];
 
+// Sprites are written under content-hashed names by scripts/pixel_art/build_sprites.py,
+// which also generates precache-manifest.js (self.SPRITE_ASSETS: plain name -> hashed URL,
+// self.SPRITE_PRECACHE: the hashed URLs every device needs at install).
+// A hashed URL never changes content, so sprites live in their own cache and are
+// served cache-first. Only SPRITE_PRECACHE is downloaded on install; the rest, such
+// as the atlas page for one devicePixelRatio, is cached the first time it is fetched.
+// Browsers re-check imported scripts on update, so a rebuilt manifest installs a new
+// worker that fetches only new hashes.
+const SPRITE_CACHE_NAME = 'marter-blaster-sprites';
+try {
+  importScripts('./precache-manifest.js');
+} catch (error) {
+  // Sprites have not been built; precache nothing
+}
+const spriteUrls = Object.values(self.SPRITE_ASSETS || {});
+const spriteUrlSet = new Set(spriteUrls.map(url => new URL(url, self.location).href));
+const precacheSpriteUrls = self.SPRITE_PRECACHE || [];
+
+// Cache only the install-time sprites this cache does not already hold
+function precacheSprites() {
+  return caches.open(SPRITE_CACHE_NAME).then(cache =>
+    cache.keys().then(requests => {
+      const cached = new Set(requests.map(request => request.url));
+      return cache.addAll(precacheSpriteUrls.filter(url => !cached.has(new URL(url, self.location).href)));
+    })
+  );
+}
+
+// Drop sprites whose hash is no longer in the manifest
+function pruneSprites() {
+  return caches.open(SPRITE_CACHE_NAME).then(cache =>
+    cache.keys().then(requests => Promise.all(
+      requests
+        .filter(request => !spriteUrlSet.has(request.url))
+        .map(request => cache.delete(request))
+    ))
+  );
+}
+
 // Install service worker
 self.addEventListener('install', event => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => cache.addAll(urlsToCache))
+    Promise.all([
+      caches.open(CACHE_NAME).then(cache => cache.addAll(urlsToCache)),
+      precacheSprites()
+    ])
   );
 });
 
 // Fetch from cache when offline
 self.addEventListener('fetch', event => {
+  if (spriteUrlSet.has(event.request.url)) {
+    // Hashed sprites are immutable: cache first, and keep any network fetch
+    event.respondWith(
+      caches.open(SPRITE_CACHE_NAME).then(cache =>
+        cache.match(event.request).then(response => response || fetch(event.request).then(networkResponse => {
+          if (networkResponse.ok) {
+            cache.put(event.request, networkResponse.clone());
+          }
+          return networkResponse;
+        }))
+      )
+    );
+    return;
+  }
+
   event.respondWith(
     caches.match(event.request)
       .then(response => response || fetch(event.request))
@@ -27,7 +83,7 @@ self.addEventListener('fetch', event => {
 
 // Clean up old caches
 self.addEventListener('activate', event => {
-  const cacheWhitelist = [CACHE_NAME];
+  const cacheWhitelist = [CACHE_NAME, SPRITE_CACHE_NAME];
   event.waitUntil(
     caches.keys().then(cacheNames => {
       return Promise.all(
@@ -37,6 +93,6 @@ self.addEventListener('activate', event => {
           }
         })
       );
-    })
+    }).then(pruneSprites)
   );
-});
\ No newline at end of file
+});
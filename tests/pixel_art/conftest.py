@@ -0,0 +1,32 @@
+"""Shared fixtures for the sprite pipeline tests (scripts/pixel_art)."""
+
+import os
+import sys
+
+import pytest
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          'scripts', 'pixel_art')
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+# Covers a plain sheet with reference outputs, palette-swap variants and a particle effect
+TEST_SPRITES = ('player', 'zapper', 'explosion_small')
+
+@pytest.fixture(scope='session')
+def sprites():
+    from sprites import discover_sprites
+    return [definition for definition in discover_sprites() if definition.name in TEST_SPRITES]
+
+@pytest.fixture(scope='session')
+def packed_sprites(sprites):
+    """The test sprites plus their variant sheets, as the atlas and bundle pack them."""
+    return sprites + [variant for definition in sprites for variant in definition.variant_definitions()]
+
+@pytest.fixture(scope='session')
+def images_dir(sprites, tmp_path_factory):
+    """A directory holding freshly built outputs of the test sprites."""
+    from sprites import build_all
+    directory = str(tmp_path_factory.mktemp('images'))
+    build_all(sprites, directory, jobs=1)
+    return directory
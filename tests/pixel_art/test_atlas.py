@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+from PIL import Image
+import pytest
+
+from atlas import build_atlases, collect_frames, write_atlases
+from bundle import sheet_frames
+from encoders import restore_palette
+from palettes import palette_array
+
+def load_page(images_dir, filename, palette):
+    with Image.open(os.path.join(images_dir, filename)) as image:
+        return np.asarray(restore_palette(image, palette))
+
+def load_rgb_page(images_dir, manifest, index):
+    with Image.open(os.path.join(images_dir, manifest['atlases'][index]['image'])) as image:
+        return np.asarray(image.convert('RGB'))
+
+ATLAS_OPTIONS = {'max_size': 256, 'scales': (2,)}
+
+@pytest.fixture(scope='module', params=[True, False], ids=['trimmed', 'untrimmed'])
+def atlas(request, packed_sprites, images_dir):
+    """(manifest, written paths, build_atlases keyword arguments) for one packing."""
+    options = dict(ATLAS_OPTIONS, name=f"atlas_{'trimmed' if request.param else 'untrimmed'}", trim=request.param)
+    paths = build_atlases(packed_sprites, images_dir, **options)
+    with open(os.path.join(images_dir, f"{options['name']}.json")) as f:
+        return json.load(f), paths, options
+
+def test_frames_reconstruct_sheet_frames(atlas, packed_sprites, images_dir):
+    manifest, _, _ = atlas
+    for definition in packed_sprites:
+        sprite = manifest['sprites'][definition.name]
+        placements = sprite['animations'][definition.animation]['frames']
+        assert len(placements) == definition.num_frames
+        for placement, expected in zip(placements, sheet_frames(definition, images_dir)):
+            page = load_page(images_dir, manifest['atlases'][placement['atlas']]['image'], definition.palette)
+            x, y, w, h = placement['x'], placement['y'], placement['w'], placement['h']
+            offset_x, offset_y = placement['offsetX'], placement['offsetY']
+            frame = np.zeros((sprite['frameHeight'], sprite['frameWidth']), dtype=np.uint8)
+            frame[offset_y:offset_y + h, offset_x:offset_x + w] = page[y:y + h, x:x + w]
+            np.testing.assert_array_equal(frame, expected)
+
+def test_identical_frames_share_a_rectangle(atlas):
+    manifest, _, _ = atlas
+    # The player's two mid-glow frames have the same pixels
+    frames = manifest['sprites']['player']['animations']['idle']['frames']
+    assert frames[1] == frames[3]
+
+def test_scaled_pages_are_integer_upscales(atlas, images_dir):
+    manifest, _, _ = atlas
+    (scaled,) = [variant for variant in manifest['variants'] if variant['scale'] == 2]
+    for page, scaled_page in zip(manifest['atlases'], scaled['atlases']):
+        assert (scaled_page['width'], scaled_page['height']) == (2 * page['width'], 2 * page['height'])
+        # Pages are indexed by their trimmed palette, so compare the RGB images
+        with Image.open(os.path.join(images_dir, page['image'])) as image:
+            expected = np.asarray(image.convert('RGB')).repeat(2, axis=0).repeat(2, axis=1)
+        with Image.open(os.path.join(images_dir, scaled_page['image'])) as image:
+            np.testing.assert_array_equal(np.asarray(image.convert('RGB')), expected)
+
+def test_missing_scaled_page_is_rewritten(atlas, packed_sprites, images_dir):
+    manifest, paths, options = atlas
+    scaled_path = os.path.join(images_dir, manifest['variants'][1]['atlases'][0]['image'])
+    with open(scaled_path, 'rb') as f:
+        expected = f.read()
+    os.remove(scaled_path)
+    assert build_atlases(packed_sprites, images_dir, **options) == paths
+    with open(scaled_path, 'rb') as f:
+        assert f.read() == expected
+
+def test_fewer_pages_remove_the_stale_ones(packed_sprites, images_dir):
+    options = dict(ATLAS_OPTIONS, name='atlas_shrinking', crt_scales=(2,))
+    many = build_atlases(packed_sprites, images_dir, **dict(options, max_size=64))
+    few = build_atlases(packed_sprites, images_dir, **options)
+    assert len(few) < len(many)
+    pages = {name for name in os.listdir(images_dir) if name.startswith('atlas_shrinking_') and name.endswith('.png')}
+    assert pages == {os.path.basename(path) for path in few if path.endswith('.png')}
+
+def test_frames_can_be_streamed(packed_sprites, images_dir, tmp_path):
+    frames = collect_frames(packed_sprites, images_dir)
+    listed = write_atlases(frames, str(tmp_path / 'listed'), **ATLAS_OPTIONS)
+    streamed = write_atlases((frame for frame in frames), str(tmp_path / 'streamed'), **ATLAS_OPTIONS)
+    for listed_path, streamed_path in zip(listed, streamed):
+        with open(listed_path, 'rb') as listed_file, open(streamed_path, 'rb') as streamed_file:
+            assert listed_file.read() == streamed_file.read()
+
+def test_page_palettes_recolor_frames_into_their_variants(atlas, packed_sprites, images_dir):
+    manifest, _, _ = atlas
+    with open(os.path.join(images_dir, manifest['palettes'])) as f:
+        palettes = json.load(f)['sprites']
+    definitions = {definition.name: definition for definition in packed_sprites}
+    zapper = definitions['zapper']
+    placements = manifest['sprites']['zapper']['animations'][zapper.animation]['frames']
+    assert [entry['atlas'] for entry in palettes['zapper']] == sorted({p['atlas'] for p in placements})
+
+    for entry in palettes['zapper']:
+        # The page PNG holds slots of its own trimmed palette
+        with Image.open(os.path.join(images_dir, manifest['atlases'][entry['atlas']]['image'])) as image:
+            slots = np.asarray(image)
+        np.testing.assert_array_equal(np.array(entry['base'], dtype=np.uint8)[slots],
+                                      load_rgb_page(images_dir, manifest, entry['atlas']))
+        for variant in zapper.variants:
+            recolored = np.array(entry['variants'][variant.name], dtype=np.uint8)[slots]
+            variant_frames = sheet_frames(definitions[f'zapper_{variant.name}'], images_dir)
+            rgb = palette_array(zapper.palette)
+            for placement, frame in zip(placements, variant_frames):
+                if placement['atlas'] != entry['atlas']:
+                    continue
+                x, y, w, h = placement['x'], placement['y'], placement['w'], placement['h']
+                offset_x, offset_y = placement['offsetX'], placement['offsetY']
+                np.testing.assert_array_equal(recolored[y:y + h, x:x + w],
+                                              rgb[frame[offset_y:offset_y + h, offset_x:offset_x + w]])
@@ -0,0 +1,83 @@
+import os
+
+from build_cache import BuildCache, sprite_cache_key
+from sprites import build_all
+
+def read_outputs(directory):
+    outputs = {}
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'rb') as f:
+            outputs[name] = f.read()
+    return outputs
+
+def test_parallel_build_matches_serial(sprites, tmp_path):
+    serial_dir, parallel_dir = str(tmp_path / 'serial'), str(tmp_path / 'parallel')
+    serial = build_all(sprites, serial_dir, jobs=1)
+    parallel = build_all(sprites, parallel_dir, jobs=2)
+
+    assert [(definition.name, status) for definition, status, _ in serial] == \
+           [(definition.name, status) for definition, status, _ in parallel]
+    assert [[os.path.basename(path) for path in written] for _, _, written in serial] == \
+           [[os.path.basename(path) for path in written] for _, _, written in parallel]
+    assert read_outputs(serial_dir) == read_outputs(parallel_dir)
+
+def test_unchanged_outputs_are_fresh(sprites, tmp_path):
+    images_dir = str(tmp_path / 'images')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    assert {status for _, status, _ in build_all(sprites, images_dir, 1, cache)} == {'built'}
+
+    cache = BuildCache(str(tmp_path / 'cache'))
+    for definition in sprites:
+        assert cache.is_fresh(definition, sprite_cache_key(definition), images_dir)
+    assert {status for _, status, _ in build_all(sprites, images_dir, 1, cache)} == {'cached'}
+
+def test_edited_output_is_not_fresh(sprites, tmp_path):
+    images_dir = str(tmp_path / 'images')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    build_all(sprites, images_dir, 1, cache)
+    definition = sprites[0]
+    key = sprite_cache_key(definition)
+
+    with open(os.path.join(images_dir, definition.sheet_filename), 'ab') as f:
+        f.write(b'\0')
+    assert not cache.is_fresh(definition, key, images_dir)
+    assert not cache.is_fresh(definition, 'another-key', images_dir)
+
+def test_restore_copies_cached_outputs_back(sprites, tmp_path):
+    images_dir = str(tmp_path / 'images')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    build_all(sprites, images_dir, 1, cache)
+    built = read_outputs(images_dir)
+
+    for name in os.listdir(images_dir):
+        os.remove(os.path.join(images_dir, name))
+    results = build_all(sprites, images_dir, 1, cache)
+    assert {status for _, status, _ in results} == {'restored'}
+    assert read_outputs(images_dir) == built
+
+    assert cache.restore(sprites[0], 'not-cached', images_dir) is None
+
+def test_prune_keeps_only_current_keys(sprites, tmp_path):
+    images_dir = str(tmp_path / 'images')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    build_all(sprites, images_dir, 1, cache)
+    kept = sprites[0]
+    kept_key = sprite_cache_key(kept)
+
+    assert cache.prune([kept_key]) == len(sprites) - 1
+    assert os.listdir(cache.objects_dir) == [kept_key]
+    assert {entry['key'] for entry in cache.outputs.values()} == {kept_key}
+    assert cache.is_fresh(kept, kept_key, images_dir)
+    assert not cache.is_fresh(sprites[1], sprite_cache_key(sprites[1]), images_dir)
+
+def test_key_covers_the_build_code(sprites, monkeypatch):
+    import build_cache
+    import rasterizer
+    keys = [sprite_cache_key(definition) for definition in sprites]
+    getsource = build_cache.inspect.getsource
+
+    def edited_source(target):
+        source = getsource(target)
+        return source + '\n# edited\n' if target is rasterizer else source
+    monkeypatch.setattr(build_cache.inspect, 'getsource', edited_source)
+    assert not set(keys) & {sprite_cache_key(definition) for definition in sprites}
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from bundle import SpriteBundle, build_bundle, encode_bundle, sheet_frames, verify_bundle
+from palettes import palette_array
+
+@pytest.fixture
+def bundle(packed_sprites, images_dir, tmp_path):
+    path = build_bundle(packed_sprites, images_dir, str(tmp_path / 'tools' / 'sprites.mbsb'))
+    with SpriteBundle(path) as opened:
+        yield opened
+
+def test_round_trip_matches_sheets(bundle, packed_sprites, images_dir):
+    assert list(bundle) == [definition.name for definition in packed_sprites]
+    for definition in packed_sprites:
+        sprite = bundle.sprites[definition.name]
+        assert (sprite.palette, sprite.animation, sprite.num_frames, sprite.frame_duration_ms) == \
+               (definition.palette, definition.animation, definition.num_frames, definition.frame_duration_ms)
+        for frame, expected in zip(bundle.frames(definition.name), sheet_frames(definition, images_dir)):
+            assert frame.shape == (definition.frame_height, definition.frame_width)
+            np.testing.assert_array_equal(frame, expected)
+        np.testing.assert_array_equal(bundle.palette(definition.name), palette_array(definition.palette))
+
+def test_frames_are_read_only_views(bundle, packed_sprites):
+    frame = bundle.frame(packed_sprites[0].name, 0)
+    assert not frame.flags.writeable
+    with pytest.raises(IndexError):
+        bundle.frame(packed_sprites[0].name, packed_sprites[0].num_frames)
+
+def test_pixel_planes_are_aligned(bundle, packed_sprites):
+    offsets = bundle._frames['offset']
+    assert len(offsets) == sum(definition.num_frames for definition in packed_sprites)
+    assert not (offsets % 64).any()
+
+def test_verify_accepts_matching_bundle(bundle, packed_sprites, images_dir):
+    assert verify_bundle(bundle, packed_sprites, images_dir) == []
+
+def test_verify_reports_differences(packed_sprites, images_dir, tmp_path):
+    sprites = []
+    for definition in packed_sprites:
+        frames = [np.array(frame) for frame in sheet_frames(definition, images_dir)]
+        sprites.append((definition, frames))
+    changed, frames = sprites[0]
+    frames[-1][0, 0] ^= 1
+    path = tmp_path / 'changed.mbsb'
+    path.write_bytes(encode_bundle(sprites[:-1]))
+
+    with SpriteBundle(str(path)) as bundle:
+        problems = verify_bundle(bundle, packed_sprites, images_dir)
+    assert problems == [f"{changed.name}: frame {changed.num_frames - 1} differs from {changed.sheet_filename}",
+                        f"{packed_sprites[-1].name}: missing from the bundle"]
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-bundle.mbsb'
+    path.write_bytes(b'PNG' + bytes(100))
+    with pytest.raises(ValueError):
+        SpriteBundle(str(path))
@@ -0,0 +1,29 @@
+import numpy as np
+
+from bundle import sheet_frames
+from collision import collision_data, frame_collision, unpack_mask
+
+def test_frames_resolve_to_their_own_collision(sprites, images_dir):
+    data = collision_data(sprites, images_dir)
+    for definition in sprites:
+        indices = data['sprites'][definition.name]['frames']
+        for index, frame in zip(indices, sheet_frames(definition, images_dir)):
+            expected = frame_collision(frame)
+            assert (data['shapes'][index] if index is not None else None) == expected
+
+def test_identical_frames_share_a_shape(sprites, images_dir):
+    data = collision_data(sprites, images_dir)
+    frames = data['sprites']['player']['frames']
+    assert frames[1] == frames[3]
+    assert len(data['shapes']) == len({index for sprite in data['sprites'].values()
+                                       for index in sprite['frames'] if index is not None})
+
+def test_mask_round_trips():
+    frame = np.zeros((9, 13), dtype=np.uint8)
+    frame[2:7, 1:12] = 3
+    frame[4, 5] = 0
+    shape = frame_collision(frame)
+    x, y, w, h = shape['aabb']
+    assert (x, y, w, h) == (1, 2, 11, 5)
+    np.testing.assert_array_equal(unpack_mask(shape['mask'], w, h), frame[y:y + h, x:x + w] != 0)
+    assert frame_collision(np.zeros((4, 4), dtype=np.uint8)) is None
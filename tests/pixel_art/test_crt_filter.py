@@ -0,0 +1,54 @@
+import numpy as np
+from PIL import Image
+
+from crt_filter import apply_crt_filter, write_crt_png
+from sprites import render_definition
+
+def reference_crt_filter(image):
+    """The original per-pixel filter from the generator scripts, kept as the oracle."""
+    width, height = image.size
+    pixels = image.convert('RGB').load()
+    crt_image = Image.new('RGB', (width, height))
+    crt_pixels = crt_image.load()
+    for y in range(height):
+        scanline_darken = 0.9 if y % 2 == 0 else 1.0
+        for x in range(width):
+            r, g, b = pixels[x, y]
+            r = int(r * scanline_darken)
+            g = int(g * scanline_darken)
+            b = int(b * scanline_darken)
+            if x > 0:
+                r2, g2, b2 = pixels[x - 1, y]
+                r = (r + r2 // 8) // 1
+                g = (g + g2 // 8) // 1
+                b = (b + b2 // 8) // 1
+            crt_pixels[x, y] = (r, g, b)
+    return crt_image
+
+def random_rgb(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), 'RGB')
+
+def test_matches_per_pixel_filter_on_random_rgb():
+    image = random_rgb(67, 41)
+    assert apply_crt_filter(image).tobytes() == reference_crt_filter(image).tobytes()
+
+def test_matches_per_pixel_filter_on_indexed_sheet(sprites):
+    sheet = render_definition(next(definition for definition in sprites if definition.name == 'player'))
+    assert apply_crt_filter(sheet).tobytes() == reference_crt_filter(sheet).tobytes()
+
+def test_streamed_png_matches_in_memory_filter(tmp_path):
+    # An odd band height puts band edges on both scanline parities
+    image = random_rgb(53, 100, seed=1)
+    path = tmp_path / 'crt.png'
+    write_crt_png(image, str(path), band_height=7)
+    with Image.open(path) as written:
+        assert written.mode == 'RGB'
+        assert written.tobytes() == apply_crt_filter(image).tobytes()
+
+def test_streamed_png_expands_indexed_images(sprites, tmp_path):
+    sheet = render_definition(next(definition for definition in sprites if definition.name == 'zapper'))
+    path = tmp_path / 'crt.png'
+    write_crt_png(sheet, str(path), band_height=5)
+    with Image.open(path) as written:
+        assert written.tobytes() == apply_crt_filter(sheet).tobytes()
@@ -0,0 +1,28 @@
+import numpy as np
+from PIL import Image
+import pytest
+
+from palettes import PALETTE_GRADIENTS, nearest_indices, palette_array, quantize_image
+
+@pytest.mark.parametrize('name', sorted(PALETTE_GRADIENTS))
+@pytest.mark.parametrize('exact', [False, True], ids=['cube', 'exact'])
+def test_palette_colors_map_to_their_own_index(name, exact):
+    palette = palette_array(name)
+    np.testing.assert_array_equal(nearest_indices(palette, name, exact), np.arange(256))
+
+@pytest.mark.parametrize('name', sorted(PALETTE_GRADIENTS))
+def test_cube_stays_close_to_exact_search(name):
+    rgb = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    palette = palette_array(name).astype(np.int32)
+
+    def distances(indices):
+        return ((palette[indices] - rgb) ** 2).sum(axis=-1)
+    # The cube picks by cell center, so it may be off by at most a cell's width
+    excess = np.sqrt(distances(nearest_indices(rgb, name))) - np.sqrt(distances(nearest_indices(rgb, name, True)))
+    assert excess.max() <= np.sqrt(3) * 8
+
+def test_quantized_palette_art_keeps_its_indices():
+    indices = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    image = Image.fromarray(indices, 'P')
+    image.putpalette(bytes(palette_array('player')))
+    np.testing.assert_array_equal(np.asarray(quantize_image(image, 'player')), indices)
@@ -0,0 +1,62 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from bundle import sheet_frames
+from palettes import palette_array
+from previews import delay_fraction, delta_frames, delta_rect, encode_apng
+
+def decode_apng(data):
+    """[(rgb array, duration ms)] for every frame of an APNG."""
+    with Image.open(io.BytesIO(data)) as image:
+        return [(np.asarray(frame.convert('RGB')), frame.info['duration'])
+                for frame in ImageSequence.Iterator(image)]
+
+def test_apng_frames_decode_to_sheet_frames(sprites, images_dir):
+    for definition in sprites:
+        frames = sheet_frames(definition, images_dir)
+        palette = palette_array(definition.palette)
+        durations = [definition.frame_duration_ms] * len(frames)
+        decoded = decode_apng(encode_apng(frames, palette, durations))
+
+        # Frames identical to the one before are merged into it
+        expanded = []
+        for rgb, duration in decoded:
+            assert duration % definition.frame_duration_ms == 0
+            expanded.extend([rgb] * (int(duration) // definition.frame_duration_ms))
+        assert len(expanded) == len(frames)
+        for rgb, frame in zip(expanded, frames):
+            np.testing.assert_array_equal(rgb, palette[frame])
+
+def test_repeated_frames_extend_the_previous_delay(sprites, images_dir):
+    definition = next(definition for definition in sprites if definition.name == 'player')
+    first, second = sheet_frames(definition, images_dir)[:2]
+    palette = palette_array(definition.palette)
+    decoded = decode_apng(encode_apng([first, first, second], palette, [50, 70, 90]))
+    assert [duration for _, duration in decoded] == [120, 90]
+    np.testing.assert_array_equal(decoded[0][0], palette[first])
+    np.testing.assert_array_equal(decoded[1][0], palette[second])
+
+def test_deltas_cover_only_changed_pixels():
+    previous = np.zeros((10, 12), dtype=np.uint8)
+    current = previous.copy()
+    current[2, 3] = 5
+    current[6, 8] = 7
+    assert delta_rect(previous, previous) is None
+    assert delta_rect(previous, current) == (3, 2, 6, 5)
+    deltas = delta_frames([previous, current], [100, 100])
+    assert [(x, y, pixels.shape) for x, y, pixels, _ in deltas] == [(0, 0, (10, 12)), (3, 2, (5, 6))]
+
+def test_long_delays_use_a_coarser_denominator():
+    assert delay_fraction(100) == (100, 1000)
+    assert delay_fraction(65535) == (65535, 1000)
+    assert delay_fraction(70004) == (7000, 100)
+    assert delay_fraction(10 ** 9) == (65535, 1)
+
+    still = np.zeros((4, 4), dtype=np.uint8)
+    moved = still.copy()
+    moved[1, 2] = 1
+    # 700 identical 100 ms frames merge into one 70 s frame
+    decoded = decode_apng(encode_apng([still] * 700 + [moved], palette_array('player'), [100] * 701))
+    assert [duration for _, duration in decoded] == [70000, 100]
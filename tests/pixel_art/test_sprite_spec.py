@@ -0,0 +1,32 @@
+from dataclasses import replace
+import os
+
+import numpy as np
+import pytest
+
+from sprite_spec import CompiledSpec, list_specs
+from sprites import render_definition
+
+@pytest.mark.parametrize('shape', [
+    {'type': 'ellipse', 'center': [8, 8], 'radius': [3, 4, 5]},
+    {'type': 'ellipse', 'center': [8, 8], 'radius': {'x': 3}},
+    {'type': 'rectangle', 'box': [1, 2, 3]},
+    {'type': 'rectangle', 'box': 4},
+    {'type': 'polygon', 'points': [[1, 2]]},
+    {'type': 'polygon', 'points': [[1, 2], [3, 4, 5]]},
+    {'type': 'line', 'points': 'cx', 'fill': 1},
+    {'type': 'point', 'points': [], 'fill': 1},
+], ids=['radius', 'radius-type', 'box', 'box-number', 'polygon', 'point-arity', 'line', 'no-points'])
+def test_malformed_shapes_name_the_spec_and_shape(shape):
+    spec = {'shapes': [{'type': 'point', 'points': [[0, 0]], 'fill': 1}, dict(shape, fill=1)]}
+    with pytest.raises(ValueError, match=r'^bad\.json: shapes\[1\]: '):
+        CompiledSpec(spec, 'bad.json')
+
+def test_reference_specs_are_not_built():
+    assert 'zapper.json' not in list_specs()
+
+def test_zapper_spec_matches_draw_zapper_frame(sprites):
+    zapper = next(definition for definition in sprites if definition.name == 'zapper')
+    from_spec = replace(zapper, module='generate_spec_sprites', draw_function='draw_spec_frame',
+                        spec=os.path.join('reference', 'zapper.json'))
+    np.testing.assert_array_equal(np.asarray(render_definition(from_spec)), np.asarray(render_definition(zapper)))